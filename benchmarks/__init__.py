@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for the platform.
+
+Run from the repository root:
+    python -m benchmarks --users 10000 --output results.json
+    python -m benchmarks --baseline results.json
+"""
@@ -0,0 +1,59 @@
+import argparse
+import json
+import platform
+import sys
+from pathlib import Path
+from typing import Any
+
+from benchmarks.runner import find_regressions
+from benchmarks.suite import run_benchmarks
+from benchmarks.workload import WorkloadConfig, generate_workload
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--use-cases", type=int, default=4)
+    parser.add_argument("--sparsity", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--output", type=Path, help="write results here as JSON")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    config = WorkloadConfig(
+        n_users=args.users,
+        n_features=args.features,
+        n_use_cases=args.use_cases,
+        sparsity=args.sparsity,
+        seed=args.seed,
+    )
+    results = run_benchmarks(generate_workload(config), n_requests=args.requests)
+    report: dict[str, Any] = {
+        "config": vars(config),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": [result.as_dict() for result in results],
+    }
+
+    output: str = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        baseline: dict[str, Any] = json.loads(args.baseline.read_text())
+        regressions: list[str] = find_regressions(
+            baseline=baseline["results"], current=results, tolerance=args.tolerance
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import gc
+import resource
+import sys
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    operations: int
+    seconds: float
+    ops_per_second: float
+    p50_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def measure(name: str, operations: Iterable[Callable[[], object]]) -> BenchmarkResult:
+    """
+    Time each operation separately.
+
+    peak_rss_mb is the process's peak resident set size once the benchmark has
+    run, so it only grows across benchmarks in one run.
+    """
+    gc.collect()
+    latencies: list[float] = []
+    started: float = time.perf_counter()
+    for operation in operations:
+        operation_started: float = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - operation_started)
+    seconds: float = time.perf_counter() - started
+
+    latencies_ms: np.ndarray = np.array(latencies) * 1_000
+    return BenchmarkResult(
+        name=name,
+        operations=len(latencies),
+        seconds=seconds,
+        ops_per_second=len(latencies) / seconds if seconds else float("inf"),
+        p50_ms=float(np.percentile(latencies_ms, 50)) if latencies else 0.0,
+        p99_ms=float(np.percentile(latencies_ms, 99)) if latencies else 0.0,
+        peak_rss_mb=peak_rss_mb(),
+    )
+
+
+def peak_rss_mb() -> float:
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def find_regressions(
+    baseline: list[dict[str, Any]],
+    current: list[BenchmarkResult],
+    tolerance: float = 0.2,
+) -> list[str]:
+    """Benchmarks whose throughput fell or p99 latency rose by more than tolerance."""
+    baseline_by_name: dict[str, dict[str, Any]] = {
+        result["name"]: result for result in baseline
+    }
+    regressions: list[str] = []
+    for result in current:
+        previous: dict[str, Any] | None = baseline_by_name.get(result.name)
+        if previous is None:
+            continue
+        if result.ops_per_second < previous["ops_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: {result.ops_per_second:.0f} ops/s, "
+                f"was {previous['ops_per_second']:.0f}"
+            )
+        if result.p99_ms > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result.name}: p99 {result.p99_ms:.3f} ms, "
+                f"was {previous['p99_ms']:.3f}"
+            )
+    return regressions
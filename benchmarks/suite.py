@@ -0,0 +1,202 @@
+from functools import partial
+
+import numpy as np
+
+from benchmarks.runner import BenchmarkResult, measure
+from benchmarks.workload import Workload
+from src.orchestration import (
+    command_handler,
+    commands,
+    handlers,
+    message_bus,
+    messages,
+    translator,
+)
+from src.services.inference.inference_engine import InferenceEngine
+from src.services.training.trainer import Trainer
+
+BATCH_SIZE = 256
+
+
+def make_bus(workload: Workload) -> tuple[message_bus.MessageBus, InferenceEngine]:
+    """A bus wired to a cold InferenceEngine, as in production."""
+    inference_engine = InferenceEngine()
+    handler = command_handler.CommandHandler(
+        handlers={
+            commands.GetPrediction: lambda c: handlers.get_prediction(
+                cmd=c, predictor=inference_engine
+            ),
+            commands.GetBatchPrediction: lambda c: handlers.get_batch_prediction(
+                cmd=c, predictor=inference_engine
+            ),
+            commands.PublishModelForInference: lambda c: (
+                handlers.publish_model_for_inference(
+                    cmd=c, model_registry=workload.model_registry
+                )
+            ),
+            commands.AddModelForInference: lambda c: handlers.add_model_for_inference(
+                cmd=c, model_registry=inference_engine
+            ),
+            commands.PublishInferenceFeatures: lambda c: (
+                handlers.publish_features_for_inference(
+                    cmd=c, feature_store=workload.feature_store
+                )
+            ),
+            commands.AddFeaturesForInference: lambda c: (
+                handlers.add_features_for_inference(
+                    cmd=c, feature_repository=inference_engine
+                )
+            ),
+        }
+    )
+    bus = message_bus.MessageBus(
+        translator=translator.MessageTranslator(), handler=handler
+    )
+    return bus, inference_engine
+
+
+def run_benchmarks(workload: Workload, n_requests: int) -> list[BenchmarkResult]:
+    rng: np.random.Generator = np.random.default_rng(workload.config.seed)
+    requests: list[tuple[str, str]] = [
+        (
+            workload.use_cases[rng.integers(len(workload.use_cases))],
+            workload.user_ids[rng.integers(len(workload.user_ids))],
+        )
+        for _ in range(n_requests)
+    ]
+    results: list[BenchmarkResult] = []
+
+    cold_buses: list[message_bus.MessageBus] = [
+        make_bus(workload)[0] for _ in workload.use_cases
+    ]
+    results.append(
+        measure(
+            "message_bus.dispatch.cold",
+            (
+                partial(
+                    bus.dispatch,
+                    commands.GetPrediction(
+                        use_case=use_case, user_id=workload.user_ids[0]
+                    ),
+                )
+                for bus, use_case in zip(cold_buses, workload.use_cases)
+            ),
+        )
+    )
+
+    bus, inference_engine = make_bus(workload)
+    for use_case in workload.use_cases:
+        bus.dispatch(
+            commands.GetPrediction(use_case=use_case, user_id=workload.user_ids[0])
+        )
+    bus.log.clear()
+    results.append(
+        measure(
+            "message_bus.dispatch.warm",
+            (
+                partial(
+                    bus.dispatch,
+                    commands.GetPrediction(use_case=use_case, user_id=user_id),
+                )
+                for use_case, user_id in requests
+            ),
+        )
+    )
+    bus.log.clear()
+
+    # Handlers answer at once, leaving only the bus's own per-dispatch cost:
+    # routing, translation, logging and queueing.
+    overhead_bus = message_bus.MessageBus(
+        translator=translator.MessageTranslator(),
+        handler=command_handler.CommandHandler(
+            handlers={
+                commands.GetPrediction: lambda c: messages.NewPrediction(
+                    prediction=0.0
+                ),
+            }
+        ),
+    )
+    results.append(
+        measure(
+            "message_bus.dispatch.overhead",
+            (
+                partial(
+                    overhead_bus.dispatch,
+                    commands.GetPrediction(use_case=use_case, user_id=user_id),
+                )
+                for use_case, user_id in requests
+            ),
+        )
+    )
+
+    results.append(
+        measure(
+            "inference_engine.get_prediction",
+            (
+                partial(
+                    inference_engine.get_prediction,
+                    user_id=user_id,
+                    use_case=use_case,
+                )
+                for use_case, user_id in requests
+            ),
+        )
+    )
+    results.append(
+        measure(
+            f"inference_engine.get_predictions.batch_{BATCH_SIZE}",
+            (
+                partial(
+                    inference_engine.get_predictions,
+                    user_ids=[
+                        user_id for _, user_id in requests[start : start + BATCH_SIZE]
+                    ],
+                    use_case=requests[start][0],
+                )
+                for start in range(0, n_requests, BATCH_SIZE)
+            ),
+        )
+    )
+
+    results.append(
+        measure(
+            "handlers.publish_features_for_inference",
+            (
+                partial(
+                    handlers.publish_features_for_inference,
+                    cmd=commands.PublishInferenceFeatures(use_case=use_case),
+                    feature_store=workload.feature_store,
+                )
+                for use_case in workload.use_cases
+            ),
+        )
+    )
+
+    for name, trainer in (
+        (
+            "trainer.train.per_user",
+            Trainer(
+                feature_repository=workload.training_features,
+                model_repository=workload.training_models,
+            ),
+        ),
+        (
+            f"trainer.train.batch_{BATCH_SIZE}",
+            Trainer(
+                feature_repository=workload.training_features,
+                model_repository=workload.training_models,
+                batch_size=BATCH_SIZE,
+            ),
+        ),
+    ):
+        results.append(
+            measure(
+                name,
+                (
+                    partial(trainer.train, use_case=use_case)
+                    for use_case in workload.use_cases
+                ),
+            )
+        )
+
+    return results
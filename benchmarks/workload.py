@@ -0,0 +1,140 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.common import models, shared_types
+from src.common.features import FeatureMatrix, FeatureSchema, FeatureTable, to_array
+from src.services.features.feature_store import InMemoryFeatureStore
+from src.services.model_registry.model_registry import InMemoryModelRegistry
+from src.services.training import repositories as training
+
+
+@dataclass
+class WorkloadConfig:
+    n_users: int = 10_000
+    n_features: int = 20
+    n_use_cases: int = 4
+    # Fraction of feature values left missing.
+    sparsity: float = 0.0
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if not 0.0 <= self.sparsity < 1.0:
+            raise ValueError(f"sparsity must be in [0, 1), got {self.sparsity}.")
+
+
+@dataclass
+class SyntheticLinearModel(models.MachineLearningModel):
+    """Linear regression over a fixed schema, trained with plain SGD."""
+
+    schema: FeatureSchema = field(default_factory=FeatureSchema)
+    learning_rate: float = 0.01
+
+    def __post_init__(self) -> None:
+        if len(self.weights) != len(self.schema):
+            self.weights = np.zeros(len(self.schema))
+
+    def predict(self, features: shared_types.FeatureVector) -> float:
+        return float(np.nansum(to_array(features, self.schema) * self.weights))
+
+    def predict_batch(
+        self, features: Sequence[shared_types.FeatureVector]
+    ) -> np.ndarray:
+        array: np.ndarray = FeatureMatrix.from_vectors(
+            features, schema=self.schema
+        ).array
+        return np.nan_to_num(array) @ np.asarray(self.weights)
+
+    def update_weights(
+        self, features: shared_types.FeatureVector, target: shared_types.Target
+    ) -> None:
+        self.update_weights_batch(
+            features=FeatureMatrix(
+                schema=self.schema, array=to_array(features, self.schema)[None, :]
+            ),
+            targets=np.array([target], dtype=np.float64),
+        )
+
+    def update_weights_batch(
+        self,
+        features: Sequence[shared_types.FeatureVector],
+        targets: np.ndarray,
+    ) -> None:
+        array: np.ndarray = np.nan_to_num(
+            FeatureMatrix.from_vectors(features, schema=self.schema).array
+        )
+        weights: np.ndarray = np.asarray(self.weights)
+        errors: np.ndarray = array @ weights - targets
+        self.weights = weights - self.learning_rate * array.T @ errors / len(targets)
+
+
+@dataclass
+class Workload:
+    config: WorkloadConfig
+    use_cases: list[shared_types.UseCase]
+    user_ids: list[shared_types.UserId]
+    feature_store: InMemoryFeatureStore
+    model_registry: InMemoryModelRegistry
+    training_features: training.InMemoryFeatureRepository
+    training_models: training.InMemoryModelRepository
+
+
+def generate_workload(config: WorkloadConfig) -> Workload:
+    """
+    Seeded synthetic data for every component: current and historical
+    features, linear targets with noise and an untrained model per use case.
+    """
+    rng: np.random.Generator = np.random.default_rng(config.seed)
+    use_cases: list[str] = [f"use_case_{i}" for i in range(config.n_use_cases)]
+    user_ids: list[str] = [f"user_{i}" for i in range(config.n_users)]
+    schema = FeatureSchema(f"feature_{i}" for i in range(config.n_features))
+
+    current: dict[str, FeatureTable] = {}
+    historical: dict[str, FeatureTable] = {}
+    targets: dict[str, dict[str, float]] = {}
+    registry: dict[str, models.Model] = {}
+    training_registry: dict[str, models.MachineLearningModel] = {}
+    for use_case in use_cases:
+        true_weights: np.ndarray = rng.normal(size=config.n_features)
+        historical_values: np.ndarray = _sparse_normal(rng, config)
+        noise: np.ndarray = rng.normal(scale=0.1, size=config.n_users)
+        historical[use_case] = FeatureTable.from_arrays(
+            user_ids, schema, historical_values
+        )
+        current[use_case] = FeatureTable.from_arrays(
+            user_ids, schema, _sparse_normal(rng, config)
+        )
+        targets[use_case] = dict(
+            zip(
+                user_ids,
+                (np.nan_to_num(historical_values) @ true_weights + noise).tolist(),
+            )
+        )
+        registry[use_case] = SyntheticLinearModel(
+            schema=schema, weights=rng.normal(size=config.n_features)
+        )
+        training_registry[use_case] = SyntheticLinearModel(schema=schema)
+
+    return Workload(
+        config=config,
+        use_cases=use_cases,
+        user_ids=user_ids,
+        feature_store=InMemoryFeatureStore(
+            current_features=current,
+            historical_features=historical,
+            targets=targets,
+        ),
+        model_registry=InMemoryModelRegistry(registry=registry),
+        training_features=training.InMemoryFeatureRepository(
+            features=historical, targets=targets
+        ),
+        training_models=training.InMemoryModelRepository(registry=training_registry),
+    )
+
+
+def _sparse_normal(rng: np.random.Generator, config: WorkloadConfig) -> np.ndarray:
+    values: np.ndarray = rng.normal(size=(config.n_users, config.n_features))
+    if config.sparsity:
+        values[rng.random(values.shape) < config.sparsity] = np.nan
+    return values
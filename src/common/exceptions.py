@@ -2,3 +2,9 @@ class ModelNotFound(Exception): ...
 
 
 class FeatureSetNotFound(Exception): ...
+
+
+class FeatureSetOutOfDate(FeatureSetNotFound): ...
+
+
+class FeatureDeltaUnavailable(Exception): ...
@@ -0,0 +1,181 @@
+import json
+import os
+import shutil
+import uuid
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+
+from src.common import shared_types
+from src.common.features import FeatureMatrix, FeatureRow, FeatureSchema, FeatureTable
+
+SCHEMA_FILE = "schema.json"
+FEATURES_FILE = "features.npy"
+TARGETS_FILE = "targets.npy"
+USER_IDS_FILE = "user_ids.npy"
+SORTED_USER_IDS_FILE = "sorted_user_ids.npy"
+SORTED_ROWS_FILE = "sorted_rows.npy"
+
+ROW_MAJOR = "row"
+COLUMN_MAJOR = "column"
+
+Layout = Literal["row", "column"]
+
+
+def write_feature_file(
+    directory: str | os.PathLike,
+    table: FeatureTable,
+    targets: Mapping[shared_types.UserId, shared_types.Target] | None = None,
+    layout: Layout = ROW_MAJOR,
+) -> None:
+    """
+    Write a feature table to disk in a memory-mappable layout.
+
+    example directory structure:
+    directory/
+        schema.json            {"features": [feature_1, ...]}
+        features.npy           float64 (users x features), NaN = missing
+        targets.npy            float64 (users,), NaN = missing
+        user_ids.npy           fixed-width unicode (users,), row order
+        sorted_user_ids.npy    user ids sorted, for binary search lookups
+        sorted_rows.npy        int64 row of each sorted user id
+
+    features.npy is row-major by default, so reading one user touches one or
+    two pages. With layout COLUMN_MAJOR each feature is contiguous instead,
+    as in a FeatureTable, which loads one without copying but spreads a user
+    over a page per feature.
+
+    directory is a symlink to a hidden sibling holding the files. A rewrite
+    fills a new sibling and swaps the link with os.replace, so readers always
+    find a complete file set; the previous sibling is then removed. Files
+    already memory-mapped stay readable after that.
+    """
+    directory = Path(directory)
+    version: Path = directory.with_name(f".{directory.name}.{uuid.uuid4().hex}")
+    version.mkdir(parents=True)
+
+    user_ids: np.ndarray = np.array(list(table.user_ids), dtype=np.str_)
+    order: np.ndarray = np.argsort(user_ids, kind="stable")
+    target_values: np.ndarray = np.full(table.n_users, np.nan, dtype=np.float64)
+    if targets is not None:
+        for row, user_id in enumerate(table.user_ids):
+            if user_id in targets:
+                target_values[row] = targets[user_id]
+
+    features: np.ndarray = (
+        np.asfortranarray(table.matrix)
+        if layout == COLUMN_MAJOR
+        else np.ascontiguousarray(table.matrix)
+    )
+    (version / SCHEMA_FILE).write_text(json.dumps({"features": list(table.schema)}))
+    np.save(version / FEATURES_FILE, features)
+    np.save(version / TARGETS_FILE, target_values)
+    np.save(version / USER_IDS_FILE, user_ids)
+    np.save(version / SORTED_USER_IDS_FILE, user_ids[order])
+    np.save(version / SORTED_ROWS_FILE, order.astype(np.int64))
+
+    # A relative link stays valid when directory's parent is renamed, as a
+    # staged snapshot is.
+    link: Path = directory.with_name(f".{directory.name}.link")
+    link.unlink(missing_ok=True)
+    link.symlink_to(version.name, target_is_directory=True)
+    previous: Path | None = None
+    if directory.is_symlink():
+        previous = directory.resolve()
+    elif directory.is_dir():
+        # A plain directory can't be swapped atomically; this happens once.
+        previous = directory.with_name(f".{directory.name}.old")
+        shutil.rmtree(previous, ignore_errors=True)
+        directory.rename(previous)
+    os.replace(link, directory)
+    if previous is not None:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+class FeatureFile:
+    """
+    Read-only, memory-mapped view of a directory written by write_feature_file.
+
+    Nothing is loaded eagerly: user id lookups binary search the memory-mapped
+    sorted index and reads touch only the pages they need, so resident memory
+    is bounded by what the caller reads rather than by the file size. With
+    mmap_mode "c" the arrays are copy-on-write: writable in memory, with
+    changes never reaching the files. The directory's link is resolved once,
+    so every file is read from the same write.
+    """
+
+    def __init__(
+        self, directory: str | os.PathLike, mmap_mode: Literal["r", "c"] = "r"
+    ) -> None:
+        self.directory = Path(directory)
+        self.mmap_mode: Literal["r", "c"] = mmap_mode
+        self._files: Path = self.directory.resolve()
+        schema: dict[str, list[str]] = json.loads(
+            (self._files / SCHEMA_FILE).read_text()
+        )
+        self.schema = FeatureSchema(schema["features"])
+        self.features: np.ndarray = self._open(FEATURES_FILE)
+        self.targets: np.ndarray = self._open(TARGETS_FILE)
+        self.user_ids: np.ndarray = self._open(USER_IDS_FILE)
+        self._sorted_user_ids: np.ndarray = self._open(SORTED_USER_IDS_FILE)
+        self._sorted_rows: np.ndarray = self._open(SORTED_ROWS_FILE)
+
+    def __len__(self) -> int:
+        return self.user_ids.shape[0]
+
+    def __contains__(self, user_id: object) -> bool:
+        try:
+            self.row_of(str(user_id))
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[shared_types.UserId]:
+        return (str(user_id) for user_id in self.user_ids)
+
+    def row_of(self, user_id: shared_types.UserId) -> int:
+        position = int(np.searchsorted(self._sorted_user_ids, user_id))
+        if position == len(self) or str(self._sorted_user_ids[position]) != user_id:
+            raise KeyError(user_id)
+        return int(self._sorted_rows[position])
+
+    def rows_of(self, user_ids: Sequence[shared_types.UserId]) -> np.ndarray:
+        """Rows for many users with one vectorized binary search."""
+        keys: np.ndarray = np.array(list(user_ids), dtype=np.str_)
+        positions: np.ndarray = np.searchsorted(self._sorted_user_ids, keys)
+        found: np.ndarray = positions < len(self)
+        found[found] = self._sorted_user_ids[positions[found]] == keys[found]
+        if not found.all():
+            raise KeyError(keys[~found][0].item())
+        return self._sorted_rows[positions].astype(np.intp)
+
+    def get_row(self, user_id: shared_types.UserId) -> FeatureRow:
+        return FeatureRow(
+            schema=self.schema, array=np.array(self.features[self.row_of(user_id)])
+        )
+
+    def get_target(self, user_id: shared_types.UserId) -> float:
+        return float(self.targets[self.row_of(user_id)])
+
+    def take(self, rows: np.ndarray) -> tuple[FeatureMatrix, np.ndarray]:
+        """Features and targets for arbitrary rows, read in ascending row order."""
+        order: np.ndarray = np.argsort(rows, kind="stable")
+        features: np.ndarray = np.empty((rows.shape[0], len(self.schema)))
+        targets: np.ndarray = np.empty(rows.shape[0])
+        features[order] = self.features[rows[order]]
+        targets[order] = self.targets[rows[order]]
+        return FeatureMatrix(schema=self.schema, array=features), targets
+
+    def read_rows(
+        self, start: int, stop: int
+    ) -> tuple[list[shared_types.UserId], FeatureMatrix, np.ndarray]:
+        """User ids, features and targets for a contiguous row range."""
+        user_ids: list[shared_types.UserId] = self.user_ids[start:stop].tolist()
+        features: np.ndarray = np.ascontiguousarray(self.features[start:stop])
+        targets: np.ndarray = np.array(self.targets[start:stop])
+        return user_ids, FeatureMatrix(schema=self.schema, array=features), targets
+
+    def _open(self, file_name: str) -> np.ndarray:
+        return np.load(self._files / file_name, mmap_mode=self.mmap_mode)
@@ -0,0 +1,268 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from src.common import shared_types
+from src.common.features import FeatureMatrix, FeatureRow, FeatureSchema, FeatureTable
+
+
+class FeatureHistory:
+    """
+    Timestamped feature snapshots for a single use case.
+
+    Each observation is a user's whole feature vector as of a timestamp, in
+    seconds since the epoch. Observations are kept as one time series per
+    user, stored together:
+
+    user codes: [0,    0,    1,    ...]   one code per user, ascending
+    timestamps: [t_00, t_01, t_10, ...]   ascending within each user
+    values:     (observations x features) float64, NaN = missing
+
+    Appends are buffered; on the next read only the buffered block is sorted
+    and then merged into the stored arrays by binary search.
+    as_of answers a batch of (user, time) lookups with one vectorized binary
+    search over the observations. A user's later observation at an equal
+    timestamp replaces the earlier one.
+    """
+
+    __slots__ = (
+        "_codes",
+        "_distinct_timestamps",
+        "_keys",
+        "_pending",
+        "_schema",
+        "_timestamps",
+        "_user_ids",
+        "_user_index",
+        "_values",
+    )
+
+    def __init__(
+        self, schema: FeatureSchema | Sequence[shared_types.FeatureName] = ()
+    ) -> None:
+        self._schema: FeatureSchema = (
+            schema if isinstance(schema, FeatureSchema) else FeatureSchema(schema)
+        )
+        self._user_index: dict[shared_types.UserId, int] = {}
+        self._user_ids: list[shared_types.UserId] = []
+        self._codes: np.ndarray = np.empty(0, dtype=np.int64)
+        self._timestamps: np.ndarray = np.empty(0, dtype=np.float64)
+        self._values: np.ndarray = np.empty((0, len(self._schema)), dtype=np.float64)
+        self._keys: np.ndarray = np.empty(0, dtype=np.int64)
+        self._distinct_timestamps: np.ndarray = np.empty(0, dtype=np.float64)
+        self._pending: list[tuple[np.ndarray, np.ndarray, FeatureMatrix]] = []
+
+    def __len__(self) -> int:
+        """Number of observations."""
+        return len(self._codes) + sum(len(codes) for codes, _, _ in self._pending)
+
+    def __repr__(self) -> str:
+        return (
+            f"FeatureHistory(users={len(self._user_ids)}, observations={len(self)}, "
+            f"features={len(self._schema)})"
+        )
+
+    @property
+    def schema(self) -> FeatureSchema:
+        return self._schema
+
+    @property
+    def user_ids(self) -> Sequence[shared_types.UserId]:
+        """Every user with an observation. Read-only."""
+        return self._user_ids
+
+    def append(
+        self,
+        user_id: shared_types.UserId,
+        timestamp: float,
+        features: shared_types.FeatureVector,
+    ) -> None:
+        self.extend(
+            user_ids=[user_id],
+            timestamps=[timestamp],
+            features=FeatureMatrix.from_vectors([features]),
+        )
+
+    def append_table(self, table: FeatureTable, timestamp: float) -> None:
+        """Record every user in table as of timestamp."""
+        self.extend(
+            user_ids=table.user_ids,
+            timestamps=np.full(table.n_users, timestamp, dtype=np.float64),
+            features=FeatureMatrix(schema=table.schema, array=table.matrix.copy()),
+        )
+
+    def extend(
+        self,
+        user_ids: Sequence[shared_types.UserId],
+        timestamps: Sequence[float] | np.ndarray,
+        features: FeatureMatrix,
+    ) -> None:
+        """Record row i of features for user_ids[i] as of timestamps[i]."""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if not len(user_ids) == len(timestamps) == len(features):
+            msg = (
+                f"Got {len(user_ids)} users, {len(timestamps)} timestamps and "
+                f"{len(features)} feature rows."
+            )
+            raise ValueError(msg)
+        if np.isnan(timestamps).any():
+            raise ValueError("Timestamps must not be NaN.")
+
+        self._schema = self._schema.extend(features.schema)
+        self._pending.append((self._encode(user_ids), timestamps, features))
+
+    def as_of(
+        self,
+        user_ids: Sequence[shared_types.UserId],
+        timestamps: Sequence[float] | np.ndarray,
+    ) -> FeatureMatrix:
+        """
+        Row i holds user_ids[i]'s latest features at or before timestamps[i].
+
+        Rows for users with no observation by then are all NaN.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(user_ids) != len(timestamps):
+            msg = f"Got {len(user_ids)} users and {len(timestamps)} timestamps."
+            raise ValueError(msg)
+        rows: np.ndarray = self.rows_as_of(user_ids=user_ids, timestamps=timestamps)
+
+        values: np.ndarray = np.full(
+            (len(rows), len(self._schema)), np.nan, dtype=np.float64
+        )
+        found: np.ndarray = rows >= 0
+        values[found] = self._values[rows[found]]
+        return FeatureMatrix(schema=self._schema, array=values)
+
+    def get_features(
+        self, user_id: shared_types.UserId, timestamp: float
+    ) -> FeatureRow:
+        """user_id's latest features at or before timestamp."""
+        [row] = self.rows_as_of(user_ids=[user_id], timestamps=[timestamp])
+        if row < 0:
+            msg = f"No features for user '{user_id}' at or before {timestamp}."
+            raise KeyError(msg)
+        return FeatureRow(schema=self._schema, array=self._values[row].copy())
+
+    def rows_as_of(
+        self,
+        user_ids: Sequence[shared_types.UserId],
+        timestamps: Sequence[float] | np.ndarray,
+    ) -> np.ndarray:
+        """Observation index answering each lookup, -1 where there is none."""
+        self._merge_pending()
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        index: dict[shared_types.UserId, int] = self._user_index
+        codes: np.ndarray = np.fromiter(
+            (index.get(user_id, -1) for user_id in user_ids),
+            dtype=np.int64,
+            count=len(user_ids),
+        )
+
+        rows: np.ndarray = (
+            np.searchsorted(
+                self._keys, self._lookup_keys(codes, timestamps), side="right"
+            )
+            - 1
+        )
+        found: np.ndarray = (codes >= 0) & (rows >= 0)
+        found[found] = self._codes[rows[found]] == codes[found]
+        return np.where(found, rows, -1)
+
+    def latest(self) -> FeatureTable:
+        """Every user's most recent features."""
+        self._merge_pending()
+        # Codes are below len(user_ids), so each user's last observation is
+        # followed by a change of code.
+        last: np.ndarray = np.flatnonzero(
+            np.diff(self._codes, append=len(self._user_ids))
+        )
+        return FeatureTable.from_arrays(
+            user_ids=[self._user_ids[code] for code in self._codes[last]],
+            schema=self._schema,
+            values=self._values[last],
+        )
+
+    def _encode(self, user_ids: Sequence[shared_types.UserId]) -> np.ndarray:
+        index: dict[shared_types.UserId, int] = self._user_index
+        for user_id in user_ids:
+            if user_id not in index:
+                index[user_id] = len(self._user_ids)
+                self._user_ids.append(user_id)
+        return np.fromiter(
+            (index[user_id] for user_id in user_ids),
+            dtype=np.int64,
+            count=len(user_ids),
+        )
+
+    def _merge_pending(self) -> None:
+        if not self._pending:
+            return
+
+        codes: np.ndarray = np.concatenate([codes for codes, _, _ in self._pending])
+        timestamps: np.ndarray = np.concatenate(
+            [timestamps for _, timestamps, _ in self._pending]
+        )
+        values: np.ndarray = np.concatenate(
+            [features.as_array(self._schema) for _, _, features in self._pending]
+        )
+        self._pending = []
+
+        # Only the appended block is sorted; lexsort is stable, so among
+        # equal (user, time) pairs the latest appended sorts last.
+        order: np.ndarray = np.lexsort((timestamps, codes))
+        codes, timestamps, values = codes[order], timestamps[order], values[order]
+
+        # Each appended observation goes after the stored ones of its user at
+        # or before its time, found as a lookup would be, so it wins lookups
+        # at an equal time.
+        positions: np.ndarray = np.searchsorted(
+            self._keys, self._lookup_keys(codes, timestamps), side="right"
+        ) + np.arange(len(codes))
+        appended: np.ndarray = np.zeros(len(self._codes) + len(codes), dtype=bool)
+        appended[positions] = True
+        self._codes = _interleave(self._codes, codes, appended)
+        self._timestamps = _interleave(self._timestamps, timestamps, appended)
+        self._values = _interleave(
+            _widen(self._values, len(self._schema)), values, appended
+        )
+
+        # Ranking timestamps among the distinct observed ones packs (code,
+        # rank) into one int64 key, ascending in storage order, so lookups
+        # are a single searchsorted.
+        distinct: np.ndarray = np.unique(timestamps)
+        at: np.ndarray = np.searchsorted(self._distinct_timestamps, distinct)
+        # Timestamps are never NaN, so the padding matches nothing.
+        new: np.ndarray = np.append(self._distinct_timestamps, np.nan)[at] != distinct
+        self._distinct_timestamps = np.insert(
+            self._distinct_timestamps, at[new], distinct[new]
+        )
+        ranks: np.ndarray = np.searchsorted(self._distinct_timestamps, self._timestamps)
+        self._keys = self._codes * (len(self._distinct_timestamps) + 1) + ranks + 1
+
+    def _lookup_keys(self, codes: np.ndarray, timestamps: np.ndarray) -> np.ndarray:
+        # A lookup's key sorts after exactly the observations of its user at
+        # or before its time.
+        return codes * (len(self._distinct_timestamps) + 1) + np.searchsorted(
+            self._distinct_timestamps, timestamps, side="right"
+        )
+
+
+def _widen(values: np.ndarray, columns: int) -> np.ndarray:
+    # Features first seen after these observations are missing from them.
+    if values.shape[1] == columns:
+        return values
+    widened: np.ndarray = np.full((len(values), columns), np.nan, dtype=np.float64)
+    widened[:, : values.shape[1]] = values
+    return widened
+
+
+def _interleave(
+    stored: np.ndarray, appended: np.ndarray, is_appended: np.ndarray
+) -> np.ndarray:
+    merged: np.ndarray = np.empty(
+        (len(is_appended), *stored.shape[1:]), dtype=stored.dtype
+    )
+    merged[is_appended] = appended
+    merged[~is_appended] = stored
+    return merged
@@ -0,0 +1,594 @@
+import math
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import overload
+
+import numpy as np
+
+from src.common import shared_types
+
+
+class FeatureSchema:
+    """
+    Fixed feature order for a use case.
+
+    Vectors and matrices built against a schema store their values in this
+    order, so feature names are kept once per schema rather than once per row.
+    """
+
+    __slots__ = ("_index", "names")
+
+    def __init__(self, names: Iterable[shared_types.FeatureName] = ()) -> None:
+        self.names: tuple[shared_types.FeatureName, ...] = tuple(names)
+        self._index: dict[shared_types.FeatureName, int] = {
+            name: position for position, name in enumerate(self.names)
+        }
+        if len(self._index) != len(self.names):
+            raise ValueError(f"Feature names must be unique, got {self.names}.")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[shared_types.FeatureName]:
+        return iter(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FeatureSchema):
+            return NotImplemented
+        return self is other or self.names == other.names
+
+    def __hash__(self) -> int:
+        return hash(self.names)
+
+    def __repr__(self) -> str:
+        return f"FeatureSchema({list(self.names)})"
+
+    def index(self, name: shared_types.FeatureName) -> int:
+        return self._index[name]
+
+    def extend(self, names: Iterable[shared_types.FeatureName]) -> "FeatureSchema":
+        """New schema with any unseen names appended in order."""
+        new_names: dict[shared_types.FeatureName, None] = {
+            name: None for name in names if name not in self._index
+        }
+        if not new_names:
+            return self
+        return FeatureSchema(self.names + tuple(new_names))
+
+    def positions(self, other: "FeatureSchema") -> np.ndarray:
+        """Position of each of this schema's names in other, -1 where absent."""
+        return np.fromiter(
+            (other._index.get(name, -1) for name in self.names),
+            dtype=np.intp,
+            count=len(self.names),
+        )
+
+    def vector_from_dict(self, features: Mapping[str, float]) -> np.ndarray:
+        """Slow path: lay out a name-keyed mapping in schema order, dropping unknown names."""
+        values: np.ndarray = np.full(len(self.names), np.nan, dtype=np.float64)
+        index: dict[shared_types.FeatureName, int] = self._index
+        for name, value in features.items():
+            if name in index:
+                values[index[name]] = value
+        return values
+
+
+class FeatureRow(Mapping[shared_types.FeatureName, shared_types.FeatureValue]):
+    """
+    One user's features as a float array laid out by a FeatureSchema.
+
+    Name-based access goes through the schema; NaN marks a missing feature.
+    """
+
+    __slots__ = ("array", "schema")
+
+    def __init__(self, schema: FeatureSchema, array: np.ndarray) -> None:
+        self.schema: FeatureSchema = schema
+        self.array: np.ndarray = array
+
+    @classmethod
+    def from_dict(
+        cls, features: Mapping[str, float], schema: FeatureSchema | None = None
+    ) -> "FeatureRow":
+        schema = schema if schema is not None else FeatureSchema(features)
+        return cls(schema=schema, array=schema.vector_from_dict(features))
+
+    def __getitem__(self, name: shared_types.FeatureName) -> float:
+        value = float(self.array[self.schema.index(name)])
+        if math.isnan(value):
+            raise KeyError(name)
+        return value
+
+    def __iter__(self) -> Iterator[shared_types.FeatureName]:
+        names = self.schema.names
+        return (names[position] for position in np.flatnonzero(~np.isnan(self.array)))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self.array)))
+
+    def __repr__(self) -> str:
+        return f"FeatureRow({self.to_dict()})"
+
+    def to_dict(self) -> dict[shared_types.FeatureName, float]:
+        """Slow path: materialize the row as a name-keyed dict."""
+        return {
+            name: value
+            for name, value in zip(self.schema.names, self.array.tolist())
+            if not math.isnan(value)
+        }
+
+    def as_array(self, schema: FeatureSchema) -> np.ndarray:
+        """Values laid out by schema; zero-copy when the schemas match."""
+        if schema == self.schema:
+            return self.array
+        return _reorder(self.array, source=self.schema, target=schema)
+
+
+class FeatureMatrix(Sequence[FeatureRow]):
+    """Feature rows for many users stacked in a (users x features) float array."""
+
+    __slots__ = ("array", "schema")
+
+    def __init__(self, schema: FeatureSchema, array: np.ndarray) -> None:
+        if array.ndim != 2 or array.shape[1] != len(schema):
+            msg = f"Array of shape {array.shape} does not match {len(schema)} features."
+            raise ValueError(msg)
+        self.schema: FeatureSchema = schema
+        self.array: np.ndarray = array
+
+    @classmethod
+    def from_vectors(
+        cls,
+        vectors: Sequence[shared_types.FeatureVector],
+        schema: FeatureSchema | None = None,
+    ) -> "FeatureMatrix":
+        """Stack vectors; rows sharing one schema are stacked without name lookups."""
+        if isinstance(vectors, FeatureMatrix):
+            if schema is None or schema == vectors.schema:
+                return vectors
+            return cls(schema=schema, array=vectors.as_array(schema))
+
+        rows: list[FeatureRow] = [
+            vector for vector in vectors if isinstance(vector, FeatureRow)
+        ]
+        if rows and len(rows) == len(vectors):
+            row_schema: FeatureSchema = rows[0].schema
+            if all(row.schema == row_schema for row in rows):
+                matrix = cls(
+                    schema=row_schema, array=np.stack([row.array for row in rows])
+                )
+                return matrix if schema is None else cls.from_vectors(matrix, schema)
+
+        if schema is None:
+            schema = FeatureSchema()
+            for vector in vectors:
+                schema = schema.extend(vector)
+        values = np.full((len(vectors), len(schema)), np.nan, dtype=np.float64)
+        for row, vector in enumerate(vectors):
+            if isinstance(vector, FeatureRow):
+                values[row] = vector.as_array(schema)
+            else:
+                values[row] = schema.vector_from_dict(vector)
+        return cls(schema=schema, array=values)
+
+    @overload
+    def __getitem__(self, index: int) -> FeatureRow: ...
+    @overload
+    def __getitem__(self, index: slice) -> "FeatureMatrix": ...
+    def __getitem__(self, index: int | slice) -> "FeatureRow | FeatureMatrix":
+        if isinstance(index, slice):
+            return FeatureMatrix(schema=self.schema, array=self.array[index])
+        return FeatureRow(schema=self.schema, array=self.array[index])
+
+    def __len__(self) -> int:
+        return self.array.shape[0]
+
+    def __repr__(self) -> str:
+        return f"FeatureMatrix(rows={len(self)}, schema={self.schema})"
+
+    def as_array(self, schema: FeatureSchema) -> np.ndarray:
+        """Values laid out by schema; zero-copy when the schemas match."""
+        if schema == self.schema:
+            return self.array
+        return _reorder(self.array, source=self.schema, target=schema)
+
+
+class FeatureTable(Mapping[shared_types.UserId, FeatureRow]):
+    """
+    Columnar feature set for a single use case.
+
+    example table structure:
+    user index: {user_1: 0, user_2: 1, ...}
+    schema:     (feature_1, feature_2, ...)
+    values:
+                   feature_1  feature_2  ...
+        user_1 [[  value,     value,     ... ],
+        user_2  [  value,     NaN,       ... ],
+        ...   ]
+
+    Values are stored column-major as float64 so every feature is one contiguous
+    column. Missing features are stored as NaN and are left out of the
+    FeatureRows served by the Mapping interface.
+    """
+
+    __slots__ = ("_schema", "_user_ids", "_user_index", "_values")
+
+    def __init__(
+        self,
+        schema: FeatureSchema | Iterable[shared_types.FeatureName] = (),
+        capacity: int = 0,
+    ) -> None:
+        self._user_index: dict[shared_types.UserId, int] = {}
+        self._user_ids: list[shared_types.UserId] = []
+        self._schema: FeatureSchema = (
+            schema if isinstance(schema, FeatureSchema) else FeatureSchema(schema)
+        )
+        self._values: np.ndarray = _allocate(rows=capacity, columns=len(self._schema))
+
+    @classmethod
+    def from_feature_set(cls, feature_set: shared_types.FeatureSet) -> "FeatureTable":
+        """Compile a name-keyed feature set; FeatureTables are copied."""
+        if isinstance(feature_set, FeatureTable):
+            return feature_set.copy()
+
+        schema = FeatureSchema()
+        for features in feature_set.values():
+            schema = schema.extend(features)
+
+        table = cls(schema=schema, capacity=len(feature_set))
+        for user_id, features in feature_set.items():
+            table.upsert(user_id=user_id, features=features)
+        return table
+
+    @classmethod
+    def from_arrays(
+        cls,
+        user_ids: Sequence[shared_types.UserId],
+        schema: FeatureSchema | Sequence[shared_types.FeatureName],
+        values: np.ndarray,
+    ) -> "FeatureTable":
+        """Wrap an existing (users x features) matrix, copying only if its layout differs."""
+        table = cls(schema=schema)
+        if values.shape != (len(user_ids), len(table._schema)):
+            msg = (
+                f"Values of shape {values.shape} do not match "
+                f"{len(user_ids)} users and {len(table._schema)} features."
+            )
+            raise ValueError(msg)
+
+        table._values = np.asfortranarray(values, dtype=np.float64)
+        table._user_ids = list(user_ids)
+        table._user_index = {user_id: row for row, user_id in enumerate(user_ids)}
+        if len(table._user_index) != len(table._user_ids):
+            raise ValueError("User IDs must be unique.")
+        return table
+
+    def __getitem__(self, user_id: shared_types.UserId) -> FeatureRow:
+        row: int = self._user_index[user_id]
+        return FeatureRow(
+            schema=self._schema, array=self._values[row, : self.n_features].copy()
+        )
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._user_index
+
+    def __iter__(self) -> Iterator[shared_types.UserId]:
+        return iter(self._user_ids)
+
+    def __len__(self) -> int:
+        return len(self._user_ids)
+
+    def __repr__(self) -> str:
+        return f"FeatureTable(users={self.n_users}, features={self.n_features})"
+
+    @property
+    def n_users(self) -> int:
+        return len(self._user_ids)
+
+    @property
+    def n_features(self) -> int:
+        return len(self._schema)
+
+    @property
+    def schema(self) -> FeatureSchema:
+        return self._schema
+
+    @property
+    def user_ids(self) -> Sequence[shared_types.UserId]:
+        """User IDs in row order. Read-only."""
+        return self._user_ids
+
+    @property
+    def feature_names(self) -> Sequence[shared_types.FeatureName]:
+        return self._schema.names
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Zero-copy (users x features) view of the stored values."""
+        return self._values[: self.n_users, : self.n_features]
+
+    @property
+    def nbytes(self) -> int:
+        return self._values.nbytes
+
+    def column(self, feature_name: shared_types.FeatureName) -> np.ndarray:
+        """Zero-copy contiguous view of one feature across all users."""
+        return self._values[: self.n_users, self._schema.index(feature_name)]
+
+    def row_of(self, user_id: shared_types.UserId) -> int:
+        return self._user_index[user_id]
+
+    def rows_of(self, user_ids: Iterable[shared_types.UserId]) -> np.ndarray:
+        index: dict[shared_types.UserId, int] = self._user_index
+        return np.fromiter(
+            (index[user_id] for user_id in user_ids), dtype=np.intp, count=-1
+        )
+
+    def take(self, user_ids: Iterable[shared_types.UserId]) -> FeatureMatrix:
+        """Gather the rows for user_ids into one matrix."""
+        rows: np.ndarray = self.rows_of(user_ids)
+        return FeatureMatrix(
+            schema=self._schema, array=self._values[rows, : self.n_features]
+        )
+
+    def subset(self, user_ids: Sequence[shared_types.UserId]) -> "FeatureTable":
+        """New table holding copies of the rows for user_ids."""
+        return FeatureTable.from_arrays(
+            user_ids=user_ids, schema=self._schema, values=self.take(user_ids).array
+        )
+
+    def get_rows(
+        self, user_ids: Sequence[shared_types.UserId]
+    ) -> list[FeatureRow | None]:
+        """Rows aligned with user_ids, None for unknown users, in one gather."""
+        index: dict[shared_types.UserId, int] = self._user_index
+        found: list[int] = [
+            position for position, user_id in enumerate(user_ids) if user_id in index
+        ]
+        gathered: FeatureMatrix = self.take(user_ids[position] for position in found)
+        rows: list[FeatureRow | None] = [None] * len(user_ids)
+        for position, row in zip(found, gathered):
+            rows[position] = row
+        return rows
+
+    def get_value(
+        self, user_id: shared_types.UserId, feature_name: shared_types.FeatureName
+    ) -> float:
+        row: int = self._user_index[user_id]
+        return float(self._values[row, self._schema.index(feature_name)])
+
+    def upsert(
+        self, user_id: shared_types.UserId, features: shared_types.FeatureVector
+    ) -> None:
+        """Replace the feature vector for a user, adding the user and any new features."""
+        row: int | None = self._user_index.get(user_id)
+        if row is None:
+            row = self._add_user(user_id)
+
+        if isinstance(features, FeatureRow) and features.schema == self._schema:
+            self._values[row, : self.n_features] = features.array
+            return
+
+        self._extend_schema(features)
+        self._values[row, :] = np.nan
+        for name, value in features.items():
+            self._values[row, self._schema.index(name)] = value
+
+    def update(
+        self, user_id: shared_types.UserId, features: shared_types.FeatureVector
+    ) -> None:
+        """Set the given features for a user, keeping the others, adding the user if new."""
+        row: int | None = self._user_index.get(user_id)
+        if row is None:
+            row = self._add_user(user_id)
+        self._extend_schema(features)
+        for name, value in features.items():
+            self._values[row, self._schema.index(name)] = value
+
+    def delete(self, user_id: shared_types.UserId) -> None:
+        """Remove a user by moving the last row into its slot."""
+        row: int = self._user_index.pop(user_id)
+        last: int = self.n_users - 1
+        if row != last:
+            moved_user_id: shared_types.UserId = self._user_ids[last]
+            self._values[row, :] = self._values[last, :]
+            self._user_ids[row] = moved_user_id
+            self._user_index[moved_user_id] = row
+        self._user_ids.pop()
+        self._values[last, :] = np.nan
+
+    def copy(self) -> "FeatureTable":
+        return FeatureTable.from_arrays(
+            user_ids=list(self._user_ids),
+            schema=self._schema,
+            values=self.matrix.copy(order="F"),
+        )
+
+    def to_feature_set(self) -> dict[shared_types.UserId, dict[str, float]]:
+        """Slow path: materialize the table as name-keyed dicts."""
+        return {user_id: self[user_id].to_dict() for user_id in self._user_ids}
+
+    def _add_user(self, user_id: shared_types.UserId) -> int:
+        row: int = self.n_users
+        if row == self._values.shape[0]:
+            self._resize(rows=max(2 * row, 8), columns=self._values.shape[1])
+        self._user_ids.append(user_id)
+        self._user_index[user_id] = row
+        return row
+
+    def _extend_schema(self, names: Iterable[shared_types.FeatureName]) -> None:
+        schema: FeatureSchema = self._schema.extend(names)
+        if schema is self._schema:
+            return
+        if len(schema) > self._values.shape[1]:
+            self._resize(
+                rows=self._values.shape[0],
+                columns=max(2 * self._values.shape[1], len(schema), 4),
+            )
+        self._schema = schema
+
+    def _resize(self, rows: int, columns: int) -> None:
+        values: np.ndarray = _allocate(rows=rows, columns=columns)
+        values[: self.n_users, : self.n_features] = self.matrix
+        self._values = values
+
+
+@dataclass(frozen=True)
+class FeatureDelta:
+    """Upserts and deletes that take a use case's features from one version to another."""
+
+    use_case: shared_types.UseCase
+    from_version: int
+    to_version: int
+    upserts: FeatureTable
+    deletes: tuple[shared_types.UserId, ...] = ()
+
+    def __len__(self) -> int:
+        return len(self.upserts) + len(self.deletes)
+
+
+class LayeredFeatureSet(Mapping[shared_types.UserId, FeatureRow]):
+    """
+    Immutable, versioned feature set: a base FeatureTable plus an overlay of
+    rows changed by deltas since the base was built.
+
+    example structure:
+    base:    FeatureTable {user_1: row, user_2: row, user_3: row}
+    overlay: {user_2: new row, user_3: None (deleted), user_4: new row}
+    version: 7
+
+    apply returns a new set rather than mutating this one, so readers holding a
+    reference never see a half-applied delta. Its cost is proportional to the
+    overlay, which is folded into a fresh base once it outgrows compact_ratio
+    of the base.
+    """
+
+    __slots__ = ("_size", "base", "overlay", "version")
+
+    compact_ratio: float = 0.25
+
+    def __init__(
+        self,
+        base: FeatureTable,
+        version: int = 0,
+        overlay: Mapping[shared_types.UserId, FeatureRow | None] | None = None,
+    ) -> None:
+        self.base: FeatureTable = base
+        self.version: int = version
+        self.overlay: Mapping[shared_types.UserId, FeatureRow | None] = overlay or {}
+        self._size: int = len(base) + sum(
+            (row is not None) - (user_id in base)
+            for user_id, row in self.overlay.items()
+        )
+
+    def __getitem__(self, user_id: shared_types.UserId) -> FeatureRow:
+        if user_id in self.overlay:
+            row: FeatureRow | None = self.overlay[user_id]
+            if row is None:
+                raise KeyError(user_id)
+            return row
+        return self.base[user_id]
+
+    def __contains__(self, user_id: object) -> bool:
+        if isinstance(user_id, str) and user_id in self.overlay:
+            return self.overlay[user_id] is not None
+        return user_id in self.base
+
+    def __iter__(self) -> Iterator[shared_types.UserId]:
+        for user_id in self.base:
+            if user_id not in self.overlay:
+                yield user_id
+        for user_id, row in self.overlay.items():
+            if row is not None:
+                yield user_id
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return (
+            f"LayeredFeatureSet(users={len(self)}, overlay={len(self.overlay)}, "
+            f"version={self.version})"
+        )
+
+    def get_rows(
+        self, user_ids: Sequence[shared_types.UserId]
+    ) -> list[FeatureRow | None]:
+        """Rows aligned with user_ids, None for unknown users."""
+        if not self.overlay:
+            return self.base.get_rows(user_ids)
+        rows: list[FeatureRow | None] = self.base.get_rows(
+            [user_id for user_id in user_ids if user_id not in self.overlay]
+        )
+        base_rows: Iterator[FeatureRow | None] = iter(rows)
+        return [
+            self.overlay[user_id] if user_id in self.overlay else next(base_rows)
+            for user_id in user_ids
+        ]
+
+    def apply(self, delta: FeatureDelta) -> "LayeredFeatureSet":
+        """New set with delta applied; deltas already covered by this version are no-ops."""
+        if delta.to_version <= self.version:
+            return self
+        if delta.from_version > self.version:
+            msg = (
+                f"Delta from version {delta.from_version} cannot be applied to "
+                f"{delta.use_case} features at version {self.version}."
+            )
+            raise ValueError(msg)
+
+        overlay: dict[shared_types.UserId, FeatureRow | None] = dict(self.overlay)
+        for user_id in delta.deletes:
+            overlay[user_id] = None
+        for user_id, row in zip(delta.upserts.user_ids, delta.upserts.values()):
+            overlay[user_id] = row
+
+        if len(overlay) > self.compact_ratio * max(len(self.base), 1):
+            return LayeredFeatureSet(
+                base=_compact(self.base, overlay), version=delta.to_version
+            )
+        return LayeredFeatureSet(
+            base=self.base, version=delta.to_version, overlay=overlay
+        )
+
+
+def _compact(
+    base: FeatureTable, overlay: Mapping[shared_types.UserId, FeatureRow | None]
+) -> FeatureTable:
+    table: FeatureTable = base.copy()
+    for user_id, row in overlay.items():
+        if row is not None:
+            table.upsert(user_id=user_id, features=row)
+        elif user_id in table:
+            table.delete(user_id)
+    return table
+
+
+def to_array(features: shared_types.FeatureVector, schema: FeatureSchema) -> np.ndarray:
+    """Feature values laid out by schema; zero-copy for matching FeatureRows."""
+    if isinstance(features, FeatureRow):
+        return features.as_array(schema)
+    return schema.vector_from_dict(features)
+
+
+def to_matrix(
+    features: Sequence[shared_types.FeatureVector], schema: FeatureSchema
+) -> np.ndarray:
+    """Feature values laid out by schema; zero-copy for matching FeatureMatrices."""
+    return FeatureMatrix.from_vectors(features, schema=schema).array
+
+
+def _reorder(
+    values: np.ndarray, source: FeatureSchema, target: FeatureSchema
+) -> np.ndarray:
+    positions: np.ndarray = target.positions(source)
+    reordered: np.ndarray = values[..., np.maximum(positions, 0)]
+    reordered[..., positions < 0] = np.nan
+    return reordered
+
+
+def _allocate(rows: int, columns: int) -> np.ndarray:
+    return np.full((rows, columns), np.nan, dtype=np.float64, order="F")
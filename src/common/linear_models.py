@@ -0,0 +1,150 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Literal
+
+import numpy as np
+
+from src.common import shared_types
+from src.common.features import FeatureMatrix, FeatureSchema, to_array
+from src.common.models import MachineLearningModel
+
+SGD = "sgd"
+ADAM = "adam"
+
+Optimizer = Literal["sgd", "adam"]
+
+
+@dataclass
+class LinearModel(MachineLearningModel):
+    """
+    Generalized linear model over a fixed FeatureSchema.
+
+    weights is one contiguous float64 array: a coefficient per schema feature
+    in schema order, then the intercept if fit_intercept is set. Feature
+    vectors are laid out by the schema before scoring, so name order and
+    unknown names don't matter; missing features count as zero.
+
+    Each update takes one optimizer step on the mean gradient of a batch,
+    with update_weights a batch of one. optimizer is plain SGD or Adam, and l2
+    adds a ridge penalty on the coefficients, not the intercept. Updates
+    replace weights rather than writing into it, so weights loaded read-only
+    from a model registry can be trained further.
+    """
+
+    schema: FeatureSchema = field(default_factory=FeatureSchema)
+    learning_rate: float = 0.01
+    optimizer: Optimizer = SGD
+    l2: float = 0.0
+    fit_intercept: bool = True
+    beta1: float = 0.9
+    beta2: float = 0.999
+    epsilon: float = 1e-8
+    _first_moment: np.ndarray | None = field(default=None, init=False, repr=False)
+    _second_moment: np.ndarray | None = field(default=None, init=False, repr=False)
+    _steps: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.optimizer not in (SGD, ADAM):
+            msg = f"optimizer must be '{SGD}' or '{ADAM}', got {self.optimizer!r}."
+            raise ValueError(msg)
+        n_weights: int = len(self.schema) + self.fit_intercept
+        if len(self.weights) == 0:
+            self.weights = np.zeros(n_weights, dtype=np.float64)
+        elif len(self.weights) != n_weights:
+            msg = f"Expected {n_weights} weights for {self.schema}, got {len(self.weights)}."
+            raise ValueError(msg)
+        else:
+            self.weights = np.ascontiguousarray(self.weights, dtype=np.float64)
+
+    @property
+    def coefficients(self) -> np.ndarray:
+        return np.asarray(self.weights)[: len(self.schema)]
+
+    @property
+    def intercept(self) -> float:
+        return float(self.weights[-1]) if self.fit_intercept else 0.0
+
+    def predict(self, features: shared_types.FeatureVector) -> float:
+        values: np.ndarray = np.nan_to_num(to_array(features, self.schema))
+        return float(self._link(values @ self.coefficients + self.intercept))
+
+    def predict_batch(
+        self, features: Sequence[shared_types.FeatureVector]
+    ) -> np.ndarray:
+        return self._link(self._design(features) @ self.coefficients + self.intercept)
+
+    def update_weights(
+        self, features: shared_types.FeatureVector, target: shared_types.Target
+    ) -> None:
+        self.update_weights_batch(
+            features=FeatureMatrix(
+                schema=self.schema, array=to_array(features, self.schema)[None, :]
+            ),
+            targets=np.array([target], dtype=np.float64),
+        )
+
+    def update_weights_batch(
+        self, features: Sequence[shared_types.FeatureVector], targets: np.ndarray
+    ) -> None:
+        self.apply_gradient(self.compute_gradient(features=features, targets=targets))
+
+    def compute_gradient(
+        self, features: Sequence[shared_types.FeatureVector], targets: np.ndarray
+    ) -> np.ndarray:
+        # Squared error for the identity link and log loss for the logistic
+        # link share the same gradient: the residual times the inputs.
+        array: np.ndarray = self._design(features)
+        coefficients: np.ndarray = self.coefficients
+        residuals: np.ndarray = (
+            self._link(array @ coefficients + self.intercept) - targets
+        )
+        gradient: np.ndarray = np.empty(len(self.weights), dtype=np.float64)
+        gradient[: len(self.schema)] = array.T @ residuals / len(targets)
+        gradient[: len(self.schema)] += self.l2 * coefficients
+        if self.fit_intercept:
+            gradient[-1] = residuals.mean()
+        return gradient
+
+    def apply_gradient(self, gradient: np.ndarray) -> None:
+        weights: np.ndarray = np.asarray(self.weights)
+        if self.optimizer == SGD:
+            self.weights = weights - self.learning_rate * gradient
+            return
+
+        if self._first_moment is None or self._second_moment is None:
+            self._first_moment = np.zeros_like(weights)
+            self._second_moment = np.zeros_like(weights)
+        self._steps += 1
+        self._first_moment = (
+            self.beta1 * self._first_moment + (1.0 - self.beta1) * gradient
+        )
+        self._second_moment = self.beta2 * self._second_moment + (
+            1.0 - self.beta2
+        ) * np.square(gradient)
+        first: np.ndarray = self._first_moment / (1.0 - self.beta1**self._steps)
+        second: np.ndarray = self._second_moment / (1.0 - self.beta2**self._steps)
+        self.weights = weights - self.learning_rate * first / (
+            np.sqrt(second) + self.epsilon
+        )
+
+    def _design(self, features: Sequence[shared_types.FeatureVector]) -> np.ndarray:
+        return np.nan_to_num(
+            FeatureMatrix.from_vectors(features, schema=self.schema).array
+        )
+
+    def _link(self, linear: np.ndarray) -> np.ndarray:
+        return linear
+
+
+@dataclass
+class LinearRegression(LinearModel):
+    """Least-squares regression: predicts the linear score itself."""
+
+
+@dataclass
+class LogisticRegression(LinearModel):
+    """Binary classifier trained with log loss on 0/1 targets; predicts P(target = 1)."""
+
+    def _link(self, linear: np.ndarray) -> np.ndarray:
+        # The tanh form of the sigmoid doesn't overflow for large scores.
+        return 0.5 * (np.tanh(0.5 * linear) + 1.0)
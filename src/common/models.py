@@ -3,6 +3,8 @@ from src.common import shared_types
 from dataclasses import dataclass, field
 from typing import Sequence
 
+import numpy as np
+
 
 class ConstantModel(abc.ABC):
     @abc.abstractmethod
@@ -10,18 +12,66 @@ class ConstantModel(abc.ABC):
 
 
 class RulesBasedModel(abc.ABC):
+    """
+    Features arrive as name-keyed mappings, usually FeatureRows. Models that
+    know their FeatureSchema can read values positionally with
+    src.common.features.to_array instead of looking features up by name.
+    """
+
     @abc.abstractmethod
     def predict(self, features: shared_types.FeatureVector) -> float: ...
 
+    def predict_batch(
+        self, features: Sequence[shared_types.FeatureVector]
+    ) -> np.ndarray:
+        """Score many feature vectors at once. Override with a vectorized version."""
+        return np.fromiter(
+            (self.predict(features=row) for row in features),
+            dtype=np.float64,
+            count=len(features),
+        )
+
 
 @dataclass
 class MachineLearningModel(RulesBasedModel):
-    weights: Sequence[int | float] = field(default_factory=list)
+    # Plain sequences or float arrays; registries may load read-only arrays.
+    weights: Sequence[int | float] | np.ndarray = field(default_factory=list)
 
     @abc.abstractmethod
     def update_weights(
         self, features: shared_types.FeatureVector, target: shared_types.Target
     ) -> None: ...
 
+    def update_weights_batch(
+        self, features: Sequence[shared_types.FeatureVector], targets: np.ndarray
+    ) -> None:
+        """Update on a mini-batch. Override with a vectorized version."""
+        for row, target in zip(features, targets.tolist()):
+            self.update_weights(features=row, target=target)
+
+    def compute_gradient(
+        self, features: Sequence[shared_types.FeatureVector], targets: np.ndarray
+    ) -> np.ndarray:
+        """
+        Mean gradient of the loss over a batch at the current weights.
+
+        Optional hook for data-parallel training, which calls it in worker
+        processes on copies of the model whose weights are refreshed every
+        step, so the result may depend only on weights and configuration.
+        """
+        raise NotImplementedError
+
+    def apply_gradient(self, gradient: np.ndarray) -> None:
+        """Take one optimizer step with a gradient from compute_gradient."""
+        raise NotImplementedError
+
+    @property
+    def supports_gradients(self) -> bool:
+        model_type: type[MachineLearningModel] = type(self)
+        return (
+            model_type.compute_gradient is not MachineLearningModel.compute_gradient
+            and model_type.apply_gradient is not MachineLearningModel.apply_gradient
+        )
+
 
 Model = ConstantModel | RulesBasedModel | MachineLearningModel
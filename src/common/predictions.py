@@ -0,0 +1,27 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.common import shared_types
+
+
+@dataclass(frozen=True)
+class BatchPrediction:
+    """
+    Predictions for a batch of users, aligned with user_ids.
+
+    Users without features get NaN and are listed in missing_user_ids.
+    """
+
+    user_ids: Sequence[shared_types.UserId]
+    predictions: np.ndarray
+    missing_user_ids: Sequence[shared_types.UserId] = field(default_factory=list)
+
+    def as_dict(self) -> dict[shared_types.UserId, float]:
+        missing: set[shared_types.UserId] = set(self.missing_user_ids)
+        return {
+            user_id: prediction
+            for user_id, prediction in zip(self.user_ids, self.predictions.tolist())
+            if user_id not in missing
+        }
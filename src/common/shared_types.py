@@ -1,9 +1,11 @@
+from collections.abc import Mapping
+
 UserId = str
 UseCase = str
 FeatureValue = int | float
 FeatureName = str
-FeatureVector = dict[FeatureName, FeatureValue]
-FeatureSet = dict[UserId, FeatureVector]
+FeatureVector = Mapping[FeatureName, FeatureValue]
+FeatureSet = Mapping[UserId, FeatureVector]
 FeatureSets = dict[UseCase, FeatureSet]
 Target = int | float
 Targets = dict[UseCase, dict[UserId, Target]]
@@ -0,0 +1,87 @@
+import time
+from dataclasses import dataclass, field
+from functools import partial
+
+from src.common.predictions import BatchPrediction
+from src.orchestration import commands, messages
+from src.orchestration.command_handler import CommandHandler
+from src.orchestration.instrumentation import (
+    DISPATCH,
+    RETRIES,
+    WARM_UPS,
+    Instrumentation,
+)
+from src.orchestration.message_bus import warm_up_key
+from src.orchestration.message_log import MessageLog, RingBufferLog
+from src.orchestration.single_flight import SingleFlight
+from src.orchestration.translator import MessageTranslator
+
+
+@dataclass
+class AsyncMessageBus:
+    """
+    asyncio counterpart of MessageBus.
+
+    Each dispatch runs its own command chain with the same translator-driven
+    retry semantics as MessageBus, awaiting handlers through
+    CommandHandler.ahandle. Chains from concurrent dispatches interleave at
+    every await, so a slow fetch for one use case doesn't hold up predictions
+    for another, and cold-start warm-ups for the same error are shared
+    through single_flight. instrumentation records the same metrics as
+    MessageBus's.
+    """
+
+    translator: MessageTranslator
+    handler: CommandHandler
+    log: MessageLog = field(default_factory=RingBufferLog)
+    single_flight: SingleFlight = field(default_factory=SingleFlight)
+    instrumentation: Instrumentation | None = None
+
+    async def dispatch(
+        self, command: commands.Command
+    ) -> float | BatchPrediction | None:
+        instrumentation: Instrumentation | None = self.instrumentation
+        if instrumentation is None or not instrumentation.sample_dispatch(command):
+            return await self._dispatch(command=command)
+        started: float = time.perf_counter()
+        try:
+            return await self._dispatch(command=command)
+        finally:
+            instrumentation.record(DISPATCH, command, time.perf_counter() - started)
+
+    async def _dispatch(
+        self, command: commands.Command
+    ) -> float | BatchPrediction | None:
+        current_command: commands.Command = command
+
+        while True:
+            self.log.append(current_command)
+            response: (
+                messages.Event | messages.Error | None
+            ) = await self.handler.ahandle(command=current_command)
+
+            if not response:
+                return None
+            if isinstance(response, messages.NewPrediction):
+                return response.prediction
+            if isinstance(response, messages.NewBatchPrediction):
+                return response.prediction
+
+            self.log.append(response)
+            next_command: commands.Command = self.translator.get_next_command(response)
+            if isinstance(response, messages.Error):
+                await self.single_flight.ado(
+                    key=warm_up_key(response),
+                    work=partial(self._warm_up, command=next_command),
+                )
+                if self.instrumentation is not None:
+                    self.instrumentation.increment(RETRIES)
+            else:
+                current_command = next_command
+
+    async def _warm_up(
+        self, command: commands.Command
+    ) -> float | BatchPrediction | None:
+        if self.instrumentation is not None:
+            self.instrumentation.increment(WARM_UPS)
+        return await self.dispatch(command=command)
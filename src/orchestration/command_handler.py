@@ -1,27 +1,121 @@
-from dataclasses import dataclass
-from typing import Callable
+import asyncio
+import inspect
+import time
+from collections.abc import Awaitable
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Callable, cast
 
 from src.orchestration import commands, messages
+from src.orchestration.instrumentation import HANDLE, Instrumentation
+from src.orchestration.routing import RoutingTable
+
+Response = messages.Event | messages.Error | None
+Handler = Callable[[commands.Command], Response | Awaitable[Response]]
+
+_RESPONSES = (messages.Event, messages.Error, type(None))
 
 
 @dataclass
 class CommandHandler:
-    handlers: dict[
-        type[commands.Command],
-        Callable[[commands.Command], messages.Event | messages.Error | None],
-    ]
-
-    def handle(
-        self, command: commands.Command
-    ) -> messages.Event | messages.Error | None:
-        handler = self.get_handler(command=command)
-        return handler(command)
-
-    def get_handler(
-        self, command: commands.Command
-    ) -> Callable[[commands.Command], messages.Event | messages.Error | None]:
-        handler = self.handlers.get(type(command))
-        if not handler:
+    """
+    Routes each command to the handler registered for its type.
+
+    Handlers may be plain functions or async def functions (or functions
+    returning an awaitable). handle calls sync handlers directly and is for
+    sync handlers only; it raises TypeError for an async def handler without
+    calling it, and for any other handler that returns an awaitable, which
+    is closed unawaited. ahandle awaits async handlers on the event loop and
+    runs sync handlers in executor, the loop's default executor when unset,
+    so a blocking fetch doesn't stall other commands. Sync handlers for
+    command types in inline never block and are called on the loop directly,
+    as are, from their second call on, handlers seen returning an awaitable.
+
+    With instrumentation set, the time spent in each handler is recorded per
+    command type and use case.
+
+    A command whose type has no handler of its own goes to the handler of its
+    nearest base class that has one, and is inline if that base is. handlers
+    and inline are compiled into a routing table on construction; changes to
+    them afterwards are not seen.
+    """
+
+    handlers: dict[type[commands.Command], Handler]
+    executor: Executor | None = None
+    inline: frozenset[type[commands.Command]] = field(default_factory=frozenset)
+    instrumentation: Instrumentation | None = None
+    # Each route is (handler, inline, is_async), checked once here rather than
+    # on every handle.
+    _routes: RoutingTable[tuple[Handler, bool, bool]] = field(init=False, repr=False)
+    # Command types whose handler returned an awaitable, such as a lambda
+    # wrapping an async call, which is not itself a coroutine function.
+    _returns_awaitable: set[type[commands.Command]] = field(
+        default_factory=set, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        self._routes = RoutingTable(
+            {
+                command_type: (
+                    handler,
+                    command_type in self.inline,
+                    inspect.iscoroutinefunction(handler),
+                )
+                for command_type, handler in self.handlers.items()
+            }
+        )
+
+    def handle(self, command: commands.Command) -> Response:
+        handler, _, is_async = self._route(command=command)
+        if is_async:
+            msg = f"Handler for {command} is async, use ahandle."
+            raise TypeError(msg)
+        instrumentation: Instrumentation | None = self.instrumentation
+        if instrumentation is None or not instrumentation.sample_handle(command):
+            response = handler(command)
+        else:
+            started: float = time.perf_counter()
+            try:
+                response = handler(command)
+            finally:
+                instrumentation.record(HANDLE, command, time.perf_counter() - started)
+        if not isinstance(response, _RESPONSES) and inspect.isawaitable(response):
+            close = getattr(response, "close", None)
+            if close is not None:
+                close()
+            msg = f"Handler for {command} returned an awaitable, use ahandle."
+            raise TypeError(msg)
+        return cast(Response, response)
+
+    async def ahandle(self, command: commands.Command) -> Response:
+        instrumentation: Instrumentation | None = self.instrumentation
+        if instrumentation is None or not instrumentation.sample_handle(command):
+            return await self._ahandle(command=command)
+        started: float = time.perf_counter()
+        try:
+            return await self._ahandle(command=command)
+        finally:
+            instrumentation.record(HANDLE, command, time.perf_counter() - started)
+
+    async def _ahandle(self, command: commands.Command) -> Response:
+        handler, inline, is_async = self._route(command=command)
+        if inline or is_async or type(command) in self._returns_awaitable:
+            response = handler(command)
+        else:
+            response = await asyncio.get_running_loop().run_in_executor(
+                self.executor, handler, command
+            )
+        if inspect.isawaitable(response):
+            self._returns_awaitable.add(type(command))
+            response = await response
+        return response
+
+    def get_handler(self, command: commands.Command) -> Handler:
+        return self._route(command=command)[0]
+
+    def _route(self, command: commands.Command) -> tuple[Handler, bool, bool]:
+        route = self._routes.lookup(type(command))
+        if route is None:
             msg = f"No handler exists for command: {command}"
             raise NotImplementedError(msg)
-        return handler
+        return route
@@ -1,53 +1,74 @@
 from src.orchestration import messages
 from src.common import shared_types, models
+from src.common.features import FeatureDelta
 from dataclasses import dataclass
+from collections.abc import Sequence
 
 
 class Command(messages.Message):
     """What you want to do."""
 
-    ...
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class GetPrediction(Command):
     use_case: shared_types.UseCase
     user_id: shared_types.UserId
 
 
-@dataclass
+@dataclass(slots=True)
 class PublishModelForInference(Command):
     use_case: shared_types.UseCase
 
 
-@dataclass
+@dataclass(slots=True)
 class AddModelForInference(Command):
     use_case: shared_types.UseCase
     model: models.Model
 
 
-@dataclass
+@dataclass(slots=True)
 class AddFeaturesForInference(Command):
     use_case: shared_types.UseCase
     feature_set: shared_types.FeatureSet
+    version: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class TrainModel(Command):
     use_case: shared_types.UseCase
 
 
-@dataclass
+@dataclass(slots=True)
 class AddModelToRegistry(Command):
     use_case: shared_types.UseCase
     model: models.Model
 
 
-@dataclass
+@dataclass(slots=True)
 class PublishTrainingFeatures(Command):
     use_case: shared_types.UseCase
 
 
-@dataclass
+@dataclass(slots=True)
 class PublishInferenceFeatures(Command):
     use_case: shared_types.UseCase
+
+
+@dataclass(slots=True)
+class GetBatchPrediction(Command):
+    use_case: shared_types.UseCase
+    user_ids: Sequence[shared_types.UserId]
+
+
+@dataclass(slots=True)
+class PublishInferenceFeatureDelta(Command):
+    use_case: shared_types.UseCase
+    since_version: int
+
+
+@dataclass(slots=True)
+class ApplyFeatureDeltaForInference(Command):
+    use_case: shared_types.UseCase
+    delta: FeatureDelta
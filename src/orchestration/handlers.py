@@ -1,6 +1,9 @@
+from collections.abc import Sequence
 from typing import Protocol
 from src.common import shared_types
 from src.common import exceptions, models
+from src.common.features import FeatureDelta
+from src.common.predictions import BatchPrediction
 from src.orchestration import commands, messages
 
 
@@ -8,6 +11,12 @@ class CanGetPrediction(Protocol):
     def get_prediction(self, user_id: str, use_case: str) -> float: ...
 
 
+class CanGetPredictions(Protocol):
+    def get_predictions(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> BatchPrediction: ...
+
+
 class CanGetModel(Protocol):
     def get_model(self, use_case: str) -> models.Model: ...
 
@@ -24,10 +33,27 @@ class CanGetCurrentFeatureSet(Protocol):
         use_case: shared_types.UseCase,
     ) -> shared_types.FeatureSet: ...
 
+    def get_current_feature_version(self, use_case: shared_types.UseCase) -> int: ...
+
+
+class CanGetCurrentFeatureDelta(CanGetCurrentFeatureSet, Protocol):
+    def get_current_feature_delta(
+        self, use_case: shared_types.UseCase, since_version: int
+    ) -> FeatureDelta: ...
+
 
 class CanAddFeatureSet(Protocol):
     def add_feature_set(
-        self, use_case: shared_types.UseCase, feature_set: shared_types.FeatureSet
+        self,
+        use_case: shared_types.UseCase,
+        feature_set: shared_types.FeatureSet,
+        version: int = 0,
+    ) -> None: ...
+
+
+class CanApplyFeatureDelta(Protocol):
+    def apply_feature_delta(
+        self, use_case: shared_types.UseCase, delta: FeatureDelta
     ) -> None: ...
 
 
@@ -43,6 +69,20 @@ def get_prediction(cmd: commands.GetPrediction, predictor: CanGetPrediction):
     return messages.NewPrediction(prediction=prediction)
 
 
+def get_batch_prediction(
+    cmd: commands.GetBatchPrediction, predictor: CanGetPredictions
+):
+    try:
+        prediction: BatchPrediction = predictor.get_predictions(
+            user_ids=cmd.user_ids, use_case=cmd.use_case
+        )
+    except exceptions.ModelNotFound:
+        return messages.ModelNotFound(use_case=cmd.use_case)
+    except exceptions.FeatureSetNotFound:
+        return messages.InferenceMissingFeatures(use_case=cmd.use_case)
+    return messages.NewBatchPrediction(prediction=prediction)
+
+
 def publish_model_for_inference(
     cmd: commands.PublishModelForInference, model_registry: CanGetModel
 ) -> messages.NewModelForInference:
@@ -56,14 +96,23 @@ def add_model_for_inference(
     model_registry.add_model(use_case=cmd.use_case, model=cmd.model)
 
 
+def add_model_to_registry(
+    cmd: commands.AddModelToRegistry, model_registry: CanAddModel
+) -> None:
+    model_registry.add_model(use_case=cmd.use_case, model=cmd.model)
+
+
 def publish_features_for_inference(
     cmd: commands.PublishInferenceFeatures, feature_store: CanGetCurrentFeatureSet
 ) -> messages.NewFeaturesForInference:
+    # Read the version first: changes landing before the copy is taken are
+    # replayed by the next delta, and upserts/deletes are idempotent.
+    version: int = feature_store.get_current_feature_version(use_case=cmd.use_case)
     feature_set: shared_types.FeatureSet = feature_store.get_current_feature_set(
         use_case=cmd.use_case
     )
     return messages.NewFeaturesForInference(
-        use_case=cmd.use_case, feature_set=feature_set
+        use_case=cmd.use_case, feature_set=feature_set, version=version
     )
 
 
@@ -71,5 +120,32 @@ def add_features_for_inference(
     cmd: commands.AddFeaturesForInference, feature_repository: CanAddFeatureSet
 ) -> None:
     feature_repository.add_feature_set(
-        use_case=cmd.use_case, feature_set=cmd.feature_set
+        use_case=cmd.use_case, feature_set=cmd.feature_set, version=cmd.version
     )
+
+
+def publish_feature_delta_for_inference(
+    cmd: commands.PublishInferenceFeatureDelta,
+    feature_store: CanGetCurrentFeatureDelta,
+) -> messages.NewFeatureDeltaForInference | messages.NewFeaturesForInference:
+    try:
+        delta: FeatureDelta = feature_store.get_current_feature_delta(
+            use_case=cmd.use_case, since_version=cmd.since_version
+        )
+    except exceptions.FeatureDeltaUnavailable:
+        return publish_features_for_inference(
+            cmd=commands.PublishInferenceFeatures(use_case=cmd.use_case),
+            feature_store=feature_store,
+        )
+    return messages.NewFeatureDeltaForInference(use_case=cmd.use_case, delta=delta)
+
+
+def apply_feature_delta_for_inference(
+    cmd: commands.ApplyFeatureDeltaForInference,
+    feature_repository: CanApplyFeatureDelta,
+) -> messages.InferenceMissingFeatures | None:
+    try:
+        feature_repository.apply_feature_delta(use_case=cmd.use_case, delta=cmd.delta)
+    except exceptions.FeatureSetNotFound:
+        return messages.InferenceMissingFeatures(use_case=cmd.use_case)
+    return None
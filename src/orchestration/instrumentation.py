@@ -0,0 +1,302 @@
+import itertools
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Protocol, TextIO
+
+from src.common import shared_types
+
+# Bucket i counts latencies below 2**i microseconds; the last is unbounded.
+N_BUCKETS = 28
+
+HANDLE = "handle"
+DISPATCH = "dispatch"
+WARM_UPS = "warm_ups"
+RETRIES = "retries"
+
+# (stage, command type name, use case); use case is None for commands without one.
+MetricKey = tuple[str, str, shared_types.UseCase | None]
+_RecordKey = tuple[str, type, shared_types.UseCase | None]
+
+
+class _Histogram:
+    """Log2-bucketed latency histogram, written by a single thread."""
+
+    __slots__ = ("buckets", "count", "max", "total")
+
+    def __init__(self) -> None:
+        self.buckets: list[int] = [0] * N_BUCKETS
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+
+@dataclass(frozen=True)
+class HistogramSnapshot:
+    count: int
+    total_seconds: float
+    max_seconds: float
+    buckets: tuple[int, ...]
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Upper bound, in seconds, of the bucket holding the q-th percentile."""
+        if not self.count:
+            return 0.0
+        rank: float = self.count * q / 100
+        seen: int = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(2**bucket / 1e6, self.max_seconds)
+        return self.max_seconds
+
+    @classmethod
+    def merge(cls, histograms: Iterable["HistogramSnapshot"]) -> "HistogramSnapshot":
+        histograms = list(histograms)
+        return cls(
+            count=sum(histogram.count for histogram in histograms),
+            total_seconds=sum(histogram.total_seconds for histogram in histograms),
+            max_seconds=max(
+                (histogram.max_seconds for histogram in histograms), default=0.0
+            ),
+            buckets=tuple(
+                sum(counts)
+                for counts in zip(
+                    *(histogram.buckets for histogram in histograms),
+                    strict=True,
+                )
+            )
+            if histograms
+            else (0,) * N_BUCKETS,
+        )
+
+
+# Instrumentation times one call in this many unless told otherwise.
+DEFAULT_SAMPLE_EVERY = 16
+
+
+@dataclass(frozen=True)
+class InstrumentationSnapshot:
+    histograms: dict[MetricKey, HistogramSnapshot]
+    counters: dict[str, int]
+    taken_at: float
+    sample_every: int = 1
+
+    def by_command(self, stage: str = HANDLE) -> dict[str, HistogramSnapshot]:
+        """Histograms for one stage, merged across use cases."""
+        grouped: dict[str, list[HistogramSnapshot]] = {}
+        for (key_stage, command_type, _), histogram in self.histograms.items():
+            if key_stage == stage:
+                grouped.setdefault(command_type, []).append(histogram)
+        return {
+            command_type: HistogramSnapshot.merge(histograms)
+            for command_type, histograms in grouped.items()
+        }
+
+    def format(self) -> str:
+        lines: list[str] = []
+        for (stage, command_type, use_case), histogram in sorted(
+            self.histograms.items(), key=lambda item: tuple(map(str, item[0]))
+        ):
+            lines.append(
+                f"{stage} {command_type} use_case={use_case} "
+                f"count={histogram.count} "
+                f"mean={histogram.mean_seconds * 1e3:.3f}ms "
+                f"p50={histogram.percentile(50) * 1e3:.3f}ms "
+                f"p99={histogram.percentile(99) * 1e3:.3f}ms "
+                f"max={histogram.max_seconds * 1e3:.3f}ms"
+            )
+        for name, count in sorted(self.counters.items()):
+            lines.append(f"counter {name}={count}")
+        return "\n".join(lines)
+
+
+class _ThreadStats:
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self) -> None:
+        self.histograms: dict[_RecordKey, _Histogram] = {}
+        self.counters: dict[str, int] = {}
+
+
+class Instrumentation:
+    """
+    Latency histograms and counters for CommandHandler and MessageBus.
+
+    Every thread records into its own histograms, so the hot path takes no
+    locks; the only lock guards registering a thread the first time it
+    records. snapshot merges all threads' data, and may miss records that are
+    in flight while it runs.
+
+    Timing costs about a microsecond per record, over 10% of a warm
+    dispatch. So callers time one handle and one dispatch in every
+    sample_every of each command type (checked with sample_handle and
+    sample_dispatch), 16 by default, which keeps the overhead to about 1%;
+    histogram counts are then sample counts. Each type's first call is
+    timed, so rare commands such as warm-ups aren't crowded out by hot
+    ones. Set sample_every to 1 to time every call. Counters are always
+    exact.
+    """
+
+    def __init__(self, sample_every: int = DEFAULT_SAMPLE_EVERY) -> None:
+        if sample_every < 1:
+            raise ValueError(f"sample_every must be positive, got {sample_every}.")
+        self.sample_every: int = sample_every
+        self._handle_samplers: dict[type, Callable[[], bool]] = {}
+        self._dispatch_samplers: dict[type, Callable[[], bool]] = {}
+        self._local = threading.local()
+        self._threads: list[_ThreadStats] = []
+        self._register_lock = threading.Lock()
+
+    def sample_handle(self, command: object) -> bool:
+        """Whether to time this handle of command."""
+        sampler: Callable[[], bool] | None = self._handle_samplers.get(
+            command.__class__
+        )
+        if sampler is None:
+            sampler = self._handle_samplers.setdefault(
+                command.__class__, self._sampler()
+            )
+        return sampler()
+
+    def sample_dispatch(self, command: object) -> bool:
+        """Whether to time this dispatch of command."""
+        sampler: Callable[[], bool] | None = self._dispatch_samplers.get(
+            command.__class__
+        )
+        if sampler is None:
+            sampler = self._dispatch_samplers.setdefault(
+                command.__class__, self._sampler()
+            )
+        return sampler()
+
+    def record(self, stage: str, command: object, seconds: float) -> None:
+        """Record seconds spent on command, keyed by its type and use case."""
+        try:
+            histograms: dict[_RecordKey, _Histogram] = self._local.histograms
+        except AttributeError:
+            histograms = self._register().histograms
+        key: _RecordKey = (
+            stage,
+            command.__class__,
+            getattr(command, "use_case", None),
+        )
+        histogram: _Histogram | None = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = _Histogram()
+
+        # Inlined rather than a _Histogram method: this runs twice per command.
+        bucket: int = int(seconds * 1e6).bit_length()
+        histogram.buckets[bucket if bucket < N_BUCKETS else N_BUCKETS - 1] += 1
+        histogram.count += 1
+        histogram.total += seconds
+        histogram.max = max(histogram.max, seconds)
+
+    def increment(self, name: str, count: int = 1) -> None:
+        try:
+            counters: dict[str, int] = self._local.counters
+        except AttributeError:
+            counters = self._register().counters
+        counters[name] = counters.get(name, 0) + count
+
+    def snapshot(self) -> InstrumentationSnapshot:
+        with self._register_lock:
+            threads: list[_ThreadStats] = list(self._threads)
+
+        histograms: dict[MetricKey, list[HistogramSnapshot]] = {}
+        counters: dict[str, int] = {}
+        for stats in threads:
+            for (stage, command_type, use_case), histogram in list(
+                stats.histograms.items()
+            ):
+                key: MetricKey = (stage, command_type.__name__, use_case)
+                histograms.setdefault(key, []).append(
+                    HistogramSnapshot(
+                        count=histogram.count,
+                        total_seconds=histogram.total,
+                        max_seconds=histogram.max,
+                        buckets=tuple(histogram.buckets),
+                    )
+                )
+            for name, count in list(stats.counters.items()):
+                counters[name] = counters.get(name, 0) + count
+
+        return InstrumentationSnapshot(
+            histograms={
+                key: HistogramSnapshot.merge(snapshots)
+                for key, snapshots in histograms.items()
+            },
+            counters=counters,
+            taken_at=time.time(),
+            sample_every=self.sample_every,
+        )
+
+    def _sampler(self) -> Callable[[], bool]:
+        # One per command type, shared across threads: racing calls can shift
+        # which calls are sampled, never the rate. setdefault keeps a racing
+        # registration from replacing one already in use.
+        return itertools.cycle([True] + [False] * (self.sample_every - 1)).__next__
+
+    def _register(self) -> _ThreadStats:
+        stats = _ThreadStats()
+        with self._register_lock:
+            self._threads.append(stats)
+        self._local.histograms = stats.histograms
+        self._local.counters = stats.counters
+        return stats
+
+
+class InstrumentationSink(Protocol):
+    def emit(self, snapshot: InstrumentationSnapshot) -> None: ...
+
+
+@dataclass
+class TextSink:
+    """Writes each snapshot as plain text lines."""
+
+    stream: TextIO = field(default_factory=lambda: sys.stderr)
+
+    def emit(self, snapshot: InstrumentationSnapshot) -> None:
+        self.stream.write(snapshot.format() + "\n")
+        self.stream.flush()
+
+
+@dataclass
+class PeriodicReporter:
+    """Sends a snapshot to every sink each interval_seconds from a daemon thread."""
+
+    instrumentation: Instrumentation
+    sinks: list[InstrumentationSink]
+    interval_seconds: float = 60.0
+    _stopped: threading.Event = field(
+        default_factory=threading.Event, init=False, repr=False
+    )
+    _thread: threading.Thread | None = field(default=None, init=False, repr=False)
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop reporting, emitting one final snapshot."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.report()
+
+    def report(self) -> None:
+        snapshot: InstrumentationSnapshot = self.instrumentation.snapshot()
+        for sink in self.sinks:
+            sink.emit(snapshot)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval_seconds):
+            self.report()
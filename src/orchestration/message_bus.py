@@ -1,37 +1,102 @@
-from collections import deque
-from dataclasses import dataclass, field
+import time
+from collections.abc import Hashable
+from dataclasses import dataclass, field, fields, is_dataclass
+from functools import partial
 
+from src.common.predictions import BatchPrediction
 from src.orchestration import commands
 from src.orchestration import messages
 from src.orchestration.command_handler import CommandHandler
+from src.orchestration.instrumentation import (
+    DISPATCH,
+    RETRIES,
+    WARM_UPS,
+    Instrumentation,
+)
+from src.orchestration.message_log import MessageLog, RingBufferLog
+from src.orchestration.single_flight import SingleFlight
 from src.orchestration.translator import MessageTranslator
 
 
 @dataclass
 class MessageBus:
+    """
+    Dispatches a command and resolves the errors it raises.
+
+    An error is resolved by running the command the translator gives for it,
+    along with the chain of events and commands that follows, before retrying
+    the failed command. Concurrent dispatches that hit the same error, such as
+    ModelNotFound for one use case during a cold start, share a single run of
+    that warm-up chain. single_flight.stats.coalesced counts the callers that
+    waited for another caller's run instead of starting their own.
+
+    With instrumentation set, end-to-end dispatch time is recorded per command
+    type and use case, warm-up chains included, along with counts of warm-ups
+    run and commands retried.
+
+    Every command handled and non-prediction response is appended to log. The
+    default keeps the last 1024 and replaces messages carrying models or
+    feature sets with compact records, so a long-running bus neither grows
+    without bound nor keeps superseded payloads alive.
+    """
+
     translator: MessageTranslator
     handler: CommandHandler
-    log: list[messages.Message] = field(default_factory=list)
+    log: MessageLog = field(default_factory=RingBufferLog)
+    single_flight: SingleFlight = field(default_factory=SingleFlight)
+    instrumentation: Instrumentation | None = None
 
-    def dispatch(self, command: commands.Command) -> float | None:
-        remaining_queue: deque[commands.Command] = deque([command])
+    def dispatch(self, command: commands.Command) -> float | BatchPrediction | None:
+        instrumentation: Instrumentation | None = self.instrumentation
+        if instrumentation is None or not instrumentation.sample_dispatch(command):
+            return self._dispatch(command=command)
+        started: float = time.perf_counter()
+        try:
+            return self._dispatch(command=command)
+        finally:
+            instrumentation.record(DISPATCH, command, time.perf_counter() - started)
 
-        while remaining_queue:
-            current_command: commands.Command = remaining_queue.popleft()
+    def _dispatch(self, command: commands.Command) -> float | BatchPrediction | None:
+        # Each response leads to at most one command, so the chain is followed
+        # in a loop rather than a queue.
+        current_command: commands.Command = command
+        while True:
             self.log.append(current_command)
 
             response: messages.Event | messages.Error | None = self.handler.handle(
                 command=current_command
             )
 
-            if response:
-                if isinstance(response, messages.NewPrediction):
-                    return response.prediction
+            if not response:
+                return None
+            if isinstance(
+                response, (messages.NewPrediction, messages.NewBatchPrediction)
+            ):
+                return response.prediction
+
+            self.log.append(response)
+            next_command = self.translator.get_next_command(response)
+            if isinstance(response, messages.Error):
+                self.single_flight.do(
+                    key=warm_up_key(response),
+                    work=partial(self._warm_up, command=next_command),
+                )
+                if self.instrumentation is not None:
+                    self.instrumentation.increment(RETRIES)
+            else:
+                current_command = next_command
+
+    def _warm_up(self, command: commands.Command) -> float | BatchPrediction | None:
+        if self.instrumentation is not None:
+            self.instrumentation.increment(WARM_UPS)
+        return self.dispatch(command=command)
 
-                self.log.append(response)
-                next_command = self.translator.get_next_command(response)
-                if isinstance(response, messages.Error):
-                    remaining_queue.appendleft(current_command)
-                remaining_queue.appendleft(next_command)
 
-        return None
+def warm_up_key(error: messages.Error) -> Hashable:
+    """Errors of the same type with the same fields share a warm-up."""
+    if not is_dataclass(error):
+        return (type(error), *vars(error).values())
+    return (
+        type(error),
+        *(getattr(error, error_field.name) for error_field in fields(error)),
+    )
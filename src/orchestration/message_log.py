@@ -0,0 +1,213 @@
+import abc
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, fields, is_dataclass
+from pathlib import Path
+from typing import Any
+
+from src.orchestration import messages
+
+Scalar = str | int | float | bool | None
+_SCALARS = (str, int, float, bool, type(None))
+
+
+@dataclass(frozen=True, slots=True)
+class MessageRecord:
+    """
+    Compact stand-in for a message that carries a payload.
+
+    Scalar fields are kept; anything else, such as a model or feature set, is
+    replaced by its type name so the record holds no reference to it.
+    """
+
+    message_type: str
+    fields: tuple[tuple[str, Scalar], ...]
+    logged_at: float
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "message_type": self.message_type,
+            "fields": dict(self.fields),
+            "logged_at": self.logged_at,
+        }
+
+    @classmethod
+    def from_dict(cls, record: dict[str, Any]) -> "MessageRecord":
+        return cls(
+            message_type=record["message_type"],
+            fields=tuple(record["fields"].items()),
+            logged_at=record["logged_at"],
+        )
+
+
+def to_record(message: messages.Message) -> MessageRecord:
+    values: dict[str, Any] = {
+        name: getattr(message, name) for name in _field_names(type(message)) or ()
+    }
+    return MessageRecord(
+        message_type=type(message).__name__,
+        fields=tuple(
+            (
+                name,
+                value if isinstance(value, _SCALARS) else f"<{type(value).__name__}>",
+            )
+            for name, value in values.items()
+        ),
+        logged_at=time.time(),
+    )
+
+
+def compact(message: messages.Message) -> messages.Message | MessageRecord:
+    """The message itself if it holds only scalars, else its MessageRecord."""
+    names: tuple[str, ...] | None = _field_names(type(message))
+    if names is not None and all(
+        isinstance(getattr(message, name), _SCALARS) for name in names
+    ):
+        return message
+    return to_record(message)
+
+
+@functools.cache
+def _field_names(message_type: type) -> tuple[str, ...] | None:
+    # Cached per type: compact runs for every message the bus logs.
+    if not is_dataclass(message_type):
+        return None
+    return tuple(message_field.name for message_field in fields(message_type))
+
+
+class MessageLog(abc.ABC):
+    """Where MessageBus records every command it handles and response it gets."""
+
+    @abc.abstractmethod
+    def append(self, message: messages.Message) -> None: ...
+
+    @abc.abstractmethod
+    def __iter__(self) -> Iterator[messages.Message | MessageRecord]: ...
+
+    @abc.abstractmethod
+    def __len__(self) -> int: ...
+
+    @abc.abstractmethod
+    def clear(self) -> None: ...
+
+
+class NullLog(MessageLog):
+    """Keeps nothing."""
+
+    def append(self, message: messages.Message) -> None:
+        pass
+
+    def __iter__(self) -> Iterator[messages.Message | MessageRecord]:
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+    def clear(self) -> None:
+        pass
+
+
+class RingBufferLog(MessageLog):
+    """
+    The last capacity messages.
+
+    Messages carrying payloads are stored as MessageRecords unless
+    keep_payloads is set, so the log never pins a model or feature set that
+    inference has replaced.
+    """
+
+    def __init__(self, capacity: int = 1024, keep_payloads: bool = False) -> None:
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}.")
+        self.capacity: int = capacity
+        self.keep_payloads: bool = keep_payloads
+        self._messages: deque[messages.Message | MessageRecord] = deque(maxlen=capacity)
+
+    def append(self, message: messages.Message) -> None:
+        self._messages.append(message if self.keep_payloads else compact(message))
+
+    def __iter__(self) -> Iterator[messages.Message | MessageRecord]:
+        return iter(list(self._messages))
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def clear(self) -> None:
+        self._messages.clear()
+
+
+class SampledLog(MessageLog):
+    """Passes one message in every to another log."""
+
+    def __init__(self, log: MessageLog, every: int) -> None:
+        if every < 1:
+            raise ValueError(f"every must be positive, got {every}.")
+        self.log: MessageLog = log
+        self.every: int = every
+        self._sampled: Callable[[], bool] = itertools.cycle(
+            [True] + [False] * (every - 1)
+        ).__next__
+
+    def append(self, message: messages.Message) -> None:
+        if self._sampled():
+            self.log.append(message)
+
+    def __iter__(self) -> Iterator[messages.Message | MessageRecord]:
+        return iter(self.log)
+
+    def __len__(self) -> int:
+        return len(self.log)
+
+    def clear(self) -> None:
+        self.log.clear()
+
+
+class JournalLog(MessageLog):
+    """
+    Append-only journal of MessageRecords, one JSON object per line.
+
+    Memory use is constant however long the bus runs; iterating reads the
+    journal back from disk.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+        self._count: int = sum(1 for _ in self._read())
+
+    def append(self, message: messages.Message) -> None:
+        line: str = json.dumps(to_record(message).as_dict())
+        with self._lock:
+            self._file.write(line + "\n")
+            self._count += 1
+
+    def __iter__(self) -> Iterator[MessageRecord]:
+        with self._lock:
+            self._file.flush()
+        return (MessageRecord.from_dict(record) for record in self._read())
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._file.truncate(0)
+            self._count = 0
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _read(self) -> Iterator[dict[str, Any]]:
+        if not self.path.exists():
+            return
+        with self.path.open(encoding="utf-8") as journal:
+            for line in journal:
+                yield json.loads(line)
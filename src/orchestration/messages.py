@@ -1,77 +1,97 @@
 from dataclasses import dataclass
 from src.common import models
 from src.common import shared_types
+from src.common.features import FeatureDelta
+from src.common.predictions import BatchPrediction
 
 
-class Message: ...
+class Message:
+    # Concrete messages are slotted dataclasses but not frozen: a frozen
+    # __init__ sets fields through object.__setattr__, which doubles the
+    # cost of building one on the request path, and a frozen dataclass
+    # can't be subclassed by a plain one. Treat messages as immutable once
+    # sent all the same.
+    __slots__ = ()
 
 
 class Command(Message):
     """What you want to do."""
 
-    ...
+    __slots__ = ()
 
 
 class Event(Message):
     """What happened."""
 
-    ...
+    __slots__ = ()
 
 
 class Error(Message):
     """What went wrong."""
 
-    ...
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class NewPrediction(Event):
     prediction: float
 
 
-@dataclass
+@dataclass(slots=True)
+class NewBatchPrediction(Event):
+    prediction: BatchPrediction
+
+
+@dataclass(slots=True)
 class ModelNotFound(Error):
     use_case: shared_types.UseCase
 
 
-@dataclass
+@dataclass(slots=True)
 class NewModelForInference(Event):
     use_case: shared_types.UseCase
     model: models.Model
 
 
-@dataclass
+@dataclass(slots=True)
 class InferenceMissingFeatures(Error):
     use_case: shared_types.UseCase
 
 
-@dataclass
+@dataclass(slots=True)
 class NewFeaturesForInference(Event):
     use_case: shared_types.UseCase
     feature_set: shared_types.FeatureSet
+    version: int = 0
+
+
+@dataclass(slots=True)
+class NewFeatureDeltaForInference(Event):
+    use_case: shared_types.UseCase
+    delta: FeatureDelta
 
 
-@dataclass
+@dataclass(slots=True)
 class ModelRequiresTraining(Error):
     use_case: shared_types.UseCase
 
 
-@dataclass
+@dataclass(slots=True)
 class NewTrainedModel(Event):
     use_case: shared_types.UseCase
     model: models.Model
 
 
-@dataclass
+@dataclass(slots=True)
 class ModelTrainingMissingFeatures(Error):
     use_case: shared_types.UseCase
 
 
-@dataclass
+@dataclass(slots=True)
 class NewTrainingFeatures(Event):
     feature_set: shared_types.FeatureSet
 
 
-@dataclass
+@dataclass(slots=True)
 class NewInferenceFeatures(Event):
     feature_set: shared_types.FeatureSet
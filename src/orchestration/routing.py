@@ -0,0 +1,37 @@
+from collections.abc import Mapping
+from typing import Generic, TypeVar
+
+Route = TypeVar("Route")
+
+
+class RoutingTable(Generic[Route]):
+    """
+    Maps message types to routes, resolving subclasses through their MRO.
+
+    A type with no route of its own takes the route of its nearest base that
+    has one. Each type's resolution, including having no route, is cached the
+    first time it is looked up, so routing a message is a single dict lookup
+    however many routes there are.
+    """
+
+    def __init__(self, routes: Mapping[type, Route]) -> None:
+        self._routes: dict[type, Route] = dict(routes)
+        self._resolved: dict[type, Route | None] = dict(self._routes)
+
+    def lookup(self, message_type: type) -> Route | None:
+        try:
+            return self._resolved[message_type]
+        except KeyError:
+            return self._resolve(message_type)
+
+    def _resolve(self, message_type: type) -> Route | None:
+        route: Route | None = next(
+            (
+                self._routes[base]
+                for base in message_type.__mro__
+                if base in self._routes
+            ),
+            None,
+        )
+        self._resolved[message_type] = route
+        return route
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+# Keys whose calls the current task leads, inherited by tasks it starts.
+_leading: ContextVar[frozenset[Hashable]] = ContextVar("leading", default=frozenset())
+
+
+@dataclass
+class SingleFlightStats:
+    leaders: int = 0
+    coalesced: int = 0
+
+
+@dataclass
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    while it is in flight wait for the leader's result, or its exception,
+    instead of repeating the work. Once the leader finishes the key is
+    released, so the next caller starts a fresh call.
+
+    Calls are tracked with concurrent.futures.Future, which threads can block
+    on and asyncio tasks can await, so do and ado share in-flight calls.
+
+    A call that would wait on itself raises RuntimeError instead of
+    deadlocking: do checks whether the leader is the calling thread, ado
+    whether the calling task, or a task it started, leads the key.
+    """
+
+    stats: SingleFlightStats = field(default_factory=SingleFlightStats)
+    _in_flight: dict[Hashable, Future] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _leader_threads: dict[Hashable, int] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def do(self, key: Hashable, work: Callable[[], Any]) -> Any:
+        future, is_leader = self._join(key)
+        if not is_leader:
+            if self._leader_threads.get(key) == threading.get_ident():
+                msg = f"Call for {key} waits on itself."
+                raise RuntimeError(msg)
+            return future.result()
+
+        try:
+            result = work()
+        except BaseException as error:
+            self._finish(key, future, error=error)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def ado(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        leading: frozenset[Hashable] = _leading.get()
+        if key in leading:
+            msg = f"Call for {key} waits on itself."
+            raise RuntimeError(msg)
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return await asyncio.wrap_future(future)
+
+        token = _leading.set(leading | {key})
+        try:
+            result = await work()
+        except BaseException as error:
+            self._finish(key, future, error=error)
+            raise
+        finally:
+            _leading.reset(token)
+        self._finish(key, future, result=result)
+        return result
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            future: Future | None = self._in_flight.get(key)
+            if future is not None:
+                self.stats.coalesced += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self._leader_threads[key] = threading.get_ident()
+            self.stats.leaders += 1
+            return future, True
+
+    def _finish(
+        self,
+        key: Hashable,
+        future: Future,
+        result: Any = None,
+        error: BaseException | None = None,
+    ) -> None:
+        with self._lock:
+            del self._in_flight[key]
+            del self._leader_threads[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
@@ -1,29 +1,51 @@
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
 
 from src.orchestration import commands
 from src.orchestration import messages
+from src.orchestration.routing import RoutingTable
+
+NEXT_COMMANDS: dict[type[messages.Message], Callable[[Any], commands.Command]] = {
+    messages.ModelNotFound: lambda message: commands.PublishModelForInference(
+        use_case=message.use_case
+    ),
+    messages.NewModelForInference: lambda message: commands.AddModelForInference(
+        use_case=message.use_case, model=message.model
+    ),
+    messages.InferenceMissingFeatures: lambda message: (
+        commands.PublishInferenceFeatures(use_case=message.use_case)
+    ),
+    messages.NewFeaturesForInference: lambda message: commands.AddFeaturesForInference(
+        use_case=message.use_case,
+        feature_set=message.feature_set,
+        version=message.version,
+    ),
+    messages.NewFeatureDeltaForInference: lambda message: (
+        commands.ApplyFeatureDeltaForInference(
+            use_case=message.use_case, delta=message.delta
+        )
+    ),
+}
 
 
 @dataclass
 class MessageTranslator:
+    """
+    Gives the command that follows each event or error.
+
+    Subclasses of a message type follow on like the type itself.
+    """
+
+    routes: RoutingTable[Callable[[Any], commands.Command]] = field(
+        default_factory=lambda: RoutingTable(NEXT_COMMANDS), repr=False
+    )
+
     def get_next_command(
         self, message: messages.Event | messages.Error
     ) -> commands.Command:
-        match message:
-            case messages.ModelNotFound():
-                return commands.PublishModelForInference(use_case=message.use_case)
-            case messages.NewModelForInference():
-                return commands.AddModelForInference(
-                    use_case=message.use_case, model=message.model
-                )
-
-            case messages.InferenceMissingFeatures():
-                return commands.PublishInferenceFeatures(use_case=message.use_case)
-
-            case messages.NewFeaturesForInference():
-                return commands.AddFeaturesForInference(
-                    use_case=message.use_case, feature_set=message.feature_set
-                )
-            case _:
-                msg = f"No command available for message: {message}"
-                raise NotImplementedError(msg)
+        next_command = self.routes.lookup(type(message))
+        if next_command is None:
+            msg = f"No command available for message: {message}"
+            raise NotImplementedError(msg)
+        return next_command(message)
@@ -0,0 +1,337 @@
+import json
+import os
+import pickle
+import shutil
+import struct
+import threading
+import uuid
+import zlib
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from src.common import shared_types
+from src.common.feature_files import COLUMN_MAJOR, FeatureFile, write_feature_file
+from src.common.features import FeatureTable
+from src.services.features.feature_store import InMemoryFeatureStore
+
+SNAPSHOTS_DIRECTORY = "snapshots"
+CURRENT_SNAPSHOT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+LOG_SUFFIX = ".wal"
+
+UPSERT = "upsert"
+UPDATE = "update"
+DELETE = "delete"
+
+# Every log record is framed as payload length and CRC-32, then the payload.
+_FRAME = struct.Struct("<II")
+
+
+class WriteAheadLog:
+    """
+    Append-only log of pickled records in numbered segment files.
+
+    example directory structure:
+    root/
+        000001.wal
+        000002.wal    segment being appended to
+
+    Records are framed with their length and checksum, so a record torn by
+    a crash is detected on replay and cut off along with anything after it.
+    With sync set every append is fsynced before returning, surviving power
+    loss as well as process crashes.
+    """
+
+    def __init__(self, root: str | os.PathLike, sync: bool = False) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.sync: bool = sync
+        self.segment: int = max(self.segments(), default=1)
+        self._file: BinaryIO = self._open(self.segment)
+
+    def append(self, record: Any) -> None:
+        payload: bytes = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.write(_FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+
+    def rotate(self) -> int:
+        """Start a new segment, returning the number of the one just closed."""
+        self._file.close()
+        closed: int = self.segment
+        self.segment += 1
+        self._file = self._open(self.segment)
+        return closed
+
+    def replay(self, after_segment: int = 0) -> Iterator[Any]:
+        """Records from every segment numbered above after_segment, oldest first."""
+        for segment in sorted(self.segments()):
+            if segment > after_segment:
+                yield from self._read(self._path(segment))
+
+    def truncate_through(self, segment: int) -> None:
+        """Delete segments up to and including segment."""
+        for old_segment in self.segments():
+            if old_segment <= segment:
+                self._path(old_segment).unlink(missing_ok=True)
+
+    def segments(self) -> list[int]:
+        return [
+            int(path.stem)
+            for path in self.root.glob(f"*{LOG_SUFFIX}")
+            if path.stem.isdigit()
+        ]
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _open(self, segment: int) -> BinaryIO:
+        return self._path(segment).open("ab")
+
+    def _path(self, segment: int) -> Path:
+        return self.root / f"{segment:06d}{LOG_SUFFIX}"
+
+    def _read(self, path: Path) -> Iterator[Any]:
+        with path.open("rb") as segment:
+            valid_through: int = 0
+            while header := segment.read(_FRAME.size):
+                if len(header) < _FRAME.size:
+                    break
+                length, checksum = _FRAME.unpack(header)
+                payload: bytes = segment.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                valid_through = segment.tell()
+                yield pickle.loads(payload)
+        if valid_through < path.stat().st_size:
+            # A torn tail; drop it so later appends follow the last good record.
+            os.truncate(path, valid_through)
+
+
+@dataclass
+class DurableFeatureStore(InMemoryFeatureStore):
+    """
+    InMemoryFeatureStore whose current features survive restarts.
+
+    example directory structure:
+    root/
+        log/                    WriteAheadLog segments
+        snapshots/
+            CURRENT             name of the latest complete snapshot
+            000003/             covers log segments up to 000003
+                manifest.json   {"versions": {use_case: version}}
+                use_case_1/     (see src.common.feature_files.write_feature_file)
+                ...
+
+    Every upsert, update and delete of current features is appended to the
+    log once applied, before the call returns; calls that fail are not
+    logged. Features passed to the constructor seed a new root: they are
+    upserted, and so logged, after recovery finds nothing. Passing them for
+    a root that already holds features raises ValueError rather than
+    overwriting the recovered ones.
+
+    After snapshot_every logged mutations, the log rolls to a new segment,
+    and a background thread writes copies of all current features as a
+    snapshot covering the closed segments, then deletes those segments. The
+    mutation that crosses the threshold pays only for the copies; while a
+    snapshot is being written no other is started. An OSError writing one is
+    raised by the next snapshot or close.
+
+    Constructing a store over an existing root loads the latest snapshot
+    memory-mapped copy-on-write, so only the pages read are loaded and
+    writes stay in memory, then replays the log segments written since it.
+    Restart time is bounded by the snapshot and one snapshot interval of log,
+    not by the full history. Feature history and targets are not journaled.
+    """
+
+    root: str | os.PathLike = field(kw_only=True)
+    snapshot_every: int = field(default=10_000, kw_only=True)
+    sync: bool = field(default=False, kw_only=True)
+    _log: WriteAheadLog = field(init=False, repr=False)
+    _since_snapshot: int = field(default=0, init=False, repr=False)
+    _replaying: bool = field(default=False, init=False, repr=False)
+    _snapshotting: threading.Thread | None = field(default=None, init=False, repr=False)
+    _snapshot_error: OSError | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.snapshot_every < 1:
+            msg = f"snapshot_every must be positive, got {self.snapshot_every}."
+            raise ValueError(msg)
+        super().__post_init__()
+        self._log = WriteAheadLog(Path(self.root) / "log", sync=self.sync)
+        initial: dict[str, FeatureTable] = self.current_features
+        self.current_features = {}
+        self._recover()
+        if initial and self._versions:
+            self._log.close()
+            msg = (
+                f"{self.root} already holds current features; features can only "
+                "be passed to the constructor for a new root."
+            )
+            raise ValueError(msg)
+        for use_case, table in initial.items():
+            self.upsert_current_features(use_case=use_case, feature_set=table)
+
+    def upsert_current_features(
+        self,
+        use_case: str,
+        feature_set: shared_types.FeatureSet,
+        timestamp: float | None = None,
+    ) -> int:
+        version: int = super().upsert_current_features(
+            use_case=use_case, feature_set=feature_set, timestamp=timestamp
+        )
+        self._append(UPSERT, use_case, FeatureTable.from_feature_set(feature_set))
+        self._snapshot_if_due()
+        return version
+
+    def update_current_features(
+        self,
+        use_case: str,
+        feature_set: shared_types.FeatureSet,
+        timestamp: float | None = None,
+    ) -> int:
+        version: int = super().update_current_features(
+            use_case=use_case, feature_set=feature_set, timestamp=timestamp
+        )
+        self._append(UPDATE, use_case, FeatureTable.from_feature_set(feature_set))
+        self._snapshot_if_due()
+        return version
+
+    def delete_current_features(
+        self, use_case: str, user_ids: Iterable[shared_types.UserId]
+    ) -> int:
+        user_ids = tuple(user_ids)
+        version: int = super().delete_current_features(
+            use_case=use_case, user_ids=user_ids
+        )
+        self._append(DELETE, use_case, user_ids)
+        self._snapshot_if_due()
+        return version
+
+    def snapshot(self) -> None:
+        """Write every use case's current features and drop the log they cover."""
+        self._wait_for_snapshot()
+        self._write_snapshot(*self._begin_snapshot())
+
+    def close(self) -> None:
+        self._wait_for_snapshot()
+        self._log.close()
+
+    def _begin_snapshot(self) -> tuple[int, dict[str, FeatureTable], dict[str, int]]:
+        covered: int = self._log.rotate()
+        self._since_snapshot = 0
+        tables: dict[str, FeatureTable] = {
+            use_case: table.copy() for use_case, table in self.current_features.items()
+        }
+        return covered, tables, dict(self._versions)
+
+    def _write_snapshot(
+        self, covered: int, tables: dict[str, FeatureTable], versions: dict[str, int]
+    ) -> None:
+        snapshots: Path = Path(self.root) / SNAPSHOTS_DIRECTORY
+        directory: Path = snapshots / f"{covered:06d}"
+        staging: Path = snapshots / f".{uuid.uuid4().hex}.tmp"
+        staging.mkdir(parents=True)
+        try:
+            for use_case, table in tables.items():
+                # Column-major, so recovery adopts the mapped values as is.
+                write_feature_file(staging / use_case, table, layout=COLUMN_MAJOR)
+            (staging / MANIFEST_FILE).write_text(json.dumps({"versions": versions}))
+            staging.rename(directory)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        pointer: Path = snapshots / CURRENT_SNAPSHOT_FILE
+        pointer_staging: Path = snapshots / f".{CURRENT_SNAPSHOT_FILE}.tmp"
+        pointer_staging.write_text(directory.name)
+        os.replace(pointer_staging, pointer)
+
+        self._log.truncate_through(covered)
+        for old in snapshots.iterdir():
+            if old.name.isdigit() and int(old.name) < covered:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def _write_snapshot_in_background(
+        self, covered: int, tables: dict[str, FeatureTable], versions: dict[str, int]
+    ) -> None:
+        try:
+            self._write_snapshot(covered=covered, tables=tables, versions=versions)
+        except OSError as error:
+            self._snapshot_error = error
+
+    def _wait_for_snapshot(self) -> None:
+        if self._snapshotting is not None:
+            self._snapshotting.join()
+            self._snapshotting = None
+        error: OSError | None = self._snapshot_error
+        if error is not None:
+            self._snapshot_error = None
+            raise error
+
+    def _append(self, operation: str, use_case: str, payload: Any) -> None:
+        if self._replaying:
+            return
+        self._log.append((operation, use_case, payload))
+        self._since_snapshot += 1
+
+    def _snapshot_if_due(self) -> None:
+        if self._replaying or self._since_snapshot < self.snapshot_every:
+            return
+        if self._snapshotting is not None and self._snapshotting.is_alive():
+            return
+        self._snapshotting = threading.Thread(
+            target=self._write_snapshot_in_background,
+            args=self._begin_snapshot(),
+            daemon=True,
+        )
+        self._snapshotting.start()
+
+    def _recover(self) -> None:
+        covered: int = self._load_snapshot()
+        self._replaying = True
+        try:
+            for operation, use_case, payload in self._log.replay(after_segment=covered):
+                if operation == DELETE:
+                    self.delete_current_features(use_case=use_case, user_ids=payload)
+                elif operation == UPDATE:
+                    self.update_current_features(use_case=use_case, feature_set=payload)
+                else:
+                    self.upsert_current_features(use_case=use_case, feature_set=payload)
+                self._since_snapshot += 1
+        finally:
+            self._replaying = False
+
+    def _load_snapshot(self) -> int:
+        snapshots: Path = Path(self.root) / SNAPSHOTS_DIRECTORY
+        if snapshots.is_dir():
+            # Staging left behind by a snapshot cut short, e.g. when the
+            # process exited while its daemon thread was writing.
+            for staging in snapshots.glob(".*.tmp"):
+                if staging.is_dir():
+                    shutil.rmtree(staging, ignore_errors=True)
+                else:
+                    staging.unlink(missing_ok=True)
+        try:
+            name: str = (snapshots / CURRENT_SNAPSHOT_FILE).read_text()
+        except FileNotFoundError:
+            return 0
+
+        directory: Path = snapshots / name
+        manifest: dict[str, Any] = json.loads((directory / MANIFEST_FILE).read_text())
+        for use_case, version in manifest["versions"].items():
+            if (directory / use_case).exists():
+                feature_file = FeatureFile(directory / use_case, mmap_mode="c")
+                self.current_features[use_case] = FeatureTable.from_arrays(
+                    user_ids=feature_file.user_ids.tolist(),
+                    schema=feature_file.schema,
+                    values=feature_file.features,
+                )
+            self._versions[use_case] = version
+            # Changes before the snapshot are gone; older deltas are unavailable.
+            self._horizons[use_case] = version
+        return int(name)
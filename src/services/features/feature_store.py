@@ -1,5 +1,11 @@
-from collections.abc import Collection
-from src.common import shared_types
+from collections.abc import Collection, Iterable, Mapping, Sequence
+from itertools import takewhile
+
+import numpy as np
+
+from src.common import exceptions, shared_types
+from src.common.feature_history import FeatureHistory
+from src.common.features import FeatureDelta, FeatureMatrix, FeatureRow, FeatureTable
 from dataclasses import dataclass, field
 
 
@@ -26,21 +32,182 @@ class InMemoryFeatureStore:
         },
         ...
     }
+
+    Feature sets passed in this form are compiled into one columnar
+    FeatureTable per use case on construction; targets are kept as given.
+
+    get_current_feature_set hands out the live table without copying it; the
+    next upsert, update or delete on that use case copies the table first,
+    so a published feature set never changes under its reader.
+
+    Current feature sets are versioned. Every upsert or delete call bumps the
+    use case's version and records, per user, the version that last changed
+    it, so the changes since any retained version can be served as a delta.
+
+    Upserts and updates given a timestamp are also recorded in the use case's
+    FeatureHistory, from which get_features_as_of builds point-in-time
+    correct training sets: each label joined to the features as they were at
+    its time. An update is recorded as the updated users' whole vectors, not
+    only the features it set.
     """
 
-    current_features: dict[str, shared_types.FeatureSet] = field(default_factory=dict)
-    historical_features: dict[str, shared_types.FeatureSet] = field(
-        default_factory=dict
+    current_features: dict[str, FeatureTable] = field(default_factory=dict)
+    historical_features: dict[str, FeatureTable] = field(default_factory=dict)
+    targets: dict[str, dict[str, shared_types.Target]] = field(default_factory=dict)
+    feature_history: dict[str, FeatureHistory] = field(default_factory=dict)
+    _versions: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _upserted: dict[str, dict[shared_types.UserId, int]] = field(
+        default_factory=dict, init=False, repr=False
     )
-    targets: dict[str, dict[str, int | float]] = field(default_factory=dict)
+    _deleted: dict[str, dict[shared_types.UserId, int]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _horizons: dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _published: set[str] = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.current_features = _to_tables(self.current_features)
+        self.historical_features = _to_tables(self.historical_features)
 
     def get_current_features(
         self, user_id: str, use_case: str
     ) -> shared_types.FeatureVector:
         return self.current_features[use_case][user_id]
 
+    def get_current_features_batch(
+        self, user_ids: Sequence[shared_types.UserId], use_case: str
+    ) -> list[FeatureRow | None]:
+        """Current features aligned with user_ids, None for unknown users or use cases."""
+        table: FeatureTable | None = self.current_features.get(use_case)
+        if table is None:
+            return [None] * len(user_ids)
+        return table.get_rows(user_ids)
+
     def get_current_feature_set(self, use_case: str) -> shared_types.FeatureSet:
-        return self.current_features[use_case]
+        """Snapshot, unaffected by later upserts and deletes; copied on the next write."""
+        table: FeatureTable = self.current_features[use_case]
+        self._published.add(use_case)
+        return table
+
+    def get_current_feature_version(self, use_case: str) -> int:
+        return self._versions.get(use_case, 0)
+
+    def upsert_current_features(
+        self,
+        use_case: str,
+        feature_set: shared_types.FeatureSet,
+        timestamp: float | None = None,
+    ) -> int:
+        """Replace or add feature vectors for users, returning the new version."""
+        if timestamp is not None:
+            self.record_feature_history(
+                use_case=use_case, feature_set=feature_set, timestamp=timestamp
+            )
+        table: FeatureTable = self._writable_table(use_case)
+        version: int = self._next_version(use_case)
+        upserted: dict[shared_types.UserId, int] = self._upserted.setdefault(
+            use_case, {}
+        )
+        deleted: dict[shared_types.UserId, int] = self._deleted.setdefault(use_case, {})
+        for user_id, features in feature_set.items():
+            table.upsert(user_id=user_id, features=features)
+            _record(upserted, user_id=user_id, version=version)
+            deleted.pop(user_id, None)
+        return version
+
+    def update_current_features(
+        self,
+        use_case: str,
+        feature_set: shared_types.FeatureSet,
+        timestamp: float | None = None,
+    ) -> int:
+        """Set the given features for users, keeping their others, returning the new version."""
+        table: FeatureTable = self._writable_table(use_case)
+        version: int = self._next_version(use_case)
+        upserted: dict[shared_types.UserId, int] = self._upserted.setdefault(
+            use_case, {}
+        )
+        deleted: dict[shared_types.UserId, int] = self._deleted.setdefault(use_case, {})
+        for user_id, features in feature_set.items():
+            table.update(user_id=user_id, features=features)
+            _record(upserted, user_id=user_id, version=version)
+            deleted.pop(user_id, None)
+        if timestamp is not None:
+            self.feature_history.setdefault(use_case, FeatureHistory()).append_table(
+                table=table.subset(list(feature_set)), timestamp=timestamp
+            )
+        return version
+
+    def delete_current_features(
+        self, use_case: str, user_ids: Iterable[shared_types.UserId]
+    ) -> int:
+        """Remove users' current features, returning the new version."""
+        if use_case not in self.current_features:
+            raise KeyError(use_case)
+        table: FeatureTable = self._writable_table(use_case)
+        version: int = self._next_version(use_case)
+        upserted: dict[shared_types.UserId, int] = self._upserted.setdefault(
+            use_case, {}
+        )
+        deleted: dict[shared_types.UserId, int] = self._deleted.setdefault(use_case, {})
+        for user_id in user_ids:
+            if user_id in table:
+                table.delete(user_id)
+                _record(deleted, user_id=user_id, version=version)
+                upserted.pop(user_id, None)
+        return version
+
+    def get_current_feature_delta(
+        self, use_case: str, since_version: int
+    ) -> FeatureDelta:
+        """Upserts and deletes needed to bring a copy at since_version up to date."""
+        version: int = self.get_current_feature_version(use_case)
+        if not self._horizons.get(use_case, 0) <= since_version <= version:
+            msg = (
+                f"No delta for use case {use_case} from version {since_version}; "
+                f"changes are retained from version {self._horizons.get(use_case, 0)} "
+                f"to {version}."
+            )
+            raise exceptions.FeatureDeltaUnavailable(msg)
+
+        table: FeatureTable = self.current_features[use_case]
+        return FeatureDelta(
+            use_case=use_case,
+            from_version=since_version,
+            to_version=version,
+            upserts=table.subset(
+                _changed_since(self._upserted.get(use_case, {}), since_version)
+            ),
+            deletes=tuple(
+                _changed_since(self._deleted.get(use_case, {}), since_version)
+            ),
+        )
+
+    def forget_changes_before(self, use_case: str, version: int) -> None:
+        """Drop delete markers up to version; older deltas are then unavailable."""
+        deleted: dict[shared_types.UserId, int] = self._deleted.get(use_case, {})
+        for user_id in list(takewhile(lambda u: deleted[u] <= version, deleted)):
+            del deleted[user_id]
+        self._horizons[use_case] = max(self._horizons.get(use_case, 0), version)
+
+    def record_feature_history(
+        self, use_case: str, feature_set: shared_types.FeatureSet, timestamp: float
+    ) -> None:
+        """Record users' feature vectors as of timestamp, without touching current features."""
+        self.feature_history.setdefault(use_case, FeatureHistory()).append_table(
+            table=FeatureTable.from_feature_set(feature_set), timestamp=timestamp
+        )
+
+    def get_features_as_of(
+        self,
+        use_case: str,
+        user_ids: Sequence[shared_types.UserId],
+        timestamps: Sequence[float] | np.ndarray,
+    ) -> FeatureMatrix:
+        """Row i holds user_ids[i]'s features as recorded at or before timestamps[i]."""
+        return self.feature_history[use_case].as_of(
+            user_ids=user_ids, timestamps=timestamps
+        )
 
     def get_historical_features(
         self, user_id: str, use_case: str
@@ -52,3 +219,53 @@ class InMemoryFeatureStore:
 
     def get_target(self, user_id: str, use_case: str) -> int | float:
         return self.targets[use_case][user_id]
+
+    def get_current_table(self, use_case: str) -> FeatureTable:
+        """Columnar current features, for bulk consumers of matrix and column views."""
+        return self.current_features[use_case]
+
+    def get_historical_table(self, use_case: str) -> FeatureTable:
+        """Columnar historical features, for bulk consumers of matrix and column views."""
+        return self.historical_features[use_case]
+
+    def _writable_table(self, use_case: str) -> FeatureTable:
+        # Copy-on-write: a table handed out by get_current_feature_set is
+        # replaced by a private copy before its first change.
+        table: FeatureTable = self.current_features.setdefault(use_case, FeatureTable())
+        if use_case in self._published:
+            self._published.discard(use_case)
+            table = self.current_features[use_case] = table.copy()
+        return table
+
+    def _next_version(self, use_case: str) -> int:
+        self._versions[use_case] = self.get_current_feature_version(use_case) + 1
+        return self._versions[use_case]
+
+
+def _record(
+    changes: dict[shared_types.UserId, int], user_id: shared_types.UserId, version: int
+) -> None:
+    # Re-inserting keeps the dict ordered by version, oldest first.
+    changes.pop(user_id, None)
+    changes[user_id] = version
+
+
+def _changed_since(
+    changes: dict[shared_types.UserId, int], version: int
+) -> list[shared_types.UserId]:
+    return list(
+        takewhile(lambda user_id: changes[user_id] > version, reversed(changes))
+    )
+
+
+def _to_tables(
+    feature_sets: Mapping[str, shared_types.FeatureSet],
+) -> dict[str, FeatureTable]:
+    return {
+        use_case: (
+            feature_set
+            if isinstance(feature_set, FeatureTable)
+            else FeatureTable.from_feature_set(feature_set)
+        )
+        for use_case, feature_set in feature_sets.items()
+    }
@@ -0,0 +1,87 @@
+import os
+from collections.abc import Collection, Iterator, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from src.common import shared_types
+from src.common.feature_files import FeatureFile, write_feature_file
+from src.common.features import FeatureMatrix, FeatureTable
+
+
+@dataclass
+class MemoryMappedFeatureStore:
+    """
+    File-backed historical feature store.
+
+    example directory structure:
+    root/
+        use_case_1/    (see src.common.feature_files.write_feature_file)
+        use_case_2/
+        ...
+
+    Each use case is opened lazily and read through np.memmap, so historical
+    features never have to be resident alongside the serving process.
+    """
+
+    root: str | os.PathLike
+    _files: dict[shared_types.UseCase, FeatureFile] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def write_historical_features(
+        self,
+        use_case: str,
+        feature_set: shared_types.FeatureSet,
+        targets: Mapping[shared_types.UserId, shared_types.Target] | None = None,
+    ) -> None:
+        table: FeatureTable = (
+            feature_set
+            if isinstance(feature_set, FeatureTable)
+            else FeatureTable.from_feature_set(feature_set)
+        )
+        write_feature_file(Path(self.root) / use_case, table=table, targets=targets)
+        self._files.pop(use_case, None)
+
+    def get_historical_features(
+        self, user_id: str, use_case: str
+    ) -> shared_types.FeatureVector:
+        return self._file(use_case).get_row(user_id)
+
+    def get_user_ids(self, use_case: str) -> Collection[str]:
+        return _UserIds(self._file(use_case))
+
+    def get_target(self, user_id: str, use_case: str) -> int | float:
+        return self._file(use_case).get_target(user_id)
+
+    def count_users(self, use_case: str) -> int:
+        return len(self._file(use_case))
+
+    def read_rows(
+        self, use_case: str, start: int, stop: int
+    ) -> tuple[list[shared_types.UserId], FeatureMatrix, np.ndarray]:
+        """User ids, features and targets for rows [start, stop), read sequentially."""
+        return self._file(use_case).read_rows(start=start, stop=stop)
+
+    def _file(self, use_case: str) -> FeatureFile:
+        if use_case not in self._files:
+            directory: Path = Path(self.root) / use_case
+            if not directory.is_dir():
+                raise KeyError(use_case)
+            self._files[use_case] = FeatureFile(directory)
+        return self._files[use_case]
+
+
+@dataclass(frozen=True)
+class _UserIds(Collection[str]):
+    file: FeatureFile
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self.file
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.file)
+
+    def __len__(self) -> int:
+        return len(self.file)
@@ -0,0 +1,479 @@
+import multiprocessing
+import pickle
+import threading
+import zlib
+from collections.abc import Collection, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from multiprocessing.context import DefaultContext, ForkServerContext
+from multiprocessing.process import BaseProcess
+from typing import Any
+
+import numpy as np
+
+from src.common import exceptions, shared_types
+from src.common.features import (
+    FeatureDelta,
+    FeatureMatrix,
+    FeatureRow,
+    FeatureSchema,
+    FeatureTable,
+)
+from src.services.inference import repositories as inference_repositories
+from src.services.training import repositories as training_repositories
+
+
+def shard_of(user_id: shared_types.UserId, n_shards: int) -> int:
+    """Owning shard of a user; stable across processes, unlike hash()."""
+    return zlib.crc32(user_id.encode()) % n_shards
+
+
+@dataclass
+class ShardedFeatureRepository(inference_repositories.FeatureRepository):
+    """
+    Features and targets hash-partitioned by user id across worker processes.
+
+    Each of n_shards shards is a process holding its users' rows as
+    FeatureTables, served over a pipe. A single user's lookup goes straight
+    to the owning shard. A batch is split by shard and sent to every shard
+    involved before any reply is read, so the shards work in parallel; the
+    replies are gathered back into request order under one schema.
+    get_features_batch returns None for unknown users, as InferenceEngine
+    expects; ShardedTrainingRepository serves the same shards to training.
+
+    Writes are applied by each shard independently, so a batch read
+    concurrently with a delta may see it applied on some shards only. Any
+    error raised in a shard is sent back and raised to the caller. Call
+    close, or wrap the repository in contextlib.closing, to stop the shard
+    processes.
+    """
+
+    n_shards: int = 4
+    _connections: list[Connection] = field(default_factory=list, init=False, repr=False)
+    _processes: list[BaseProcess] = field(default_factory=list, init=False, repr=False)
+    _locks: list[threading.Lock] = field(default_factory=list, init=False, repr=False)
+    _versions: dict[shared_types.UseCase, int] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.n_shards < 1:
+            msg: str = f"n_shards must be positive, got {self.n_shards}."
+            raise ValueError(msg)
+        context = _worker_context()
+        for _ in range(self.n_shards):
+            connection, worker_connection = context.Pipe()
+            process: BaseProcess = context.Process(
+                target=_serve, args=(worker_connection,), daemon=True
+            )
+            process.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+            self._locks.append(threading.Lock())
+
+    def close(self) -> None:
+        for connection, process in zip(self._connections, self._processes):
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+            connection.close()
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._connections.clear()
+        self._processes.clear()
+
+    # Writes
+
+    def add_features(
+        self, use_case: str, feature_set: shared_types.FeatureSet, version: int = 0
+    ) -> None:
+        """Replace the use case's features, partitioning users across shards."""
+        table: FeatureTable = (
+            feature_set
+            if isinstance(feature_set, FeatureTable)
+            else FeatureTable.from_feature_set(feature_set)
+        )
+        self._scatter(
+            "add_features",
+            {
+                shard: {"use_case": use_case, "table": table.subset(user_ids)}
+                for shard, user_ids in self._partition(table.user_ids, all_shards=True)
+            },
+        )
+        self._versions[use_case] = version
+
+    def add_targets(
+        self, use_case: str, targets: Mapping[shared_types.UserId, shared_types.Target]
+    ) -> None:
+        partitioned: list[dict[shared_types.UserId, shared_types.Target]] = [
+            {} for _ in range(self.n_shards)
+        ]
+        for user_id, target in targets.items():
+            partitioned[shard_of(user_id, self.n_shards)][user_id] = target
+        self._scatter(
+            "add_targets",
+            {
+                shard: {"use_case": use_case, "targets": shard_targets}
+                for shard, shard_targets in enumerate(partitioned)
+            },
+        )
+
+    def apply_delta(self, use_case: str, delta: FeatureDelta) -> None:
+        version: int = self.get_version(use_case)
+        if delta.to_version <= version:
+            return
+        if delta.from_version > version:
+            msg: str = (
+                f"Features for use case {use_case} are at version "
+                f"{version}; delta starts at {delta.from_version}."
+            )
+            raise exceptions.FeatureSetOutOfDate(msg)
+        deletes: list[list[shared_types.UserId]] = [[] for _ in range(self.n_shards)]
+        for user_id in delta.deletes:
+            deletes[shard_of(user_id, self.n_shards)].append(user_id)
+        upserts: dict[int, list[shared_types.UserId]] = dict(
+            self._partition(delta.upserts.user_ids, all_shards=True)
+        )
+        self._scatter(
+            "apply_delta",
+            {
+                shard: {
+                    "use_case": use_case,
+                    "upserts": delta.upserts.subset(upserts[shard]),
+                    "deletes": deletes[shard],
+                }
+                for shard in range(self.n_shards)
+            },
+        )
+        self._versions[use_case] = delta.to_version
+
+    # Reads
+
+    def get_version(self, use_case: str) -> int:
+        version: int | None = self._versions.get(use_case)
+        if version is None:
+            msg: str = f"Use case {use_case} not found in features."
+            raise exceptions.FeatureSetNotFound(msg)
+        return version
+
+    def get_features(self, user_id: str, use_case: str) -> shared_types.FeatureVector:
+        self.get_version(use_case)
+        matrix, found = self._call(
+            shard_of(user_id, self.n_shards),
+            "get_rows",
+            use_case=use_case,
+            user_ids=[user_id],
+        )
+        if not found[0]:
+            msg: str = (
+                f"User ID: {user_id} not found in features for use case: {use_case}."
+            )
+            raise ValueError(msg)
+        return matrix[0]
+
+    def get_features_batch(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> list[shared_types.FeatureVector | None]:
+        """Rows aligned with user_ids, None for unknown users, sharing one schema."""
+        self.get_version(use_case)
+        positions: dict[int, list[int]] = {}
+        for position, user_id in enumerate(user_ids):
+            positions.setdefault(shard_of(user_id, self.n_shards), []).append(position)
+        replies: dict[int, tuple[FeatureMatrix, np.ndarray]] = self._scatter(
+            "get_rows",
+            {
+                shard: {
+                    "use_case": use_case,
+                    "user_ids": [user_ids[position] for position in shard_positions],
+                }
+                for shard, shard_positions in positions.items()
+            },
+        )
+
+        schema = FeatureSchema()
+        for matrix, _ in replies.values():
+            schema = schema.extend(matrix.schema)
+        batch: list[shared_types.FeatureVector | None] = [None] * len(user_ids)
+        for shard, (matrix, found) in replies.items():
+            values: np.ndarray = matrix.as_array(schema)
+            found_positions: list[int] = [
+                position
+                for position, is_found in zip(positions[shard], found)
+                if is_found
+            ]
+            for position, row in zip(found_positions, values):
+                batch[position] = FeatureRow(schema=schema, array=row)
+        return batch
+
+    def get_user_ids(self, use_case: str) -> Collection[str]:
+        """Every user, shard by shard."""
+        return [
+            user_id
+            for shard_user_ids in self._broadcast(
+                "get_user_ids", use_case=use_case
+            ).values()
+            for user_id in shard_user_ids
+        ]
+
+    def get_target(self, user_id: str, use_case: str) -> float:
+        [target] = self._call(
+            shard_of(user_id, self.n_shards),
+            "get_targets",
+            use_case=use_case,
+            user_ids=[user_id],
+        )
+        return float(target)
+
+    def get_targets(self, user_ids: Sequence[str], use_case: str) -> np.ndarray:
+        positions: dict[int, list[int]] = {}
+        for position, user_id in enumerate(user_ids):
+            positions.setdefault(shard_of(user_id, self.n_shards), []).append(position)
+        replies: dict[int, np.ndarray] = self._scatter(
+            "get_targets",
+            {
+                shard: {
+                    "use_case": use_case,
+                    "user_ids": [user_ids[position] for position in shard_positions],
+                }
+                for shard, shard_positions in positions.items()
+            },
+        )
+        targets: np.ndarray = np.empty(len(user_ids), dtype=np.float64)
+        for shard, shard_targets in replies.items():
+            targets[positions[shard]] = shard_targets
+        return targets
+
+    def iter_batches(
+        self, use_case: str, batch_size: int
+    ) -> Iterator[training_repositories.Batch]:
+        """Each shard's rows in storage order, shard by shard."""
+        for shard in range(self.n_shards):
+            n_users: int = self._call(shard, "n_users", use_case=use_case)
+            for start in range(0, n_users, batch_size):
+                yield self._call(
+                    shard,
+                    "read_rows",
+                    use_case=use_case,
+                    start=start,
+                    stop=start + batch_size,
+                )
+
+    def _partition(
+        self, user_ids: Sequence[shared_types.UserId], all_shards: bool = False
+    ) -> Iterator[tuple[int, list[shared_types.UserId]]]:
+        partitioned: list[list[shared_types.UserId]] = [
+            [] for _ in range(self.n_shards)
+        ]
+        for user_id in user_ids:
+            partitioned[shard_of(user_id, self.n_shards)].append(user_id)
+        for shard, shard_user_ids in enumerate(partitioned):
+            if shard_user_ids or all_shards:
+                yield shard, shard_user_ids
+
+    def _call(self, shard: int, method: str, **kwargs: Any) -> Any:
+        return self._scatter(method, {shard: kwargs})[shard]
+
+    def _broadcast(self, method: str, **kwargs: Any) -> dict[int, Any]:
+        return self._scatter(method, {shard: kwargs for shard in range(self.n_shards)})
+
+    def _scatter(
+        self, method: str, requests: Mapping[int, dict[str, Any]]
+    ) -> dict[int, Any]:
+        """Send every request, then collect every reply, raising the first error."""
+        shards: list[int] = sorted(requests)
+        # Locks are taken in shard order so concurrent scatters can't deadlock.
+        for shard in shards:
+            self._locks[shard].acquire()
+        try:
+            for shard in shards:
+                self._connections[shard].send((method, requests[shard]))
+            replies: dict[int, tuple[bool, Any]] = {
+                shard: self._connections[shard].recv() for shard in shards
+            }
+        finally:
+            for shard in shards:
+                self._locks[shard].release()
+
+        for succeeded, value in replies.values():
+            if not succeeded:
+                raise value
+        return {shard: value for shard, (_, value) in replies.items()}
+
+
+@dataclass
+class ShardedTrainingRepository(training_repositories.FeatureRepository):
+    """
+    Training view of a ShardedFeatureRepository's shards.
+
+    get_features_batch raises KeyError for unknown users, as training
+    expects, and iter_batches reads each shard's rows in storage order.
+
+    Known limit: shard pipes can't be pickled, so for_use_case, which ships
+    the repository to training worker processes, gathers the use case's
+    features and targets from every shard into one InMemoryFeatureRepository.
+    Each worker then holds a full copy of the use case in its own memory.
+    """
+
+    shards: ShardedFeatureRepository
+
+    def get_features(self, user_id: str, use_case: str) -> shared_types.FeatureVector:
+        return self.shards.get_features(user_id=user_id, use_case=use_case)
+
+    def get_features_batch(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> list[shared_types.FeatureVector]:
+        """Rows aligned with user_ids, sharing one schema; KeyError for unknown users."""
+        rows: list[shared_types.FeatureVector] = []
+        for user_id, row in zip(
+            user_ids,
+            self.shards.get_features_batch(user_ids=user_ids, use_case=use_case),
+        ):
+            if row is None:
+                msg: str = (
+                    f"User ID: {user_id} not found in features for use case: "
+                    f"{use_case}."
+                )
+                raise KeyError(msg)
+            rows.append(row)
+        return rows
+
+    def get_user_ids(self, use_case: str) -> Collection[str]:
+        return self.shards.get_user_ids(use_case=use_case)
+
+    def get_target(self, user_id: str, use_case: str) -> float:
+        return self.shards.get_target(user_id=user_id, use_case=use_case)
+
+    def get_targets(self, user_ids: Sequence[str], use_case: str) -> np.ndarray:
+        return self.shards.get_targets(user_ids=user_ids, use_case=use_case)
+
+    def iter_batches(
+        self, use_case: str, batch_size: int
+    ) -> Iterator[training_repositories.Batch]:
+        return self.shards.iter_batches(use_case=use_case, batch_size=batch_size)
+
+    def for_use_case(self, use_case: str) -> training_repositories.FeatureRepository:
+        user_ids: list[str] = list(self.get_user_ids(use_case=use_case))
+        rows: FeatureMatrix = FeatureMatrix.from_vectors(
+            self.get_features_batch(user_ids=user_ids, use_case=use_case)
+        )
+        targets: np.ndarray = self.get_targets(user_ids=user_ids, use_case=use_case)
+        return training_repositories.InMemoryFeatureRepository(
+            features={
+                use_case: FeatureTable.from_arrays(
+                    user_ids=user_ids, schema=rows.schema, values=rows.array
+                )
+            },
+            targets={use_case: dict(zip(user_ids, targets.tolist()))},
+        )
+
+
+class _Shard:
+    """One shard's data, living in its worker process."""
+
+    def __init__(self) -> None:
+        self.features: dict[shared_types.UseCase, FeatureTable] = {}
+        self.targets: dict[
+            shared_types.UseCase, dict[shared_types.UserId, shared_types.Target]
+        ] = {}
+
+    def add_features(self, use_case: str, table: FeatureTable) -> None:
+        self.features[use_case] = table
+
+    def add_targets(
+        self, use_case: str, targets: dict[shared_types.UserId, shared_types.Target]
+    ) -> None:
+        self.targets[use_case] = targets
+
+    def apply_delta(
+        self,
+        use_case: str,
+        upserts: FeatureTable,
+        deletes: Sequence[shared_types.UserId],
+    ) -> None:
+        table: FeatureTable = self.features.setdefault(use_case, FeatureTable())
+        for user_id in deletes:
+            if user_id in table:
+                table.delete(user_id)
+        for user_id in upserts:
+            table.upsert(user_id=user_id, features=upserts[user_id])
+
+    def get_rows(
+        self, use_case: str, user_ids: Sequence[shared_types.UserId]
+    ) -> tuple[FeatureMatrix, np.ndarray]:
+        """Rows of the known users among user_ids, and which ones were known."""
+        table: FeatureTable = self._table(use_case)
+        found: np.ndarray = np.fromiter(
+            (user_id in table for user_id in user_ids), dtype=bool, count=len(user_ids)
+        )
+        return table.take(
+            user_id for user_id, is_found in zip(user_ids, found) if is_found
+        ), found
+
+    def get_user_ids(self, use_case: str) -> list[shared_types.UserId]:
+        return list(self._table(use_case).user_ids)
+
+    def get_targets(
+        self, use_case: str, user_ids: Sequence[shared_types.UserId]
+    ) -> np.ndarray:
+        targets: dict[shared_types.UserId, shared_types.Target] = self.targets[use_case]
+        return np.fromiter(
+            (targets[user_id] for user_id in user_ids),
+            dtype=np.float64,
+            count=len(user_ids),
+        )
+
+    def n_users(self, use_case: str) -> int:
+        return self._table(use_case).n_users
+
+    def read_rows(
+        self, use_case: str, start: int, stop: int
+    ) -> training_repositories.Batch:
+        table: FeatureTable = self._table(use_case)
+        user_ids: list[shared_types.UserId] = list(table.user_ids[start:stop])
+        return (
+            user_ids,
+            FeatureMatrix(
+                schema=table.schema,
+                array=np.ascontiguousarray(table.matrix[start:stop]),
+            ),
+            self.get_targets(use_case=use_case, user_ids=user_ids),
+        )
+
+    def _table(self, use_case: str) -> FeatureTable:
+        table: FeatureTable | None = self.features.get(use_case)
+        if table is None:
+            msg: str = f"Use case {use_case} not found in features."
+            raise exceptions.FeatureSetNotFound(msg)
+        return table
+
+
+def _serve(connection: Connection) -> None:
+    shard = _Shard()
+    while True:
+        try:
+            request: tuple[str, dict[str, Any]] | None = connection.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        method, kwargs = request
+        try:
+            reply: tuple[bool, Any] = (True, getattr(shard, method)(**kwargs))
+        except Exception as error:  # noqa: BLE001 - raised again by the caller
+            reply = (False, error)
+        try:
+            connection.send(reply)
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            # Pickling fails before anything is written, so the pipe is intact.
+            connection.send((False, RuntimeError(f"Shard {method} reply: {error!r}")))
+
+
+def _worker_context() -> ForkServerContext | DefaultContext:
+    # As in training.data_parallel: a fork server starts clean shard processes
+    # even when the parent already runs threads.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context()
@@ -0,0 +1,232 @@
+import itertools
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from src.common import shared_types
+
+COUNT = "count"
+SUM = "sum"
+MEAN = "mean"
+AGGREGATIONS = (COUNT, SUM, MEAN)
+
+
+@dataclass(frozen=True, slots=True)
+class FeatureEvent:
+    """Raw values observed for a user at a time, in seconds since the epoch."""
+
+    use_case: shared_types.UseCase
+    user_id: shared_types.UserId
+    timestamp: float
+    values: Mapping[str, float]
+
+
+@dataclass(frozen=True)
+class WindowedAggregate:
+    """
+    Aggregations of one event value over a sliding window.
+
+    Each aggregation becomes the feature "{source}_{aggregation}_{window}s",
+    e.g. watch_seconds_sum_3600s.
+    """
+
+    source: str
+    window_seconds: float
+    aggregations: tuple[str, ...] = AGGREGATIONS
+
+    def __post_init__(self) -> None:
+        if self.window_seconds <= 0:
+            msg = f"window_seconds must be positive, got {self.window_seconds}."
+            raise ValueError(msg)
+        unknown: set[str] = set(self.aggregations) - set(AGGREGATIONS)
+        if unknown:
+            raise ValueError(f"Unknown aggregations {sorted(unknown)}.")
+
+    def feature_name(self, aggregation: str) -> shared_types.FeatureName:
+        return f"{self.source}_{aggregation}_{self.window_seconds:g}s"
+
+
+class _Window:
+    """Running count and sum of the values inside one user's window."""
+
+    __slots__ = ("count", "events", "total")
+
+    def __init__(self) -> None:
+        self.events: deque[tuple[float, float]] = deque()
+        self.count: int = 0
+        self.total: float = 0.0
+
+    def add(self, timestamp: float, value: float) -> None:
+        self.events.append((timestamp, value))
+        self.count += 1
+        self.total += value
+
+    def evict_before(self, start: float) -> None:
+        events = self.events
+        while events and events[0][0] < start:
+            _, value = events.popleft()
+            self.count -= 1
+            self.total -= value
+        if not events:
+            # Resets float drift accumulated by repeated adds and subtracts.
+            self.total = 0.0
+
+
+class CanUpdateCurrentFeatures(Protocol):
+    def update_current_features(
+        self, use_case: str, feature_set: shared_types.FeatureSet
+    ) -> int: ...
+
+
+@dataclass
+class StreamingAggregator:
+    """
+    Maintains windowed aggregates from a stream of raw FeatureEvents.
+
+    Every (use case, user, aggregate) keeps a deque of the events inside its
+    window with a running count and sum. An event is appended once and
+    evicted once, so each costs O(1) amortized however wide the window.
+    Windows slide on event time: adding an event evicts events older than
+    window_seconds before it. Events for a user are expected in time order;
+    events older than the user's window are dropped. expire slides every
+    window to a given time, so users with no new events age out too, and
+    forgets users whose windows are then all empty.
+
+    An empty window counts and sums to 0 but has no mean, so features leaves
+    the mean out rather than returning NaN: written with
+    update_current_features, a NaN would clear the stored mean instead. The
+    store keeps the last mean until the user has events again.
+    """
+
+    aggregates: Sequence[WindowedAggregate]
+    _windows: dict[tuple[shared_types.UseCase, shared_types.UserId], list[_Window]] = (
+        field(default_factory=dict, init=False, repr=False)
+    )
+
+    def add(self, event: FeatureEvent) -> bool:
+        """Fold event into its user's windows, returning whether any changed."""
+        key = (event.use_case, event.user_id)
+        windows: list[_Window] | None = self._windows.get(key)
+        changed: bool = False
+        for position, aggregate in enumerate(self.aggregates):
+            value: float | None = event.values.get(aggregate.source)
+            if value is None:
+                continue
+            if windows is None:
+                windows = self._windows[key] = [_Window() for _ in self.aggregates]
+            window: _Window = windows[position]
+            end: float = (
+                max(window.events[-1][0], event.timestamp)
+                if window.events
+                else event.timestamp
+            )
+            if event.timestamp < end - aggregate.window_seconds:
+                continue
+            window.evict_before(end - aggregate.window_seconds)
+            window.add(timestamp=event.timestamp, value=value)
+            changed = True
+        return changed
+
+    def expire(
+        self, now: float
+    ) -> set[tuple[shared_types.UseCase, shared_types.UserId]]:
+        """Slide every window to end at now, returning the users whose aggregates changed."""
+        changed: set[tuple[shared_types.UseCase, shared_types.UserId]] = set()
+        idle: list[tuple[shared_types.UseCase, shared_types.UserId]] = []
+        for key, windows in self._windows.items():
+            for aggregate, window in zip(self.aggregates, windows):
+                count: int = window.count
+                window.evict_before(now - aggregate.window_seconds)
+                if window.count != count:
+                    changed.add(key)
+            if not any(window.events for window in windows):
+                idle.append(key)
+        for key in idle:
+            del self._windows[key]
+        return changed
+
+    def features(
+        self, use_case: shared_types.UseCase, user_id: shared_types.UserId
+    ) -> dict[shared_types.FeatureName, float]:
+        """The user's current aggregates; empty windows count and sum to 0 and have no mean."""
+        windows: list[_Window] | None = self._windows.get((use_case, user_id))
+        features: dict[shared_types.FeatureName, float] = {}
+        for position, aggregate in enumerate(self.aggregates):
+            window: _Window | None = windows[position] if windows else None
+            count: int = window.count if window else 0
+            total: float = window.total if window else 0.0
+            for aggregation in aggregate.aggregations:
+                name: shared_types.FeatureName = aggregate.feature_name(aggregation)
+                if aggregation == COUNT:
+                    features[name] = count
+                elif aggregation == SUM:
+                    features[name] = total
+                elif count:
+                    features[name] = total / count
+        return features
+
+
+@dataclass
+class StreamingIngestion:
+    """
+    Streams raw events into a feature store's current features.
+
+    Events are consumed lazily in micro-batches of batch_size. Each batch is
+    folded into aggregator, then every user it touched has their aggregate
+    features written with one update_current_features call per use case, so
+    a batch bumps each use case's version once and inference picks the
+    changes up as a delta. Features not produced by aggregator are left as
+    they are.
+    """
+
+    aggregator: StreamingAggregator
+    feature_store: CanUpdateCurrentFeatures
+    batch_size: int = 1024
+
+    def __post_init__(self) -> None:
+        if self.batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {self.batch_size}.")
+
+    def ingest(self, events: Iterable[FeatureEvent]) -> int:
+        """Consume events until exhausted, returning how many were read."""
+        ingested: int = 0
+        for batch in micro_batches(events, size=self.batch_size):
+            changed: set[tuple[shared_types.UseCase, shared_types.UserId]] = {
+                (event.use_case, event.user_id)
+                for event in batch
+                if self.aggregator.add(event)
+            }
+            self._publish(changed)
+            ingested += len(batch)
+        return ingested
+
+    def expire(self, now: float) -> None:
+        """Age every window to now and publish the users whose aggregates changed."""
+        self._publish(self.aggregator.expire(now))
+
+    def _publish(
+        self, changed: Iterable[tuple[shared_types.UseCase, shared_types.UserId]]
+    ) -> None:
+        by_use_case: dict[shared_types.UseCase, list[shared_types.UserId]] = {}
+        for use_case, user_id in changed:
+            by_use_case.setdefault(use_case, []).append(user_id)
+        for use_case, user_ids in by_use_case.items():
+            self.feature_store.update_current_features(
+                use_case=use_case,
+                feature_set={
+                    user_id: self.aggregator.features(
+                        use_case=use_case, user_id=user_id
+                    )
+                    for user_id in user_ids
+                },
+            )
+
+
+def micro_batches(
+    events: Iterable[FeatureEvent], size: int
+) -> Iterator[list[FeatureEvent]]:
+    """Lists of up to size consecutive events, read lazily."""
+    iterator: Iterator[FeatureEvent] = iter(events)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
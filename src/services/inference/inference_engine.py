@@ -1,35 +1,311 @@
+import threading
+from collections.abc import Sequence
 from dataclasses import dataclass, field
-from src.common import shared_types
+
+import numpy as np
+
+from src.common import exceptions, shared_types
 from src.common import models
+from src.common.features import FeatureDelta, FeatureMatrix
+from src.common.predictions import BatchPrediction
+from src.services.inference.prediction_cache import ANY_USER, PredictionCache
+from src.services.inference.prediction_table import PredictionTable, StaleRows
 from src.services.inference.repositories import (
     FeatureRepository,
     ModelRepository,
+    InferenceSnapshot,
     InMemoryFeatureRepository,
     InMemoryModelRepository,
+    SnapshotRepository,
 )
 
 
 @dataclass
 class InferenceEngine:
+    """
+    Serves predictions from the models and features pushed to it.
+
+    An optional PredictionCache short-circuits repeated get_prediction calls;
+    adding a model or feature set invalidates the use case and applying a
+    feature delta invalidates just the users it touches. Batch predictions
+    are not cached.
+
+    Pass one SnapshotRepository as both repositories to have each request read
+    its model and features from a single snapshot, so hot swaps from other
+    threads never pair a model with another version's features.
+
+    With a PredictionTable set, materialize scores every given user of a use
+    case up front and predictions are then served from the table, ahead of
+    the cache. Adding a model or feature set marks the use case's rows stale
+    and applying a delta marks the rows of the users it touches; stale rows
+    are scored live until rescore, usually run by a PredictionRescorer,
+    writes them back.
+    """
+
     feature_repository: FeatureRepository = field(
         default_factory=InMemoryFeatureRepository
     )
     model_repository: ModelRepository = field(default_factory=InMemoryModelRepository)
+    prediction_cache: PredictionCache | None = None
+    prediction_table: PredictionTable | None = None
 
     def get_prediction(self, user_id: str, use_case: str) -> float:
-        model: models.Model = self.model_repository.get_model(use_case=use_case)
+        if self.prediction_table is not None:
+            materialized: float | None = self.prediction_table.get(
+                use_case=use_case, user_id=user_id
+            )
+            if materialized is not None:
+                return materialized
+
+        cache: PredictionCache | None = self.prediction_cache
+        if cache is None:
+            model_repository, feature_repository = self._pin(use_case)
+            model: models.Model = model_repository.get_model(use_case=use_case)
+            return self._predict(
+                model=model,
+                feature_repository=feature_repository,
+                user_id=user_id,
+                use_case=use_case,
+            )
+
+        # Read the epoch before the model and features so that a swap landing
+        # mid-prediction stops the result from being cached.
+        epoch: int = cache.epoch(use_case)
+        model_repository, feature_repository = self._pin(use_case)
+        model = model_repository.get_model(use_case=use_case)
+        cache_user_id: str | None = (
+            user_id if isinstance(model, models.RulesBasedModel) else ANY_USER
+        )
+        cached: float | None = cache.get(use_case=use_case, user_id=cache_user_id)
+        if cached is not None:
+            return cached
 
+        prediction: float = self._predict(
+            model=model,
+            feature_repository=feature_repository,
+            user_id=user_id,
+            use_case=use_case,
+        )
+        cache.put(
+            use_case=use_case,
+            user_id=cache_user_id,
+            prediction=prediction,
+            epoch=epoch,
+        )
+        return prediction
+
+    def _pin(
+        self, use_case: str
+    ) -> tuple[
+        ModelRepository | InferenceSnapshot, FeatureRepository | InferenceSnapshot
+    ]:
+        """Where one request reads its model and features from."""
+        if (
+            isinstance(self.model_repository, SnapshotRepository)
+            and self.feature_repository is self.model_repository
+        ):
+            snapshot: InferenceSnapshot = self.model_repository.get_snapshot(use_case)
+            return snapshot, snapshot
+        return self.model_repository, self.feature_repository
+
+    def _predict(
+        self,
+        model: models.Model,
+        feature_repository: FeatureRepository | InferenceSnapshot,
+        user_id: str,
+        use_case: str,
+    ) -> float:
         if isinstance(model, models.RulesBasedModel):
-            features: shared_types.FeatureVector = self.feature_repository.get_features(
+            features: shared_types.FeatureVector = feature_repository.get_features(
                 user_id=user_id, use_case=use_case
             )
             return model.predict(features=features)
         return model.predict()
 
+    def get_predictions(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> BatchPrediction:
+        if self.prediction_table is None:
+            return self._score(user_ids=user_ids, use_case=use_case)
+
+        predictions: np.ndarray = self.prediction_table.get_many(
+            use_case=use_case, user_ids=user_ids
+        )
+        pending: list[int] = np.flatnonzero(np.isnan(predictions)).tolist()
+        if not pending:
+            return BatchPrediction(user_ids=user_ids, predictions=predictions)
+        scored: BatchPrediction = self._score(
+            user_ids=[user_ids[row] for row in pending], use_case=use_case
+        )
+        predictions[pending] = scored.predictions
+        return BatchPrediction(
+            user_ids=user_ids,
+            predictions=predictions,
+            missing_user_ids=scored.missing_user_ids,
+        )
+
+    def materialize(self, use_case: str, user_ids: Sequence[str]) -> None:
+        """Score user_ids now and serve their predictions from the table."""
+        if self.prediction_table is None:
+            msg: str = "materialize needs a prediction_table."
+            raise ValueError(msg)
+        scored: BatchPrediction = self._score(user_ids=user_ids, use_case=use_case)
+        self.prediction_table.materialize(
+            use_case=use_case, user_ids=user_ids, predictions=scored.predictions
+        )
+
+    def rescore(self, use_case: str, max_rows: int | None = None) -> int:
+        """Re-score up to max_rows stale rows, returning how many were written."""
+        if self.prediction_table is None:
+            return 0
+        stale_rows: StaleRows = self.prediction_table.take_stale(
+            use_case=use_case, max_rows=max_rows
+        )
+        if not len(stale_rows):
+            return 0
+        try:
+            scored: BatchPrediction = self._score(
+                user_ids=stale_rows.user_ids, use_case=use_case
+            )
+        except (exceptions.ModelNotFound, exceptions.FeatureSetNotFound):
+            # Not servable yet; the rows stay stale until it is.
+            return 0
+        return self.prediction_table.update(
+            stale_rows=stale_rows, predictions=scored.predictions
+        )
+
+    def _score(self, user_ids: Sequence[str], use_case: str) -> BatchPrediction:
+        model_repository, feature_repository = self._pin(use_case)
+        model: models.Model = model_repository.get_model(use_case=use_case)
+        predictions: np.ndarray = np.full(len(user_ids), np.nan, dtype=np.float64)
+
+        if not isinstance(model, models.RulesBasedModel):
+            predictions[:] = model.predict()
+            return BatchPrediction(user_ids=user_ids, predictions=predictions)
+
+        batch: Sequence[shared_types.FeatureVector | None] = (
+            feature_repository.get_features_batch(user_ids=user_ids, use_case=use_case)
+        )
+        found_rows: list[int] = []
+        found_features: list[shared_types.FeatureVector] = []
+        missing_user_ids: list[str] = []
+        for row, (user_id, features) in enumerate(zip(user_ids, batch)):
+            if features is None:
+                missing_user_ids.append(user_id)
+            else:
+                found_rows.append(row)
+                found_features.append(features)
+
+        if found_rows:
+            predictions[found_rows] = model.predict_batch(
+                features=FeatureMatrix.from_vectors(found_features)
+            )
+        return BatchPrediction(
+            user_ids=user_ids,
+            predictions=predictions,
+            missing_user_ids=missing_user_ids,
+        )
+
     def add_model(self, use_case: shared_types.UseCase, model: models.Model) -> None:
         self.model_repository.add_model(use_case=use_case, model=model)
+        if self.prediction_cache is not None:
+            self.prediction_cache.invalidate_use_case(use_case)
+        if self.prediction_table is not None:
+            self.prediction_table.invalidate_use_case(use_case)
 
     def add_feature_set(
-        self, use_case: shared_types.UseCase, feature_set: shared_types.FeatureSet
+        self,
+        use_case: shared_types.UseCase,
+        feature_set: shared_types.FeatureSet,
+        version: int = 0,
+    ) -> None:
+        self.feature_repository.add_features(
+            use_case=use_case, feature_set=feature_set, version=version
+        )
+        if self.prediction_cache is not None:
+            self.prediction_cache.invalidate_use_case(use_case)
+        if self.prediction_table is not None:
+            self.prediction_table.invalidate_use_case(use_case)
+
+    def apply_feature_delta(
+        self, use_case: shared_types.UseCase, delta: FeatureDelta
     ) -> None:
-        self.feature_repository.add_features(use_case=use_case, feature_set=feature_set)
+        # A repository that catches up over missed deltas can't say which
+        # users they touched, so every prediction is suspect.
+        missed_deltas: bool = delta.from_version > self.feature_repository.get_version(
+            use_case=use_case
+        )
+        self.feature_repository.apply_delta(use_case=use_case, delta=delta)
+        if missed_deltas:
+            if self.prediction_cache is not None:
+                self.prediction_cache.invalidate_use_case(use_case)
+            if self.prediction_table is not None:
+                self.prediction_table.invalidate_use_case(use_case)
+            return
+        if self.prediction_cache is not None:
+            self.prediction_cache.invalidate_users(
+                use_case=use_case, user_ids=[*delta.upserts.user_ids, *delta.deletes]
+            )
+        if self.prediction_table is not None:
+            self.prediction_table.delete_users(
+                use_case=use_case, user_ids=delta.deletes
+            )
+            self.prediction_table.invalidate_users(
+                use_case=use_case, user_ids=delta.upserts.user_ids
+            )
+
+    def get_feature_version(self, use_case: shared_types.UseCase) -> int:
+        return self.feature_repository.get_version(use_case=use_case)
+
+
+@dataclass
+class PredictionRescorer:
+    """
+    Re-scores an InferenceEngine's stale materialized predictions from a
+    daemon thread.
+
+    Each pass re-scores up to batch_size rows per use case; when a pass finds
+    nothing to do the thread sleeps until rows are invalidated, checking again
+    at least every interval_seconds.
+    """
+
+    inference_engine: InferenceEngine
+    batch_size: int = 10_000
+    interval_seconds: float = 1.0
+    _stopped: threading.Event = field(
+        default_factory=threading.Event, init=False, repr=False
+    )
+    _thread: threading.Thread | None = field(default=None, init=False, repr=False)
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        table: PredictionTable | None = self.inference_engine.prediction_table
+        if table is not None:
+            table.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def rescore_all(self) -> int:
+        """One pass over every materialized use case."""
+        table: PredictionTable | None = self.inference_engine.prediction_table
+        if table is None:
+            return 0
+        return sum(
+            self.inference_engine.rescore(use_case=use_case, max_rows=self.batch_size)
+            for use_case in table.use_cases
+        )
+
+    def _run(self) -> None:
+        table: PredictionTable | None = self.inference_engine.prediction_table
+        while not self._stopped.is_set():
+            if not self.rescore_all():
+                if table is None:
+                    self._stopped.wait(self.interval_seconds)
+                else:
+                    table.wait_for_stale(self.interval_seconds)
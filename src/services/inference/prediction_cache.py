@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+from src.common import shared_types
+
+# Constant models predict the same value for every user, so they are cached
+# once per use case under this user id.
+ANY_USER: None = None
+
+CacheKey = tuple[shared_types.UseCase, shared_types.UserId | None]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups: int = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class PredictionCache:
+    """
+    Bounded LRU cache of predictions keyed by (use_case, user_id), with an
+    optional time-to-live.
+
+    Invalidating a use case bumps its generation, which drops its entries lazily
+    as they are next looked up or evicted. Invalidating users removes just those
+    entries. Every invalidation also bumps the use case's epoch; a prediction
+    computed before an invalidation carries the old epoch and is not stored.
+    """
+
+    capacity: int = 10_000
+    ttl_seconds: float | None = None
+    clock: Callable[[], float] = time.monotonic
+    stats: CacheStats = field(default_factory=CacheStats)
+    _entries: OrderedDict[CacheKey, tuple[float, float, int]] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _generations: dict[shared_types.UseCase, int] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _epochs: dict[shared_types.UseCase, int] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.capacity < 1:
+            raise ValueError(f"capacity must be positive, got {self.capacity}.")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def epoch(self, use_case: shared_types.UseCase) -> int:
+        return self._epochs.get(use_case, 0)
+
+    def get(
+        self, use_case: shared_types.UseCase, user_id: shared_types.UserId | None
+    ) -> float | None:
+        key: CacheKey = (use_case, user_id)
+        with self._lock:
+            entry: tuple[float, float, int] | None = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            prediction, stored_at, generation = entry
+            if generation != self._generations.get(use_case, 0):
+                del self._entries[key]
+                self.stats.misses += 1
+                return None
+            if (
+                self.ttl_seconds is not None
+                and self.clock() - stored_at > self.ttl_seconds
+            ):
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return prediction
+
+    def put(
+        self,
+        use_case: shared_types.UseCase,
+        user_id: shared_types.UserId | None,
+        prediction: float,
+        epoch: int,
+    ) -> None:
+        """Store a prediction computed when the use case was at epoch."""
+        key: CacheKey = (use_case, user_id)
+        with self._lock:
+            if epoch != self._epochs.get(use_case, 0):
+                return
+            self._entries[key] = (
+                prediction,
+                self.clock(),
+                self._generations.get(use_case, 0),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate_use_case(self, use_case: shared_types.UseCase) -> None:
+        with self._lock:
+            self._generations[use_case] = self._generations.get(use_case, 0) + 1
+            self._epochs[use_case] = self._epochs.get(use_case, 0) + 1
+            self.stats.invalidations += 1
+
+    def invalidate_users(
+        self,
+        use_case: shared_types.UseCase,
+        user_ids: Iterable[shared_types.UserId],
+    ) -> None:
+        with self._lock:
+            self._epochs[use_case] = self._epochs.get(use_case, 0) + 1
+            for user_id in user_ids:
+                if self._entries.pop((use_case, user_id), None) is not None:
+                    self.stats.invalidations += 1
@@ -0,0 +1,327 @@
+import math
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.common import shared_types
+from src.services.inference.prediction_cache import CacheStats
+
+
+@dataclass(frozen=True)
+class MaterializationReport:
+    """How far a use case's materialized predictions lag its model and features."""
+
+    use_case: shared_types.UseCase
+    n_users: int
+    n_stale: int
+    rescored_rows: int
+    max_staleness_seconds: float
+
+    @property
+    def stale_fraction(self) -> float:
+        return self.n_stale / self.n_users if self.n_users else 0.0
+
+    @property
+    def fresh_fraction(self) -> float:
+        return 1.0 - self.stale_fraction
+
+
+@dataclass(frozen=True)
+class StaleRows:
+    """Rows handed out for re-scoring, with the generations they were taken at."""
+
+    use_case: shared_types.UseCase
+    rows: np.ndarray
+    user_ids: list[shared_types.UserId]
+    generations: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+
+class _Materialized:
+    """One use case's predictions, one row per user in parallel arrays."""
+
+    __slots__ = (
+        "generations",
+        "predictions",
+        "rescored_rows",
+        "stale",
+        "stale_since",
+        "user_ids",
+        "user_index",
+    )
+
+    def __init__(
+        self, user_ids: Sequence[shared_types.UserId], predictions: np.ndarray
+    ) -> None:
+        n_users: int = len(user_ids)
+        self.user_ids: list[shared_types.UserId] = list(user_ids)
+        self.user_index: dict[shared_types.UserId, int] = {
+            user_id: row for row, user_id in enumerate(self.user_ids)
+        }
+        self.predictions: np.ndarray = np.asarray(predictions, dtype=np.float64).copy()
+        self.stale: np.ndarray = np.zeros(n_users, dtype=bool)
+        self.stale_since: np.ndarray = np.full(n_users, np.nan, dtype=np.float64)
+        self.generations: np.ndarray = np.zeros(n_users, dtype=np.int64)
+        self.rescored_rows: int = 0
+
+    def append(self, user_ids: Sequence[shared_types.UserId]) -> None:
+        """Add rows for new users, stale until they are first scored."""
+        start: int = len(self.user_ids)
+        n_new: int = len(user_ids)
+        # Grow the arrays before publishing the rows in the index, so lock-free
+        # readers finding a row always find it in the arrays they read.
+        self.predictions = np.concatenate(
+            [self.predictions, np.full(n_new, np.nan, dtype=np.float64)]
+        )
+        self.stale = np.concatenate([self.stale, np.ones(n_new, dtype=bool)])
+        self.stale_since = np.concatenate(
+            [self.stale_since, np.full(n_new, np.nan, dtype=np.float64)]
+        )
+        self.generations = np.concatenate(
+            [self.generations, np.zeros(n_new, dtype=np.int64)]
+        )
+        self.user_ids.extend(user_ids)
+        for row, user_id in enumerate(user_ids, start=start):
+            self.user_index[user_id] = row
+
+    def mark_stale(self, rows: np.ndarray | slice, now: float) -> None:
+        # Staleness is measured from the first change a row hasn't caught up with.
+        newly_stale: np.ndarray = ~self.stale[rows]
+        self.stale_since[rows] = np.where(newly_stale, now, self.stale_since[rows])
+        self.generations[rows] += 1
+        self.stale[rows] = True
+
+
+@dataclass
+class PredictionTable:
+    """
+    Predictions scored ahead of time for every user of a use case, served by
+    O(1) lookup.
+
+    Each materialized use case holds a user index and flat arrays of
+    predictions, stale flags and generations. Invalidating a use case, as on
+    a model change, marks every row stale; invalidating users marks just
+    their rows stale, adding rows for users not yet in the table. Deleting
+    users blanks the rows they have and adds none. Stale rows are not
+    served; they are taken by a re-scorer, scored, and written back unless
+    they were invalidated or deleted in the meantime, which bumps their
+    generation.
+
+    Lookups only lock to count hits and misses. A re-scored prediction is
+    written before its row is marked fresh, so a lookup never serves a stale
+    value as fresh.
+    """
+
+    clock: Callable[[], float] = time.monotonic
+    stats: CacheStats = field(default_factory=CacheStats)
+    _tables: dict[shared_types.UseCase, _Materialized] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+    _pending: threading.Event = field(
+        default_factory=threading.Event, init=False, repr=False
+    )
+
+    @property
+    def use_cases(self) -> list[shared_types.UseCase]:
+        return list(self._tables)
+
+    def materialize(
+        self,
+        use_case: shared_types.UseCase,
+        user_ids: Sequence[shared_types.UserId],
+        predictions: np.ndarray,
+    ) -> None:
+        """Replace the use case's table with predictions aligned with user_ids."""
+        if len(predictions) != len(user_ids):
+            msg: str = f"Got {len(predictions)} predictions for {len(user_ids)} users."
+            raise ValueError(msg)
+        table = _Materialized(user_ids=user_ids, predictions=predictions)
+        with self._lock:
+            self._tables[use_case] = table
+
+    def get(
+        self, use_case: shared_types.UseCase, user_id: shared_types.UserId
+    ) -> float | None:
+        """The materialized prediction, or None if the row is missing or stale."""
+        table: _Materialized | None = self._tables.get(use_case)
+        row: int | None = None if table is None else table.user_index.get(user_id)
+        prediction: float | None = None
+        if table is not None and row is not None and not table.stale[row]:
+            prediction = float(table.predictions[row])
+            if math.isnan(prediction):
+                # The user had no features when last scored, or was deleted.
+                prediction = None
+        with self._lock:
+            if prediction is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return prediction
+
+    def get_many(
+        self,
+        use_case: shared_types.UseCase,
+        user_ids: Sequence[shared_types.UserId],
+    ) -> np.ndarray:
+        """Predictions aligned with user_ids, NaN where get would return None."""
+        served: np.ndarray = np.full(len(user_ids), np.nan, dtype=np.float64)
+        table: _Materialized | None = self._tables.get(use_case)
+        if table is None:
+            with self._lock:
+                self.stats.misses += len(user_ids)
+            return served
+        index: dict[shared_types.UserId, int] = table.user_index
+        rows: np.ndarray = np.fromiter(
+            (index.get(user_id, -1) for user_id in user_ids),
+            dtype=np.intp,
+            count=len(user_ids),
+        )
+        known: np.ndarray = rows >= 0
+        known_rows: np.ndarray = rows[known]
+        stale: np.ndarray = table.stale[known_rows]
+        served[known] = np.where(stale, np.nan, table.predictions[known_rows])
+        hits: int = int(np.count_nonzero(~np.isnan(served)))
+        with self._lock:
+            self.stats.hits += hits
+            self.stats.misses += len(user_ids) - hits
+        return served
+
+    def invalidate_use_case(self, use_case: shared_types.UseCase) -> None:
+        with self._lock:
+            table: _Materialized | None = self._tables.get(use_case)
+            if table is None:
+                return
+            table.mark_stale(slice(None), now=self.clock())
+            self.stats.invalidations += 1
+        self._pending.set()
+
+    def invalidate_users(
+        self,
+        use_case: shared_types.UseCase,
+        user_ids: Iterable[shared_types.UserId],
+    ) -> None:
+        with self._lock:
+            table: _Materialized | None = self._tables.get(use_case)
+            if table is None:
+                return
+            new_user_ids: list[shared_types.UserId] = []
+            rows: list[int] = []
+            for user_id in dict.fromkeys(user_ids):
+                row: int | None = table.user_index.get(user_id)
+                if row is None:
+                    new_user_ids.append(user_id)
+                else:
+                    rows.append(row)
+            now: float = self.clock()
+            if new_user_ids:
+                start: int = len(table.user_ids)
+                table.append(new_user_ids)
+                table.stale_since[start:] = now
+            table.mark_stale(np.asarray(rows, dtype=np.intp), now=now)
+            self.stats.invalidations += len(rows) + len(new_user_ids)
+        self._pending.set()
+
+    def delete_users(
+        self,
+        use_case: shared_types.UseCase,
+        user_ids: Iterable[shared_types.UserId],
+    ) -> None:
+        """Stop serving the users' rows, without re-scoring them or adding rows."""
+        with self._lock:
+            table: _Materialized | None = self._tables.get(use_case)
+            if table is None:
+                return
+            rows: np.ndarray = np.fromiter(
+                (
+                    row
+                    for row in map(table.user_index.get, dict.fromkeys(user_ids))
+                    if row is not None
+                ),
+                dtype=np.intp,
+            )
+            # Blank the prediction before marking the row fresh, as update
+            # does; the bumped generation drops any re-scoring in flight.
+            table.predictions[rows] = np.nan
+            table.generations[rows] += 1
+            table.stale[rows] = False
+            table.stale_since[rows] = np.nan
+            self.stats.invalidations += len(rows)
+
+    def take_stale(
+        self, use_case: shared_types.UseCase, max_rows: int | None = None
+    ) -> StaleRows:
+        """Up to max_rows stale rows, oldest first, to be scored and passed to update."""
+        with self._lock:
+            table: _Materialized | None = self._tables.get(use_case)
+            if table is None:
+                rows: np.ndarray = np.empty(0, dtype=np.intp)
+                return StaleRows(use_case, rows, [], np.empty(0, dtype=np.int64))
+            rows = np.flatnonzero(table.stale)
+            if max_rows is not None and len(rows) > max_rows:
+                oldest: np.ndarray = np.argpartition(
+                    table.stale_since[rows], max_rows - 1
+                )[:max_rows]
+                rows = np.sort(rows[oldest])
+            return StaleRows(
+                use_case=use_case,
+                rows=rows,
+                user_ids=[table.user_ids[row] for row in rows],
+                generations=table.generations[rows].copy(),
+            )
+
+    def update(self, stale_rows: StaleRows, predictions: np.ndarray) -> int:
+        """Write re-scored predictions, skipping rows invalidated since taken."""
+        with self._lock:
+            table: _Materialized | None = self._tables.get(stale_rows.use_case)
+            if table is None:
+                return 0
+            current: np.ndarray = (
+                table.generations[stale_rows.rows] == stale_rows.generations
+            )
+            rows: np.ndarray = stale_rows.rows[current]
+            table.predictions[rows] = np.asarray(predictions)[current]
+            table.stale[rows] = False
+            table.stale_since[rows] = np.nan
+            table.rescored_rows += len(rows)
+            return len(rows)
+
+    def report(self, use_case: shared_types.UseCase) -> MaterializationReport:
+        with self._lock:
+            table: _Materialized | None = self._tables.get(use_case)
+            if table is None:
+                return MaterializationReport(
+                    use_case=use_case,
+                    n_users=0,
+                    n_stale=0,
+                    rescored_rows=0,
+                    max_staleness_seconds=0.0,
+                )
+            n_stale: int = int(np.count_nonzero(table.stale))
+            oldest: float = (
+                float(np.nanmin(table.stale_since[table.stale])) if n_stale else 0.0
+            )
+            return MaterializationReport(
+                use_case=use_case,
+                n_users=len(table.user_ids),
+                n_stale=n_stale,
+                rescored_rows=table.rescored_rows,
+                max_staleness_seconds=self.clock() - oldest if n_stale else 0.0,
+            )
+
+    def wait_for_stale(self, timeout: float | None = None) -> bool:
+        """Block until rows may have gone stale or timeout passes."""
+        pending: bool = self._pending.wait(timeout)
+        self._pending.clear()
+        return pending
+
+    def notify(self) -> None:
+        """Wake a re-scorer waiting in wait_for_stale."""
+        self._pending.set()
@@ -1,8 +1,24 @@
 import abc
+import threading
 
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass, field, replace
+from typing import Protocol
 
 from src.common import exceptions, shared_types, models
+from src.common.features import (
+    FeatureDelta,
+    FeatureRow,
+    FeatureSchema,
+    FeatureTable,
+    LayeredFeatureSet,
+)
+from src.services.inference.prediction_cache import CacheStats
+
+# Rough per-user cost of a cached row beyond its values: the key, the
+# FeatureRow and the LRU's links.
+ROW_OVERHEAD_BYTES = 256
 
 
 class FeatureRepository(abc.ABC):
@@ -12,8 +28,24 @@ class FeatureRepository(abc.ABC):
     ) -> shared_types.FeatureVector: ...
     @abc.abstractmethod
     def add_features(
-        self, use_case: str, feature_set: shared_types.FeatureSet
+        self, use_case: str, feature_set: shared_types.FeatureSet, version: int = 0
     ) -> None: ...
+    @abc.abstractmethod
+    def apply_delta(self, use_case: str, delta: FeatureDelta) -> None: ...
+    @abc.abstractmethod
+    def get_version(self, use_case: str) -> int: ...
+
+    def get_features_batch(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> Sequence[shared_types.FeatureVector | None]:
+        """Feature vectors aligned with user_ids, None where a user has no features."""
+        batch: list[shared_types.FeatureVector | None] = []
+        for user_id in user_ids:
+            try:
+                batch.append(self.get_features(user_id=user_id, use_case=use_case))
+            except ValueError:
+                batch.append(None)
+        return batch
 
 
 class ModelRepository(abc.ABC):
@@ -39,21 +71,402 @@ class InMemoryModelRepository(ModelRepository):
 
 @dataclass
 class InMemoryFeatureRepository(FeatureRepository):
-    features: shared_types.FeatureSets = field(default_factory=dict)
+    """
+    Feature sets are held as versioned LayeredFeatureSets; plain dict sets are
+    compiled into FeatureTables on add.
+
+    Writers build a new set and swap it in under a lock, so readers never lock
+    and never see a half-applied delta.
+    """
+
+    features: dict[shared_types.UseCase, LayeredFeatureSet] = field(
+        default_factory=dict
+    )
+    _write_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        self.features = {
+            use_case: _to_layered(feature_set)
+            for use_case, feature_set in self.features.items()
+        }
 
     def get_features(self, user_id: str, use_case: str) -> shared_types.FeatureVector:
-        if use_case not in self.features:
+        return _get_features(
+            feature_set=self._get_feature_set(use_case),
+            user_id=user_id,
+            use_case=use_case,
+        )
+
+    def get_features_batch(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> list[shared_types.FeatureVector | None]:
+        return list(self._get_feature_set(use_case).get_rows(user_ids))
+
+    def add_features(
+        self, use_case: str, feature_set: shared_types.FeatureSet, version: int = 0
+    ) -> None:
+        layered: LayeredFeatureSet = _to_layered(feature_set, version=version)
+        with self._write_lock:
+            self.features[use_case] = layered
+
+    def apply_delta(self, use_case: str, delta: FeatureDelta) -> None:
+        with self._write_lock:
+            self.features[use_case] = _apply_delta(
+                feature_set=self._get_feature_set(use_case),
+                use_case=use_case,
+                delta=delta,
+            )
+
+    def get_version(self, use_case: str) -> int:
+        return self._get_feature_set(use_case).version
+
+    def _get_feature_set(self, use_case: str) -> LayeredFeatureSet:
+        feature_set: LayeredFeatureSet | None = self.features.get(use_case)
+        if feature_set is None:
             msg: str = f"Use case {use_case} not found in features."
             raise exceptions.FeatureSetNotFound(msg)
-        feature_set: shared_types.FeatureSet = self.features[use_case]
+        return feature_set
+
+
+class FeatureSource(Protocol):
+    def get_current_features_batch(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> Sequence[shared_types.FeatureVector | None]: ...
+
+    def get_current_feature_version(self, use_case: str) -> int: ...
+
+
+@dataclass
+class LazyFeatureRepository(FeatureRepository):
+    """
+    Features fetched from source on demand and kept in a memory-budgeted LRU.
 
-        if user_id not in feature_set:
+    A lookup that misses fetches the user's vector, or a batch's missing
+    vectors in one call, from source; users source doesn't know are cached
+    as absent until the use case's version changes. Least recently used rows
+    are evicted once their estimated size passes max_bytes, so resident
+    memory follows the working set rather than the use case's size, and a
+    replica serves as soon as it starts.
+
+    A use case's version is read from source on first use. Deltas update the
+    rows they touch that are cached and advance the version; adding a whole
+    feature set drops the use case's cached rows and adopts its version,
+    since rows are refetched on demand. A delta that starts past the current
+    version means deltas were missed: rather than asking for a whole feature
+    set it would discard, the repository drops the use case's cached rows
+    and catches up to source's version, refetching only the users requested
+    afterwards. A fetch that races an invalidation is served but not cached.
+    """
+
+    source: FeatureSource
+    max_bytes: int = 256 * 1024 * 1024
+    stats: CacheStats = field(default_factory=CacheStats)
+    _rows: OrderedDict[tuple[str, str], FeatureRow | None] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _bytes: int = field(default=0, init=False, repr=False)
+    _absent: dict[shared_types.UseCase, set[shared_types.UserId]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _versions: dict[shared_types.UseCase, int] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _epochs: dict[shared_types.UseCase, int] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.max_bytes < 1:
+            raise ValueError(f"max_bytes must be positive, got {self.max_bytes}.")
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated size of the cached rows."""
+        return self._bytes
+
+    def get_features(self, user_id: str, use_case: str) -> shared_types.FeatureVector:
+        [features] = self.get_features_batch(user_ids=[user_id], use_case=use_case)
+        if features is None:
             msg: str = (
                 f"User ID: {user_id} not found in features for use case: {use_case}."
             )
             raise ValueError(msg)
+        return features
+
+    def get_features_batch(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> list[shared_types.FeatureVector | None]:
+        self.get_version(use_case)
+        batch: list[shared_types.FeatureVector | None] = [None] * len(user_ids)
+        missing: list[int] = []
+        with self._lock:
+            epoch: int = self._epochs.get(use_case, 0)
+            for position, user_id in enumerate(user_ids):
+                key: tuple[str, str] = (use_case, user_id)
+                if key in self._rows:
+                    self._rows.move_to_end(key)
+                    batch[position] = self._rows[key]
+                    self.stats.hits += 1
+                else:
+                    missing.append(position)
+                    self.stats.misses += 1
+        if not missing:
+            return batch
+
+        fetched: Sequence[shared_types.FeatureVector | None] = (
+            self.source.get_current_features_batch(
+                user_ids=[user_ids[position] for position in missing],
+                use_case=use_case,
+            )
+        )
+        rows: list[FeatureRow | None] = [
+            _to_row(features) if features is not None else None for features in fetched
+        ]
+        with self._lock:
+            cache: bool = self._epochs.get(use_case, 0) == epoch
+            for position, row in zip(missing, rows):
+                batch[position] = row
+                if cache:
+                    self._put((use_case, user_ids[position]), row)
+        return batch
+
+    def add_features(
+        self, use_case: str, feature_set: shared_types.FeatureSet, version: int = 0
+    ) -> None:
+        with self._lock:
+            self._invalidate_use_case(use_case)
+            self._versions[use_case] = version
+
+    def apply_delta(self, use_case: str, delta: FeatureDelta) -> None:
+        version: int = self.get_version(use_case)
+        if delta.from_version > version:
+            source_version: int = self.source.get_current_feature_version(use_case)
+            with self._lock:
+                self._invalidate_use_case(use_case)
+                self._versions[use_case] = max(source_version, delta.to_version)
+            return
+        with self._lock:
+            self._epochs[use_case] = self._epochs.get(use_case, 0) + 1
+            if delta.to_version > version:
+                self._drop_absent(use_case)
+            for user_id in delta.upserts:
+                if (use_case, user_id) in self._rows:
+                    self._put((use_case, user_id), delta.upserts[user_id])
+            for user_id in delta.deletes:
+                if (use_case, user_id) in self._rows:
+                    self._put((use_case, user_id), None)
+            self._versions[use_case] = max(version, delta.to_version)
+
+    def get_version(self, use_case: str) -> int:
+        with self._lock:
+            version: int | None = self._versions.get(use_case)
+        if version is None:
+            # Read from source outside the lock, so lookups don't wait on it.
+            source_version: int = self.source.get_current_feature_version(use_case)
+            with self._lock:
+                version = self._versions.setdefault(use_case, source_version)
+        return version
+
+    def _put(self, key: tuple[str, str], row: FeatureRow | None) -> None:
+        if key in self._rows:
+            self._bytes -= _row_bytes(self._rows.pop(key))
+        self._rows[key] = row
+        self._bytes += _row_bytes(row)
+        if row is None:
+            self._absent.setdefault(key[0], set()).add(key[1])
+        while self._bytes > self.max_bytes and len(self._rows) > 1:
+            (evicted_use_case, evicted_user_id), evicted = self._rows.popitem(
+                last=False
+            )
+            self._bytes -= _row_bytes(evicted)
+            if evicted is None:
+                self._absent[evicted_use_case].discard(evicted_user_id)
+            self.stats.evictions += 1
+
+    def _drop_absent(self, use_case: str) -> None:
+        # Users cached as absent may exist at a newer version. The set can
+        # name users cached since, which are kept.
+        for user_id in self._absent.pop(use_case, ()):
+            key: tuple[str, str] = (use_case, user_id)
+            if key in self._rows and self._rows[key] is None:
+                self._bytes -= _row_bytes(self._rows.pop(key))
+                self.stats.invalidations += 1
+
+    def _invalidate_use_case(self, use_case: str) -> None:
+        self._epochs[use_case] = self._epochs.get(use_case, 0) + 1
+        self._absent.pop(use_case, None)
+        for key in [key for key in self._rows if key[0] == use_case]:
+            self._bytes -= _row_bytes(self._rows.pop(key))
+            self.stats.invalidations += 1
+
+
+@dataclass(frozen=True)
+class InferenceSnapshot:
+    """
+    A use case's model and feature set as published together.
+
+    Read methods mirror the repositories' so a snapshot can stand in for them
+    while serving one request; use_case arguments are ignored.
+    """
+
+    use_case: shared_types.UseCase
+    model: models.Model | None = None
+    feature_set: LayeredFeatureSet | None = None
+
+    def get_model(self, use_case: str) -> models.Model:
+        if self.model is None:
+            msg: str = f"Use case {self.use_case} not found in model registry."
+            raise exceptions.ModelNotFound(msg)
+        return self.model
+
+    def get_features(self, user_id: str, use_case: str) -> shared_types.FeatureVector:
+        return _get_features(
+            feature_set=self.get_feature_set(), user_id=user_id, use_case=self.use_case
+        )
+
+    def get_features_batch(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> list[shared_types.FeatureVector | None]:
+        return list(self.get_feature_set().get_rows(user_ids))
+
+    def get_feature_set(self) -> LayeredFeatureSet:
+        if self.feature_set is None:
+            msg: str = f"Use case {self.use_case} not found in features."
+            raise exceptions.FeatureSetNotFound(msg)
+        return self.feature_set
+
+
+@dataclass
+class SnapshotRepository(ModelRepository, FeatureRepository):
+    """
+    Model and feature repository in one, holding an immutable
+    InferenceSnapshot per use case (read-copy-update).
+
+    Readers fetch the current snapshot with a single dict lookup and take no
+    locks, so a request that reads everything from one snapshot always pairs
+    a model with the feature set published alongside it. Writers serialize on
+    a lock, build a new snapshot from the current one and publish it with a
+    single dict assignment; readers holding the old snapshot finish on it.
+    """
+
+    _snapshots: dict[shared_types.UseCase, InferenceSnapshot] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _write_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def get_snapshot(self, use_case: str) -> InferenceSnapshot:
+        snapshot: InferenceSnapshot | None = self._snapshots.get(use_case)
+        if snapshot is None:
+            return InferenceSnapshot(use_case=use_case)
+        return snapshot
+
+    def get_model(self, use_case: str) -> models.Model:
+        return self.get_snapshot(use_case).get_model(use_case=use_case)
+
+    def get_features(self, user_id: str, use_case: str) -> shared_types.FeatureVector:
+        return self.get_snapshot(use_case).get_features(
+            user_id=user_id, use_case=use_case
+        )
+
+    def get_features_batch(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> list[shared_types.FeatureVector | None]:
+        return self.get_snapshot(use_case).get_features_batch(
+            user_ids=user_ids, use_case=use_case
+        )
+
+    def get_version(self, use_case: str) -> int:
+        return self.get_snapshot(use_case).get_feature_set().version
+
+    def add_model(self, use_case: str, model: models.Model) -> None:
+        with self._write_lock:
+            self._publish(replace(self.get_snapshot(use_case), model=model))
+
+    def add_features(
+        self, use_case: str, feature_set: shared_types.FeatureSet, version: int = 0
+    ) -> None:
+        layered: LayeredFeatureSet = _to_layered(feature_set, version=version)
+        with self._write_lock:
+            self._publish(replace(self.get_snapshot(use_case), feature_set=layered))
+
+    def apply_delta(self, use_case: str, delta: FeatureDelta) -> None:
+        with self._write_lock:
+            snapshot: InferenceSnapshot = self.get_snapshot(use_case)
+            self._publish(
+                replace(
+                    snapshot,
+                    feature_set=_apply_delta(
+                        feature_set=snapshot.get_feature_set(),
+                        use_case=use_case,
+                        delta=delta,
+                    ),
+                )
+            )
+
+    def publish(
+        self,
+        use_case: str,
+        model: models.Model,
+        feature_set: shared_types.FeatureSet,
+        version: int = 0,
+    ) -> None:
+        """Swap in a model and feature set together."""
+        layered: LayeredFeatureSet = _to_layered(feature_set, version=version)
+        with self._write_lock:
+            self._publish(
+                InferenceSnapshot(use_case=use_case, model=model, feature_set=layered)
+            )
+
+    def _publish(self, snapshot: InferenceSnapshot) -> None:
+        self._snapshots[snapshot.use_case] = snapshot
+
+
+def _get_features(
+    feature_set: LayeredFeatureSet, user_id: str, use_case: str
+) -> shared_types.FeatureVector:
+    if user_id not in feature_set:
+        msg: str = f"User ID: {user_id} not found in features for use case: {use_case}."
+        raise ValueError(msg)
+    return feature_set[user_id]
+
+
+def _apply_delta(
+    feature_set: LayeredFeatureSet, use_case: str, delta: FeatureDelta
+) -> LayeredFeatureSet:
+    if delta.from_version > feature_set.version:
+        msg: str = (
+            f"Features for use case {use_case} are at version "
+            f"{feature_set.version}; delta starts at {delta.from_version}."
+        )
+        raise exceptions.FeatureSetOutOfDate(msg)
+    return feature_set.apply(delta)
+
+
+def _to_row(features: shared_types.FeatureVector) -> FeatureRow:
+    if isinstance(features, FeatureRow):
+        return features
+    return FeatureRow.from_dict(features, schema=FeatureSchema(features))
+
+
+def _row_bytes(row: FeatureRow | None) -> int:
+    return ROW_OVERHEAD_BYTES + (row.array.nbytes if row is not None else 0)
 
-        return feature_set[user_id]
 
-    def add_features(self, use_case: str, feature_set: shared_types.FeatureSet) -> None:
-        self.features[use_case] = feature_set
+def _to_layered(
+    feature_set: shared_types.FeatureSet, version: int = 0
+) -> LayeredFeatureSet:
+    if isinstance(feature_set, LayeredFeatureSet):
+        return feature_set
+    table: FeatureTable = (
+        feature_set
+        if isinstance(feature_set, FeatureTable)
+        else FeatureTable.from_feature_set(feature_set)
+    )
+    return LayeredFeatureSet(base=table, version=version)
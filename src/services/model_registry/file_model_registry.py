@@ -0,0 +1,223 @@
+import copy
+import json
+import os
+import pickle
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.common import models, shared_types
+
+VERSIONS_DIRECTORY = "versions"
+CURRENT_FILE = "CURRENT"
+PINNED_FILE = "PINNED"
+MODEL_FILE = "model.pkl"
+WEIGHTS_FILE = "weights.npy"
+METADATA_FILE = "metadata.json"
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    use_case: shared_types.UseCase
+    version: int
+    created_at: float
+    model_class: str
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class FileModelRegistry:
+    """
+    Model registry persisted under root, one directory per use case.
+
+    example directory structure:
+    root/
+        use_case/
+            CURRENT                 promoted version number
+            PINNED                  optional, version served instead of CURRENT
+            versions/
+                000001/
+                    metadata.json   ModelVersion fields
+                    model.pkl       the model, pickled with empty weights
+                    weights.npy     the model's weights, when it has any
+
+    Versions are written to a staging directory and renamed into place, and
+    CURRENT and PINNED are swapped with os.replace, so readers only ever see
+    complete versions and a whole pointer. get_model memory-maps weights.npy
+    read-only: loading a model unpickles only the small weightless object,
+    and models loaded from the same version share the weights' pages. Each
+    call returns its own copy of the version's cached model, so one caller
+    training or reconfiguring its model leaves the others' alone; only the
+    read-only weights are shared. Copy the weights before updating them in
+    place.
+    """
+
+    root: str | os.PathLike
+    _loaded: dict[tuple[shared_types.UseCase, int], models.Model] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def get_model(self, use_case: str, version: int | None = None) -> models.Model:
+        """The given version, else the pinned version, else the promoted one."""
+        if version is None:
+            version = self.get_served_version(use_case=use_case)
+        if version is None or not self._version_directory(use_case, version).exists():
+            raise ValueError(
+                f"No model found for use case '{use_case}' in the model registry."
+            )
+
+        key: tuple[shared_types.UseCase, int] = (use_case, version)
+        if key not in self._loaded:
+            self._loaded[key] = self._load(use_case=use_case, version=version)
+        return _copy_sharing_weights(self._loaded[key])
+
+    def add_model(self, use_case: shared_types.UseCase, model: models.Model) -> None:
+        self.register(use_case=use_case, model=model)
+
+    def register(
+        self,
+        use_case: shared_types.UseCase,
+        model: models.Model,
+        metadata: dict[str, Any] | None = None,
+        promote: bool = True,
+    ) -> int:
+        """Store model as the use case's next version and return its number."""
+        versions_directory: Path = (
+            self._use_case_directory(use_case) / VERSIONS_DIRECTORY
+        )
+        versions_directory.mkdir(parents=True, exist_ok=True)
+        staging: Path = versions_directory / f".{uuid.uuid4().hex}.tmp"
+        staging.mkdir()
+
+        try:
+            weightless_model: models.Model = copy.copy(model)
+            if isinstance(weightless_model, models.MachineLearningModel):
+                np.save(staging / WEIGHTS_FILE, np.asarray(weightless_model.weights))
+                weightless_model.weights = []
+            (staging / MODEL_FILE).write_bytes(pickle.dumps(weightless_model))
+
+            while True:
+                version: int = max(self._version_numbers(use_case), default=0) + 1
+                (staging / METADATA_FILE).write_text(
+                    json.dumps(
+                        {
+                            "version": version,
+                            "created_at": time.time(),
+                            "model_class": _qualified_name(type(model)),
+                            "metadata": metadata or {},
+                        }
+                    )
+                )
+                try:
+                    staging.rename(self._version_directory(use_case, version))
+                    break
+                except OSError:
+                    # Another writer took this version number first.
+                    if not self._version_directory(use_case, version).exists():
+                        raise
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if promote:
+            self.promote(use_case=use_case, version=version)
+        return version
+
+    def list_versions(self, use_case: shared_types.UseCase) -> list[ModelVersion]:
+        return [
+            self._read_metadata(use_case=use_case, version=version)
+            for version in sorted(self._version_numbers(use_case))
+        ]
+
+    def promote(self, use_case: shared_types.UseCase, version: int) -> None:
+        self._write_pointer(use_case=use_case, file_name=CURRENT_FILE, version=version)
+
+    def pin(self, use_case: shared_types.UseCase, version: int) -> None:
+        """Serve version regardless of later promotions until unpinned."""
+        self._write_pointer(use_case=use_case, file_name=PINNED_FILE, version=version)
+
+    def unpin(self, use_case: shared_types.UseCase) -> None:
+        (self._use_case_directory(use_case) / PINNED_FILE).unlink(missing_ok=True)
+
+    def get_current_version(self, use_case: shared_types.UseCase) -> int | None:
+        return self._read_pointer(use_case=use_case, file_name=CURRENT_FILE)
+
+    def get_pinned_version(self, use_case: shared_types.UseCase) -> int | None:
+        return self._read_pointer(use_case=use_case, file_name=PINNED_FILE)
+
+    def get_served_version(self, use_case: shared_types.UseCase) -> int | None:
+        pinned: int | None = self.get_pinned_version(use_case=use_case)
+        if pinned is not None:
+            return pinned
+        return self.get_current_version(use_case=use_case)
+
+    def _load(self, use_case: shared_types.UseCase, version: int) -> models.Model:
+        directory: Path = self._version_directory(use_case, version)
+        model: models.Model = pickle.loads((directory / MODEL_FILE).read_bytes())
+        if isinstance(model, models.MachineLearningModel):
+            model.weights = np.load(directory / WEIGHTS_FILE, mmap_mode="r")
+        return model
+
+    def _read_metadata(
+        self, use_case: shared_types.UseCase, version: int
+    ) -> ModelVersion:
+        metadata: dict[str, Any] = json.loads(
+            (self._version_directory(use_case, version) / METADATA_FILE).read_text()
+        )
+        return ModelVersion(use_case=use_case, **metadata)
+
+    def _write_pointer(
+        self, use_case: shared_types.UseCase, file_name: str, version: int
+    ) -> None:
+        if not self._version_directory(use_case, version).exists():
+            msg = f"Use case '{use_case}' has no model version {version}."
+            raise ValueError(msg)
+        pointer: Path = self._use_case_directory(use_case) / file_name
+        staging: Path = pointer.with_name(f".{file_name}.{uuid.uuid4().hex}.tmp")
+        staging.write_text(str(version))
+        os.replace(staging, pointer)
+
+    def _read_pointer(
+        self, use_case: shared_types.UseCase, file_name: str
+    ) -> int | None:
+        try:
+            return int((self._use_case_directory(use_case) / file_name).read_text())
+        except FileNotFoundError:
+            return None
+
+    def _version_numbers(self, use_case: shared_types.UseCase) -> list[int]:
+        versions_directory: Path = (
+            self._use_case_directory(use_case) / VERSIONS_DIRECTORY
+        )
+        if not versions_directory.exists():
+            return []
+        return [
+            int(path.name)
+            for path in versions_directory.iterdir()
+            if path.name.isdigit()
+        ]
+
+    def _use_case_directory(self, use_case: shared_types.UseCase) -> Path:
+        return Path(self.root) / use_case
+
+    def _version_directory(self, use_case: shared_types.UseCase, version: int) -> Path:
+        return (
+            self._use_case_directory(use_case) / VERSIONS_DIRECTORY / f"{version:06d}"
+        )
+
+
+def _copy_sharing_weights(model: models.Model) -> models.Model:
+    # Deep, except for the memory-mapped weights, which are read-only.
+    memo: dict[int, Any] = {}
+    if isinstance(model, models.MachineLearningModel):
+        memo[id(model.weights)] = model.weights
+    return copy.deepcopy(model, memo)
+
+
+def _qualified_name(model_type: type) -> str:
+    return f"{model_type.__module__}.{model_type.__qualname__}"
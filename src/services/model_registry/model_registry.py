@@ -13,3 +13,6 @@ class InMemoryModelRegistry:
             )
 
         return self.registry[use_case]
+
+    def add_model(self, use_case: shared_types.UseCase, model: models.Model) -> None:
+        self.registry[use_case] = model
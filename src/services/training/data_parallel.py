@@ -0,0 +1,262 @@
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import pairwise
+from multiprocessing import shared_memory
+from multiprocessing.context import BaseContext
+
+import numpy as np
+
+from src.common.features import FeatureMatrix, FeatureSchema
+from src.common.models import MachineLearningModel
+from src.services.training import repositories
+
+# Rows copied from the feature repository into shared memory per read.
+LOAD_BATCH_SIZE = 65_536
+
+
+@dataclass
+class SharedTrainingData:
+    """Feature and target matrices for one use case in shared memory."""
+
+    schema: FeatureSchema
+    n_users: int
+    features: shared_memory.SharedMemory
+    targets: shared_memory.SharedMemory
+
+    @classmethod
+    def load(
+        cls, feature_repository: repositories.FeatureRepository, use_case: str
+    ) -> "SharedTrainingData":
+        """
+        Copy every user's features and target in, one batch at a time.
+
+        Features first seen in a later batch widen the matrix; the users
+        already copied are missing them.
+        """
+        n_users: int = len(feature_repository.get_user_ids(use_case=use_case))
+        data = cls(
+            schema=FeatureSchema(),
+            n_users=n_users,
+            features=_allocate(0),
+            targets=_allocate(n_users),
+        )
+        start: int = 0
+        try:
+            for _, batch, batch_targets in feature_repository.iter_batches(
+                use_case=use_case, batch_size=LOAD_BATCH_SIZE
+            ):
+                matrix: FeatureMatrix = FeatureMatrix.from_vectors(batch)
+                schema: FeatureSchema = data.schema.extend(matrix.schema)
+                if schema is not data.schema:
+                    data._widen(schema=schema, copied=start)
+                feature_array, target_array = data.arrays()
+                stop: int = start + len(batch)
+                feature_array[start:stop] = matrix.as_array(data.schema)
+                target_array[start:stop] = batch_targets
+                start = stop
+        except BaseException:
+            data.release()
+            raise
+
+        if not start:
+            data.release()
+            msg = f"No training data found for use case '{use_case}'."
+            raise ValueError(msg)
+        return data
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """Views of the (users x features) matrix and the targets."""
+        features: np.ndarray = np.ndarray(
+            (self.n_users, len(self.schema)), dtype=np.float64, buffer=self.features.buf
+        )
+        targets: np.ndarray = np.ndarray(
+            (self.n_users,), dtype=np.float64, buffer=self.targets.buf
+        )
+        return features, targets
+
+    def release(self) -> None:
+        for block in (self.features, self.targets):
+            block.close()
+            block.unlink()
+
+    def _widen(self, schema: FeatureSchema, copied: int) -> None:
+        # Rows are contiguous, so new columns need a new block.
+        features: shared_memory.SharedMemory = _allocate(self.n_users * len(schema))
+        widened: np.ndarray = np.ndarray(
+            (self.n_users, len(schema)), dtype=np.float64, buffer=features.buf
+        )
+        # extend appends the new names, so the old columns keep their place.
+        widened[:copied, : len(self.schema)] = self.arrays()[0][:copied]
+        widened[:copied, len(self.schema) :] = np.nan
+        self.features.close()
+        self.features.unlink()
+        self.features = features
+        self.schema = schema
+
+
+def _allocate(n_values: int) -> shared_memory.SharedMemory:
+    return shared_memory.SharedMemory(create=True, size=max(n_values, 1) * 8)
+
+
+@dataclass
+class DataParallelTrainer:
+    """
+    Trains one use case's model with synchronous data parallelism.
+
+    The use case's features and targets are copied once into shared memory
+    and worker processes attach to it. Every step takes the next batch_size
+    rows, splits them into one contiguous shard per worker and has each worker
+    compute the mean gradient of its shard at the current weights. The
+    gradients are averaged, weighted by shard size, and applied to the model
+    in this process, so a step matches a single-process step on the whole
+    batch. The model must implement compute_gradient and apply_gradient.
+
+    The weights are shared the same way: each step writes them into a shared
+    block that workers read, so a step sends workers only row bounds. The
+    number of weights must stay fixed during training. Whether the workers
+    beat a single-process Trainer depends on the cores available and the
+    gradient cost per row against the per-step round trip; it has only been
+    measured on one core, where no speedup is expected.
+    """
+
+    feature_repository: repositories.FeatureRepository = field(
+        default_factory=repositories.InMemoryFeatureRepository
+    )
+    model_repository: repositories.ModelRepository = field(
+        default_factory=repositories.InMemoryModelRepository
+    )
+    workers: int = 2
+    batch_size: int = 1024
+    epochs: int = 1
+
+    def __post_init__(self) -> None:
+        if self.workers < 1:
+            raise ValueError(f"workers must be positive, got {self.workers}.")
+        if self.batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {self.batch_size}.")
+        if self.epochs < 1:
+            raise ValueError(f"epochs must be positive, got {self.epochs}.")
+
+    def train(self, use_case: str) -> None:
+        model: MachineLearningModel = self.model_repository.get_model(use_case=use_case)
+        if not model.supports_gradients:
+            msg = (
+                f"{type(model).__name__} does not implement compute_gradient "
+                "and apply_gradient."
+            )
+            raise TypeError(msg)
+
+        data = SharedTrainingData.load(
+            feature_repository=self.feature_repository, use_case=use_case
+        )
+        weights = shared_memory.SharedMemory(
+            create=True, size=max(len(model.weights), 1) * 8
+        )
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=_worker_context(),
+                initializer=_attach,
+                initargs=(data, model, weights),
+            ) as executor:
+                for _ in range(self.epochs):
+                    for start in range(0, data.n_users, self.batch_size):
+                        stop: int = min(start + self.batch_size, data.n_users)
+                        self._step(
+                            executor=executor,
+                            model=model,
+                            weights=_weights_view(weights, len(model.weights)),
+                            start=start,
+                            stop=stop,
+                        )
+        finally:
+            weights.close()
+            weights.unlink()
+            data.release()
+
+        self.model_repository.add_model(use_case=use_case, model=model)
+
+    def _step(
+        self,
+        executor: ProcessPoolExecutor,
+        model: MachineLearningModel,
+        weights: np.ndarray,
+        start: int,
+        stop: int,
+    ) -> None:
+        if len(model.weights) != len(weights):
+            msg = (
+                f"apply_gradient changed the number of weights from "
+                f"{len(weights)} to {len(model.weights)}."
+            )
+            raise ValueError(msg)
+        # Workers read the weights from shared memory; no one reads them while
+        # they are written, as every gradient of the last step is in.
+        weights[:] = model.weights
+        bounds: np.ndarray = np.linspace(start, stop, self.workers + 1).astype(int)
+        shards: list[tuple[int, int]] = [
+            (shard_start, shard_stop)
+            for shard_start, shard_stop in pairwise(bounds.tolist())
+            if shard_stop > shard_start
+        ]
+        futures: list[Future[np.ndarray]] = [
+            executor.submit(_shard_gradient, shard_start, shard_stop)
+            for shard_start, shard_stop in shards
+        ]
+        gradients: np.ndarray = np.stack([future.result() for future in futures])
+        model.apply_gradient(
+            np.average(
+                gradients,
+                axis=0,
+                weights=[
+                    shard_stop - shard_start for shard_start, shard_stop in shards
+                ],
+            )
+        )
+
+
+def _worker_context() -> BaseContext | None:
+    # Forking the training process is unsafe once it runs threads, such as the
+    # previous pool's feeder threads; a fork server forks clean workers instead.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return None
+
+
+def _weights_view(block: shared_memory.SharedMemory, n_weights: int) -> np.ndarray:
+    return np.ndarray((n_weights,), dtype=np.float64, buffer=block.buf)
+
+
+# Per-worker state, set once by _attach when the worker process starts.
+_worker_data: SharedTrainingData | None = None
+_worker_model: MachineLearningModel | None = None
+_worker_weights: shared_memory.SharedMemory | None = None
+
+
+def _attach(
+    data: SharedTrainingData,
+    model: MachineLearningModel,
+    weights: shared_memory.SharedMemory,
+) -> None:
+    # SharedMemory pickles by name, so spawned workers re-attach to the blocks.
+    global _worker_data, _worker_model, _worker_weights
+    _worker_data = data
+    _worker_model = model
+    _worker_weights = weights
+    view: np.ndarray = _weights_view(weights, len(model.weights))
+    view.flags.writeable = False
+    model.weights = view
+
+
+def _shard_gradient(start: int, stop: int) -> np.ndarray:
+    assert _worker_data is not None and _worker_model is not None
+    features, targets = _worker_data.arrays()
+    return np.asarray(
+        _worker_model.compute_gradient(
+            features=FeatureMatrix(
+                schema=_worker_data.schema, array=features[start:stop]
+            ),
+            targets=targets[start:stop],
+        )
+    )
@@ -1,9 +1,18 @@
 import abc
+import os
 
+from collections import OrderedDict
 from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
 
 from src.common import shared_types, models
-from typing import Collection
+from src.common.feature_files import FeatureFile
+from src.common.features import FeatureMatrix, FeatureTable
+from typing import Collection, Iterable, Iterator, Sequence
+
+Batch = tuple[Sequence[str], Sequence[shared_types.FeatureVector], np.ndarray]
 
 
 class FeatureRepository(abc.ABC):
@@ -18,11 +27,85 @@ class FeatureRepository(abc.ABC):
     @abc.abstractmethod
     def get_target(self, user_id: str, use_case: str) -> float: ...
 
+    def get_features_batch(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> Sequence[shared_types.FeatureVector]:
+        return [
+            self.get_features(user_id=user_id, use_case=use_case)
+            for user_id in user_ids
+        ]
+
+    def get_targets(self, user_ids: Sequence[str], use_case: str) -> np.ndarray:
+        return np.fromiter(
+            (
+                self.get_target(user_id=user_id, use_case=use_case)
+                for user_id in user_ids
+            ),
+            dtype=np.float64,
+            count=len(user_ids),
+        )
+
+    def iter_batches(self, use_case: str, batch_size: int) -> Iterator[Batch]:
+        """User ids, features and targets in storage order, batch_size rows at a time."""
+        user_ids: list[str] = list(self.get_user_ids(use_case=use_case))
+        for start in range(0, len(user_ids), batch_size):
+            batch_user_ids: list[str] = user_ids[start : start + batch_size]
+            yield (
+                batch_user_ids,
+                self.get_features_batch(user_ids=batch_user_ids, use_case=use_case),
+                self.get_targets(user_ids=batch_user_ids, use_case=use_case),
+            )
+
+    def for_use_case(self, use_case: str) -> "FeatureRepository":
+        """
+        A picklable repository serving at least use_case, shipped to training
+        worker processes. Override to avoid pickling other use cases' data.
+        """
+        return self
+
+    def get_watermark(self, use_case: str) -> int:
+        """
+        Position in the use case's change history, for get_changed_user_ids.
+
+        Optional hook for incremental training, with get_changed_user_ids.
+        """
+        raise NotImplementedError
+
+    def get_changed_user_ids(self, use_case: str, since: int) -> Sequence[str]:
+        """
+        Users with both features and a target whose features or target changed
+        after watermark since, least recently changed first. Should take time
+        proportional to the number of changes, not of users.
+        """
+        raise NotImplementedError
+
+    def sample_user_ids(
+        self, use_case: str, n: int, rng: np.random.Generator
+    ) -> list[str]:
+        """Up to n distinct users drawn uniformly at random."""
+        user_ids: list[str] = list(self.get_user_ids(use_case=use_case))
+        rows: list[int] = rng.choice(
+            len(user_ids), size=min(n, len(user_ids)), replace=False
+        ).tolist()
+        return [user_ids[row] for row in rows]
+
+    @property
+    def supports_change_tracking(self) -> bool:
+        repository_type: type[FeatureRepository] = type(self)
+        return (
+            repository_type.get_watermark is not FeatureRepository.get_watermark
+            and repository_type.get_changed_user_ids
+            is not FeatureRepository.get_changed_user_ids
+        )
+
 
 class ModelRepository(abc.ABC):
     @abc.abstractmethod
     def get_model(self, use_case: str) -> models.MachineLearningModel: ...
 
+    @abc.abstractmethod
+    def add_model(self, use_case: str, model: models.MachineLearningModel) -> None: ...
+
 
 @dataclass
 class InMemoryModelRepository(ModelRepository):
@@ -37,11 +120,41 @@ class InMemoryModelRepository(ModelRepository):
 
         return self.registry[use_case]
 
+    def add_model(self, use_case: str, model: models.MachineLearningModel) -> None:
+        self.registry[use_case] = model
+
 
 @dataclass
 class InMemoryFeatureRepository(FeatureRepository):
-    features: shared_types.FeatureSets = field(default_factory=dict)
+    """
+    Feature sets are held as FeatureTables; plain dict sets are compiled on
+    construction.
+
+    upsert_features and upsert_targets advance the use case's watermark and
+    stamp the users they touch with it. Users are kept ordered by when they
+    last changed, so get_changed_user_ids walks back from the newest change
+    and stops at the first user stamped at or before since. Data passed on
+    construction is at watermark 0.
+    """
+
+    features: dict[shared_types.UseCase, FeatureTable] = field(default_factory=dict)
     targets: shared_types.Targets = field(default_factory=dict)
+    _watermarks: dict[shared_types.UseCase, int] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _changed: dict[shared_types.UseCase, OrderedDict[shared_types.UserId, int]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        self.features = {
+            use_case: (
+                feature_set
+                if isinstance(feature_set, FeatureTable)
+                else FeatureTable.from_feature_set(feature_set)
+            )
+            for use_case, feature_set in self.features.items()
+        }
 
     def get_features(self, user_id: str, use_case: str) -> shared_types.FeatureVector:
         return self.features[use_case][user_id]
@@ -51,3 +164,154 @@ class InMemoryFeatureRepository(FeatureRepository):
 
     def get_target(self, user_id: str, use_case: str) -> float:
         return self.targets[use_case][user_id]
+
+    def get_features_batch(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> Sequence[shared_types.FeatureVector]:
+        return self.features[use_case].take(user_ids)
+
+    def get_targets(self, user_ids: Sequence[str], use_case: str) -> np.ndarray:
+        targets: dict[str, shared_types.Target] = self.targets[use_case]
+        return np.fromiter(
+            (targets[user_id] for user_id in user_ids),
+            dtype=np.float64,
+            count=len(user_ids),
+        )
+
+    def iter_batches(self, use_case: str, batch_size: int) -> Iterator[Batch]:
+        table: FeatureTable = self.features[use_case]
+        for start in range(0, table.n_users, batch_size):
+            batch_user_ids: Sequence[str] = table.user_ids[start : start + batch_size]
+            yield (
+                batch_user_ids,
+                FeatureMatrix(
+                    schema=table.schema, array=table.matrix[start : start + batch_size]
+                ),
+                self.get_targets(user_ids=batch_user_ids, use_case=use_case),
+            )
+
+    def for_use_case(self, use_case: str) -> "InMemoryFeatureRepository":
+        return InMemoryFeatureRepository(
+            features={use_case: self.features[use_case]},
+            targets={use_case: self.targets[use_case]},
+        )
+
+    def upsert_features(
+        self, use_case: str, feature_set: shared_types.FeatureSet
+    ) -> int:
+        """Replace the features of the given users, returning the new watermark."""
+        table: FeatureTable | None = self.features.get(use_case)
+        if table is None:
+            self.features[use_case] = FeatureTable.from_feature_set(feature_set)
+        else:
+            for user_id, features in feature_set.items():
+                table.upsert(user_id=user_id, features=features)
+        return self._record_changes(use_case=use_case, user_ids=feature_set.keys())
+
+    def upsert_targets(
+        self, use_case: str, targets: dict[shared_types.UserId, shared_types.Target]
+    ) -> int:
+        """Set the targets of the given users, returning the new watermark."""
+        self.targets.setdefault(use_case, {}).update(targets)
+        return self._record_changes(use_case=use_case, user_ids=targets.keys())
+
+    def get_watermark(self, use_case: str) -> int:
+        return self._watermarks.get(use_case, 0)
+
+    def get_changed_user_ids(self, use_case: str, since: int) -> Sequence[str]:
+        changed: OrderedDict[shared_types.UserId, int] = self._changed.get(
+            use_case, OrderedDict()
+        )
+        newest_first: list[shared_types.UserId] = []
+        for user_id in reversed(changed):
+            if changed[user_id] <= since:
+                break
+            newest_first.append(user_id)
+
+        features: FeatureTable | None = self.features.get(use_case)
+        targets: dict[shared_types.UserId, shared_types.Target] = self.targets.get(
+            use_case, {}
+        )
+        return [
+            user_id
+            for user_id in reversed(newest_first)
+            if features is not None and user_id in features and user_id in targets
+        ]
+
+    def sample_user_ids(
+        self, use_case: str, n: int, rng: np.random.Generator
+    ) -> list[str]:
+        # Index the table's user list directly rather than copying it; users
+        # without a target yet are dropped from the sample.
+        user_ids: Sequence[str] = self.features[use_case].user_ids
+        targets: dict[shared_types.UserId, shared_types.Target] = self.targets.get(
+            use_case, {}
+        )
+        rows: list[int] = rng.choice(
+            len(user_ids), size=min(n, len(user_ids)), replace=False
+        ).tolist()
+        return [user_ids[row] for row in rows if user_ids[row] in targets]
+
+    def _record_changes(
+        self, use_case: str, user_ids: Iterable[shared_types.UserId]
+    ) -> int:
+        watermark: int = self._watermarks.get(use_case, 0) + 1
+        self._watermarks[use_case] = watermark
+        changed: OrderedDict[shared_types.UserId, int] = self._changed.setdefault(
+            use_case, OrderedDict()
+        )
+        for user_id in user_ids:
+            changed[user_id] = watermark
+            changed.move_to_end(user_id)
+        return watermark
+
+
+@dataclass
+class MemoryMappedFeatureRepository(FeatureRepository):
+    """
+    Training features read from directories written by
+    src.common.feature_files.write_feature_file, one per use case under root.
+
+    Batches are streamed as contiguous row ranges through np.memmap, so resident
+    memory stays bounded by batch_size however large the history is.
+    """
+
+    root: str | os.PathLike
+    _files: dict[shared_types.UseCase, FeatureFile] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def get_features(self, user_id: str, use_case: str) -> shared_types.FeatureVector:
+        return self._file(use_case).get_row(user_id)
+
+    def get_user_ids(self, use_case: str) -> Collection[str]:
+        return list(self._file(use_case))
+
+    def get_target(self, user_id: str, use_case: str) -> float:
+        return self._file(use_case).get_target(user_id)
+
+    def get_features_batch(
+        self, user_ids: Sequence[str], use_case: str
+    ) -> Sequence[shared_types.FeatureVector]:
+        feature_file: FeatureFile = self._file(use_case)
+        features, _ = feature_file.take(feature_file.rows_of(user_ids))
+        return features
+
+    def get_targets(self, user_ids: Sequence[str], use_case: str) -> np.ndarray:
+        feature_file: FeatureFile = self._file(use_case)
+        _, targets = feature_file.take(feature_file.rows_of(user_ids))
+        return targets
+
+    def iter_batches(self, use_case: str, batch_size: int) -> Iterator[Batch]:
+        feature_file: FeatureFile = self._file(use_case)
+        for start in range(0, len(feature_file), batch_size):
+            yield feature_file.read_rows(start=start, stop=start + batch_size)
+
+    def for_use_case(self, use_case: str) -> "MemoryMappedFeatureRepository":
+        # Workers map the files themselves rather than receiving the data.
+        return MemoryMappedFeatureRepository(root=self.root)
+
+    def _file(self, use_case: str) -> FeatureFile:
+        if use_case not in self._files:
+            self._files[use_case] = FeatureFile(Path(self.root) / use_case)
+        return self._files[use_case]
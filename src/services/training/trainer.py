@@ -1,30 +1,250 @@
-from dataclasses import dataclass, field
-from typing import Collection
+import pickle
+import time
+from collections.abc import Collection, Iterable, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
 
+import numpy as np
+
+from src.common import exceptions, shared_types
 from src.common.models import MachineLearningModel
 from src.services.training import repositories
 
+# Errors that fail one use case in train_many without stopping the others:
+# a worker dying, a repository lookup failing, a model that can't be shipped
+# to a worker, or training itself raising.
+_TRAINING_ERRORS = (
+    BrokenProcessPool,
+    exceptions.ModelNotFound,
+    exceptions.FeatureSetNotFound,
+    KeyError,
+    ValueError,
+    TypeError,
+    NotImplementedError,
+    ArithmeticError,
+    pickle.PicklingError,
+)
+
+
+@dataclass
+class TrainingReport:
+    use_case: shared_types.UseCase
+    seconds: float = 0.0
+    error: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
 
 @dataclass
 class Trainer:
+    """
+    Trains a use case's model on every user in the feature repository.
+
+    With batch_size unset the model is updated one user at a time. Setting it
+    switches to mini-batch training: the model receives batch_size rows per
+    update_weights_batch. Unshuffled epochs stream batches in storage order
+    through the repository's iter_batches; shuffled epochs draw a seeded
+    permutation of user ids and fetch each batch by id.
+
+    train_incremental warm-starts from the current model and trains only on
+    users changed since a watermark, for repositories with change tracking.
+    """
+
     feature_repository: repositories.FeatureRepository = field(
         default_factory=repositories.InMemoryFeatureRepository
     )
     model_repository: repositories.ModelRepository = field(
         default_factory=repositories.InMemoryModelRepository
     )
+    batch_size: int | None = None
+    epochs: int = 1
+    shuffle: bool = False
+    seed: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.batch_size is not None and self.batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {self.batch_size}.")
+        if self.epochs < 1:
+            raise ValueError(f"epochs must be positive, got {self.epochs}.")
 
     def train(self, use_case: str) -> None:
         model: MachineLearningModel = self.model_repository.get_model(use_case=use_case)
-        user_ids: Collection[str] = self.feature_repository.get_user_ids(
-            use_case=use_case
+
+        if self.batch_size is None:
+            user_ids: Collection[str] = self.feature_repository.get_user_ids(
+                use_case=use_case
+            )
+            for _ in range(self.epochs):
+                self._train_per_user(model=model, use_case=use_case, user_ids=user_ids)
+        elif self.shuffle:
+            self._train_shuffled(
+                model=model, use_case=use_case, batch_size=self.batch_size
+            )
+        else:
+            for _ in range(self.epochs):
+                for _, features, targets in self.feature_repository.iter_batches(
+                    use_case=use_case, batch_size=self.batch_size
+                ):
+                    model.update_weights_batch(features=features, targets=targets)
+
+    def train_incremental(self, use_case: str, since: int, replay_size: int = 0) -> int:
+        """
+        Continue training the current model on the users whose features or
+        targets changed after watermark since, returning the watermark to pass
+        as since next time.
+
+        replay_size users sampled from the whole population, drawn with seed,
+        are trained on alongside the changed ones so the model isn't pulled
+        toward recent changes alone. batch_size, epochs and shuffle apply as in
+        train, over just these rows.
+        """
+        if not self.feature_repository.supports_change_tracking:
+            msg = (
+                f"{type(self.feature_repository).__name__} does not implement "
+                "get_watermark and get_changed_user_ids."
+            )
+            raise TypeError(msg)
+        model: MachineLearningModel = self.model_repository.get_model(use_case=use_case)
+
+        # Read the watermark first: changes landing while training are
+        # returned again by the next run rather than missed.
+        watermark: int = self.feature_repository.get_watermark(use_case=use_case)
+        user_ids: list[str] = list(
+            self.feature_repository.get_changed_user_ids(use_case=use_case, since=since)
+        )
+        rng: np.random.Generator = np.random.default_rng(self.seed)
+        if replay_size:
+            user_ids = list(
+                dict.fromkeys(
+                    user_ids
+                    + self.feature_repository.sample_user_ids(
+                        use_case=use_case, n=replay_size, rng=rng
+                    )
+                )
+            )
+
+        for _ in range(self.epochs):
+            epoch_user_ids: list[str] = user_ids
+            if self.shuffle:
+                order: np.ndarray = rng.permutation(len(user_ids))
+                epoch_user_ids = [user_ids[row] for row in order.tolist()]
+            if self.batch_size is None:
+                self._train_per_user(
+                    model=model, use_case=use_case, user_ids=epoch_user_ids
+                )
+                continue
+            for start in range(0, len(epoch_user_ids), self.batch_size):
+                self._train_batch(
+                    model=model,
+                    use_case=use_case,
+                    user_ids=epoch_user_ids[start : start + self.batch_size],
+                )
+        return watermark
+
+    def train_many(
+        self, use_cases: Iterable[str], max_workers: int | None = None
+    ) -> dict[str, TrainingReport]:
+        """
+        Train several use cases in parallel, one worker process per use case.
+
+        Each worker receives a trainer holding only its use case's model and
+        the repository returned by feature_repository.for_use_case. Trained
+        models are written back to model_repository as they finish. A use case
+        that fails with a repository or training error, or whose worker dies,
+        is reported with its error and does not stop the others; any other
+        exception is a bug and propagates.
+        max_workers defaults to the number of CPUs.
+        """
+        reports: dict[str, TrainingReport] = {}
+        futures: dict[str, Future[tuple[MachineLearningModel, float]]] = {}
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for use_case in use_cases:
+                try:
+                    worker_trainer: Trainer = replace(
+                        self,
+                        feature_repository=self.feature_repository.for_use_case(
+                            use_case
+                        ),
+                        model_repository=repositories.InMemoryModelRepository(
+                            registry={
+                                use_case: self.model_repository.get_model(
+                                    use_case=use_case
+                                )
+                            }
+                        ),
+                    )
+                    futures[use_case] = executor.submit(
+                        _train_in_worker, worker_trainer, use_case
+                    )
+                except _TRAINING_ERRORS as error:
+                    reports[use_case] = TrainingReport(
+                        use_case=use_case, error=repr(error)
+                    )
+
+            for use_case, future in futures.items():
+                try:
+                    model, seconds = future.result()
+                except _TRAINING_ERRORS as error:
+                    reports[use_case] = TrainingReport(
+                        use_case=use_case, error=repr(error)
+                    )
+                    continue
+                self.model_repository.add_model(use_case=use_case, model=model)
+                reports[use_case] = TrainingReport(use_case=use_case, seconds=seconds)
+
+        return reports
+
+    def _train_shuffled(
+        self, model: MachineLearningModel, use_case: str, batch_size: int
+    ) -> None:
+        user_ids: list[str] = list(
+            self.feature_repository.get_user_ids(use_case=use_case)
         )
+        rng: np.random.Generator = np.random.default_rng(self.seed)
+        for _ in range(self.epochs):
+            order: np.ndarray = rng.permutation(len(user_ids))
+            epoch_user_ids: list[str] = [user_ids[row] for row in order.tolist()]
+            for start in range(0, len(epoch_user_ids), batch_size):
+                self._train_batch(
+                    model=model,
+                    use_case=use_case,
+                    user_ids=epoch_user_ids[start : start + batch_size],
+                )
 
+    def _train_per_user(
+        self, model: MachineLearningModel, use_case: str, user_ids: Collection[str]
+    ) -> None:
         for user_id in user_ids:
-            features: dict[str, int | float] = self.feature_repository.get_features(
+            features: shared_types.FeatureVector = self.feature_repository.get_features(
                 use_case=use_case, user_id=user_id
             )
             target: int | float = self.feature_repository.get_target(
                 use_case=use_case, user_id=user_id
             )
             model.update_weights(features=features, target=target)
+
+    def _train_batch(
+        self, model: MachineLearningModel, use_case: str, user_ids: Sequence[str]
+    ) -> None:
+        features = self.feature_repository.get_features_batch(
+            user_ids=user_ids, use_case=use_case
+        )
+        targets: np.ndarray = self.feature_repository.get_targets(
+            user_ids=user_ids, use_case=use_case
+        )
+        model.update_weights_batch(features=features, targets=targets)
+
+
+def _train_in_worker(
+    trainer: Trainer, use_case: str
+) -> tuple[MachineLearningModel, float]:
+    started: float = time.perf_counter()
+    trainer.train(use_case=use_case)
+    return (
+        trainer.model_repository.get_model(use_case=use_case),
+        time.perf_counter() - started,
+    )
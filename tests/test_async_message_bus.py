@@ -0,0 +1,132 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+from src.orchestration import commands, messages
+from src.orchestration.async_message_bus import AsyncMessageBus
+from src.orchestration.command_handler import CommandHandler
+from src.orchestration.translator import MessageTranslator
+
+
+@dataclass
+class StubGetPrediction(commands.Command):
+    use_case: str
+
+
+@dataclass
+class StubWarmUp(commands.Command):
+    use_case: str
+
+
+@dataclass
+class StubMissing(messages.Error):
+    use_case: str
+
+
+class StubTranslator(MessageTranslator):
+    def get_next_command(
+        self, message: messages.Event | messages.Error
+    ) -> commands.Command:
+        assert isinstance(message, StubMissing)
+        return StubWarmUp(use_case=message.use_case)
+
+
+class TestAsyncMessageBus:
+    def test_errors_are_resolved_before_the_command_is_retried(self):
+        loaded: set[str] = set()
+
+        async def stub_get_prediction(cmd: StubGetPrediction):
+            if cmd.use_case not in loaded:
+                return StubMissing(use_case=cmd.use_case)
+            return messages.NewPrediction(prediction=1.0)
+
+        def stub_warm_up(cmd: StubWarmUp):
+            loaded.add(cmd.use_case)
+
+        bus = AsyncMessageBus(
+            translator=StubTranslator(),
+            handler=CommandHandler(
+                handlers={
+                    StubGetPrediction: stub_get_prediction,
+                    StubWarmUp: stub_warm_up,
+                }
+            ),
+        )
+
+        prediction = asyncio.run(bus.dispatch(StubGetPrediction(use_case="stub")))
+
+        assert prediction == 1.0
+        assert list(bus.log) == [
+            StubGetPrediction(use_case="stub"),
+            StubMissing(use_case="stub"),
+            StubWarmUp(use_case="stub"),
+            StubGetPrediction(use_case="stub"),
+        ]
+
+    def test_blocking_handlers_do_not_stall_other_dispatches(self):
+        loaded: set[str] = {"fast"}
+
+        def stub_get_prediction(cmd: StubGetPrediction):
+            if cmd.use_case not in loaded:
+                return StubMissing(use_case=cmd.use_case)
+            return messages.NewPrediction(prediction=1.0)
+
+        def stub_warm_up(cmd: StubWarmUp):
+            time.sleep(0.2)
+            loaded.add(cmd.use_case)
+
+        bus = AsyncMessageBus(
+            translator=StubTranslator(),
+            handler=CommandHandler(
+                handlers={
+                    StubGetPrediction: stub_get_prediction,
+                    StubWarmUp: stub_warm_up,
+                }
+            ),
+        )
+        finished: list[str] = []
+
+        async def predict(use_case: str) -> None:
+            await bus.dispatch(StubGetPrediction(use_case=use_case))
+            finished.append(use_case)
+
+        async def run() -> None:
+            await asyncio.gather(predict("slow"), predict("fast"))
+
+        asyncio.run(run())
+
+        assert finished == ["fast", "slow"]
+
+    def test_concurrent_dispatches_share_one_warm_up(self):
+        loaded: set[str] = set()
+        warm_ups: list[str] = []
+
+        def stub_get_prediction(cmd: StubGetPrediction):
+            if cmd.use_case not in loaded:
+                return StubMissing(use_case=cmd.use_case)
+            return messages.NewPrediction(prediction=1.0)
+
+        async def stub_warm_up(cmd: StubWarmUp):
+            warm_ups.append(cmd.use_case)
+            await asyncio.sleep(0.01)
+            loaded.add(cmd.use_case)
+
+        bus = AsyncMessageBus(
+            translator=StubTranslator(),
+            handler=CommandHandler(
+                handlers={
+                    StubGetPrediction: stub_get_prediction,
+                    StubWarmUp: stub_warm_up,
+                },
+                inline=frozenset({StubGetPrediction}),
+            ),
+        )
+
+        async def run() -> list:
+            return await asyncio.gather(
+                *(bus.dispatch(StubGetPrediction(use_case="stub")) for _ in range(100))
+            )
+
+        assert asyncio.run(run()) == [1.0] * 100
+        assert warm_ups == ["stub"]
+        assert bus.single_flight.stats.coalesced == 99
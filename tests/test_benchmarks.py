@@ -0,0 +1,70 @@
+import numpy as np
+
+from benchmarks.runner import BenchmarkResult, find_regressions
+from benchmarks.suite import run_benchmarks
+from benchmarks.workload import WorkloadConfig, generate_workload
+
+
+class TestWorkload:
+    def test_same_seed_generates_the_same_data(self) -> None:
+        config = WorkloadConfig(n_users=20, n_features=3, n_use_cases=2, seed=3)
+
+        first = generate_workload(config)
+        second = generate_workload(config)
+
+        for use_case in first.use_cases:
+            np.testing.assert_array_equal(
+                first.feature_store.get_current_table(use_case).matrix,
+                second.feature_store.get_current_table(use_case).matrix,
+            )
+
+    def test_sparsity_leaves_the_requested_fraction_missing(self) -> None:
+        workload = generate_workload(
+            WorkloadConfig(n_users=2_000, n_features=10, n_use_cases=1, sparsity=0.3)
+        )
+
+        matrix = workload.feature_store.get_current_table("use_case_0").matrix
+
+        assert abs(np.isnan(matrix).mean() - 0.3) < 0.02
+
+
+class TestBenchmarkSuite:
+    def test_reports_every_benchmark(self) -> None:
+        workload = generate_workload(
+            WorkloadConfig(n_users=50, n_features=3, n_use_cases=2)
+        )
+
+        results = run_benchmarks(workload, n_requests=20)
+
+        assert {result.name for result in results} >= {
+            "message_bus.dispatch.cold",
+            "message_bus.dispatch.warm",
+            "message_bus.dispatch.overhead",
+            "inference_engine.get_prediction",
+            "handlers.publish_features_for_inference",
+            "trainer.train.per_user",
+        }
+        assert all(result.operations > 0 for result in results)
+
+    def test_flags_throughput_and_latency_regressions(self) -> None:
+        baseline = BenchmarkResult(
+            name="stub",
+            operations=1,
+            seconds=1.0,
+            ops_per_second=100.0,
+            p50_ms=1.0,
+            p99_ms=2.0,
+            peak_rss_mb=1.0,
+        )
+        slower = BenchmarkResult(
+            name="stub",
+            operations=1,
+            seconds=1.0,
+            ops_per_second=50.0,
+            p50_ms=1.0,
+            p99_ms=4.0,
+            peak_rss_mb=1.0,
+        )
+
+        assert find_regressions([baseline.as_dict()], [baseline]) == []
+        assert len(find_regressions([baseline.as_dict()], [slower])) == 2
@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+from src.common import shared_types
+from src.common.features import FeatureMatrix
+from src.common.models import MachineLearningModel
+from src.services.training import data_parallel
+from src.services.training.data_parallel import DataParallelTrainer, SharedTrainingData
+from src.services.training.repositories import (
+    InMemoryFeatureRepository,
+    InMemoryModelRepository,
+)
+
+
+@dataclass
+class StubLinearModel(MachineLearningModel):
+    learning_rate: float = 0.1
+
+    def update_weights(
+        self, features: shared_types.FeatureVector, target: shared_types.Target
+    ) -> None:
+        raise NotImplementedError()
+
+    def predict(self, features: shared_types.FeatureVector) -> float:
+        raise NotImplementedError()
+
+    def compute_gradient(self, features, targets: np.ndarray) -> np.ndarray:
+        array: np.ndarray = FeatureMatrix.from_vectors(features).array
+        errors: np.ndarray = array @ np.asarray(self.weights) - targets
+        return array.T @ errors / len(targets)
+
+    def apply_gradient(self, gradient: np.ndarray) -> None:
+        self.weights = (
+            np.asarray(self.weights) - self.learning_rate * gradient
+        ).tolist()
+
+
+def make_feature_repository(use_case: str, n_users: int) -> InMemoryFeatureRepository:
+    rng = np.random.default_rng(0)
+    inputs = rng.normal(size=(n_users, 2))
+    return InMemoryFeatureRepository(
+        features={
+            use_case: {
+                f"user_{i}": {"feature1": inputs[i, 0], "feature2": inputs[i, 1]}
+                for i in range(n_users)
+            }
+        },
+        targets={
+            use_case: {
+                f"user_{i}": 2 * inputs[i, 0] - inputs[i, 1] for i in range(n_users)
+            }
+        },
+    )
+
+
+class TestDataParallelTrainer:
+    def test_matches_single_worker_training(self) -> None:
+        stub_use_case = "stub_use_case"
+        feature_repository = make_feature_repository(stub_use_case, n_users=101)
+
+        def train(workers: int) -> list[float]:
+            model_repository = InMemoryModelRepository(
+                registry={stub_use_case: StubLinearModel(weights=[0.0, 0.0])}
+            )
+            DataParallelTrainer(
+                feature_repository=feature_repository,
+                model_repository=model_repository,
+                workers=workers,
+                batch_size=25,
+                epochs=10,
+            ).train(use_case=stub_use_case)
+            return list(model_repository.get_model(use_case=stub_use_case).weights)
+
+        single_worker_weights = train(workers=1)
+
+        np.testing.assert_allclose(train(workers=3), single_worker_weights)
+        np.testing.assert_allclose(single_worker_weights, [2.0, -1.0], atol=0.5)
+
+    def test_rejects_models_without_gradient_hooks(self) -> None:
+        @dataclass
+        class StubModel(MachineLearningModel):
+            def update_weights(self, features, target) -> None: ...
+
+            def predict(self, features) -> float:
+                return 0.0
+
+        with pytest.raises(TypeError, match="compute_gradient"):
+            DataParallelTrainer(
+                model_repository=InMemoryModelRepository(
+                    registry={"stub_use_case": StubModel()}
+                )
+            ).train(use_case="stub_use_case")
+
+
+class TestSharedTrainingData:
+    def test_features_first_seen_in_a_later_batch_are_kept(self, monkeypatch) -> None:
+        stub_use_case = "stub_use_case"
+        monkeypatch.setattr(data_parallel, "LOAD_BATCH_SIZE", 2)
+        feature_repository = InMemoryFeatureRepository(
+            features={
+                stub_use_case: {
+                    "user_0": {"x": 0.0},
+                    "user_1": {"x": 1.0},
+                    "user_2": {"x": 2.0, "y": 20.0},
+                }
+            },
+            targets={stub_use_case: {"user_0": 0.0, "user_1": 1.0, "user_2": 2.0}},
+        )
+
+        data = SharedTrainingData.load(
+            feature_repository=feature_repository, use_case=stub_use_case
+        )
+        features, targets = (array.copy() for array in data.arrays())
+        data.release()
+
+        assert list(data.schema) == ["x", "y"]
+        np.testing.assert_array_equal(
+            features, [[0.0, np.nan], [1.0, np.nan], [2.0, 20.0]]
+        )
+        np.testing.assert_array_equal(targets, [0.0, 1.0, 2.0])
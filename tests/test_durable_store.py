@@ -0,0 +1,174 @@
+import pytest
+
+from src.common import exceptions
+from src.services.features.durable_store import DurableFeatureStore, WriteAheadLog
+
+
+class TestWriteAheadLog:
+    def test_replays_records_in_order_across_segments(self, tmp_path) -> None:
+        log = WriteAheadLog(tmp_path)
+        log.append(("a", 1))
+        closed = log.rotate()
+        log.append(("b", 2))
+        log.close()
+
+        assert list(WriteAheadLog(tmp_path).replay()) == [("a", 1), ("b", 2)]
+        assert list(WriteAheadLog(tmp_path).replay(after_segment=closed)) == [("b", 2)]
+
+    def test_drops_a_torn_tail(self, tmp_path) -> None:
+        log = WriteAheadLog(tmp_path)
+        log.append("kept")
+        log.append("torn")
+        log.close()
+        [segment] = tmp_path.glob("*.wal")
+        segment.write_bytes(segment.read_bytes()[:-2])
+
+        reopened = WriteAheadLog(tmp_path)
+        assert list(reopened.replay()) == ["kept"]
+        reopened.append("after")
+        reopened.close()
+
+        assert list(WriteAheadLog(tmp_path).replay()) == ["kept", "after"]
+
+
+class TestDurableFeatureStore:
+    def test_restart_replays_logged_mutations(self, tmp_path) -> None:
+        stub_use_case = "stub_use_case"
+        feature_store = DurableFeatureStore(root=tmp_path)
+        feature_store.upsert_current_features(
+            use_case=stub_use_case,
+            feature_set={"a": {"x": 1.0}, "b": {"x": 2.0}, "c": {"x": 3.0}},
+        )
+        feature_store.update_current_features(
+            use_case=stub_use_case, feature_set={"a": {"y": 5.0}}
+        )
+        feature_store.delete_current_features(use_case=stub_use_case, user_ids=["b"])
+        feature_store.close()
+
+        restarted = DurableFeatureStore(root=tmp_path)
+
+        assert restarted.get_current_feature_set(stub_use_case) == {
+            "a": {"x": 1.0, "y": 5.0},
+            "c": {"x": 3.0},
+        }
+        assert restarted.get_current_feature_version(stub_use_case) == 3
+
+    def test_restart_loads_the_snapshot_then_the_log_tail(self, tmp_path) -> None:
+        stub_use_case = "stub_use_case"
+        feature_store = DurableFeatureStore(root=tmp_path, snapshot_every=2)
+        for value in range(5):
+            feature_store.upsert_current_features(
+                use_case=stub_use_case, feature_set={f"user_{value}": {"x": value}}
+            )
+        feature_store.close()
+
+        assert len(list((tmp_path / "log").glob("*.wal"))) == 1
+        restarted = DurableFeatureStore(root=tmp_path, snapshot_every=2)
+
+        assert restarted.get_current_feature_set(stub_use_case) == {
+            f"user_{value}": {"x": value} for value in range(5)
+        }
+        assert restarted.get_current_feature_version(stub_use_case) == 5
+        restarted.upsert_current_features(
+            use_case=stub_use_case, feature_set={"user_0": {"x": 10.0}}
+        )
+        assert restarted.get_current_features(
+            user_id="user_0", use_case=stub_use_case
+        ) == {"x": 10.0}
+
+    def test_deltas_before_the_snapshot_are_unavailable_after_restart(
+        self, tmp_path
+    ) -> None:
+        stub_use_case = "stub_use_case"
+        feature_store = DurableFeatureStore(root=tmp_path)
+        feature_store.upsert_current_features(
+            use_case=stub_use_case, feature_set={"a": {"x": 1.0}}
+        )
+        feature_store.snapshot()
+        feature_store.upsert_current_features(
+            use_case=stub_use_case, feature_set={"b": {"x": 2.0}}
+        )
+        feature_store.close()
+
+        restarted = DurableFeatureStore(root=tmp_path)
+
+        assert list(
+            restarted.get_current_feature_delta(
+                use_case=stub_use_case, since_version=1
+            ).upserts
+        ) == ["b"]
+        with pytest.raises(exceptions.FeatureDeltaUnavailable):
+            restarted.get_current_feature_delta(use_case=stub_use_case, since_version=0)
+
+    def test_failed_mutations_are_not_logged(self, tmp_path) -> None:
+        feature_store = DurableFeatureStore(root=tmp_path)
+        with pytest.raises(KeyError):
+            feature_store.delete_current_features(use_case="unknown", user_ids=["a"])
+        feature_store.close()
+
+        DurableFeatureStore(root=tmp_path)
+
+    def test_features_passed_to_the_constructor_are_logged(self, tmp_path) -> None:
+        stub_use_case = "stub_use_case"
+        DurableFeatureStore(
+            current_features={stub_use_case: {"a": {"x": 1.0}}}, root=tmp_path
+        ).close()
+
+        restarted = DurableFeatureStore(root=tmp_path)
+
+        assert restarted.get_current_feature_set(stub_use_case) == {"a": {"x": 1.0}}
+        assert restarted.get_current_feature_version(stub_use_case) == 1
+
+    def test_constructor_features_are_rejected_for_a_root_with_data(
+        self, tmp_path
+    ) -> None:
+        stub_use_case = "stub_use_case"
+        DurableFeatureStore(
+            current_features={stub_use_case: {"a": {"x": 1.0}}}, root=tmp_path
+        ).close()
+
+        with pytest.raises(ValueError):
+            DurableFeatureStore(
+                current_features={stub_use_case: {"a": {"x": 2.0}}}, root=tmp_path
+            )
+
+        restarted = DurableFeatureStore(root=tmp_path)
+        assert restarted.get_current_feature_set(stub_use_case) == {"a": {"x": 1.0}}
+        assert restarted.get_current_feature_version(stub_use_case) == 1
+
+    def test_snapshots_are_written_from_copies_in_the_background(
+        self, tmp_path
+    ) -> None:
+        stub_use_case = "stub_use_case"
+        feature_store = DurableFeatureStore(root=tmp_path, snapshot_every=1)
+        feature_store.upsert_current_features(
+            use_case=stub_use_case, feature_set={"a": {"x": 1.0}}
+        )
+        feature_store.upsert_current_features(
+            use_case=stub_use_case, feature_set={"a": {"x": 2.0}}
+        )
+        feature_store.close()
+
+        assert (tmp_path / "snapshots" / "CURRENT").exists()
+        restarted = DurableFeatureStore(root=tmp_path)
+        assert restarted.get_current_features(user_id="a", use_case=stub_use_case) == {
+            "x": 2.0
+        }
+        assert restarted.get_current_feature_version(stub_use_case) == 2
+
+    def test_leftover_snapshot_staging_is_removed_on_recovery(self, tmp_path) -> None:
+        stub_use_case = "stub_use_case"
+        feature_store = DurableFeatureStore(root=tmp_path)
+        feature_store.upsert_current_features(
+            use_case=stub_use_case, feature_set={"a": {"x": 1.0}}
+        )
+        feature_store.snapshot()
+        feature_store.close()
+        snapshots = tmp_path / "snapshots"
+        (snapshots / ".stub.tmp" / stub_use_case).mkdir(parents=True)
+        (snapshots / ".CURRENT.tmp").write_text("stub")
+
+        restarted = DurableFeatureStore(root=tmp_path)
+
+        assert not list(snapshots.glob(".*.tmp"))
+        assert restarted.get_current_feature_set(stub_use_case) == {"a": {"x": 1.0}}
@@ -7,6 +7,7 @@ from src.orchestration import (
 )
 from src.common import shared_types, models
 from src.common.models import MachineLearningModel
+from src.common.predictions import BatchPrediction
 from src.services.inference.inference_engine import InferenceEngine
 from src.services.model_registry.model_registry import InMemoryModelRegistry
 from src.services.features.feature_store import InMemoryFeatureStore
@@ -95,3 +96,184 @@ def test_inference_engine_can_use_trained_model_for_prediction() -> None:
     actual_prediction: float | None = bus.dispatch(command=command)
 
     assert actual_prediction == expected_prediction
+
+
+def test_batch_prediction_warms_up_inference_engine_once() -> None:
+    stub_use_case = "stub_use_case"
+    stub_feature_name = "stub_feature_name"
+
+    feature_store = InMemoryFeatureStore(
+        current_features={
+            stub_use_case: {
+                "user_1": {stub_feature_name: 1},
+                "user_2": {stub_feature_name: 2},
+            }
+        },
+    )
+
+    class StubModel(models.RulesBasedModel):
+        def predict(self, features: shared_types.FeatureVector) -> float:
+            return features[stub_feature_name] / 10
+
+    model_registry = InMemoryModelRegistry(registry={stub_use_case: StubModel()})
+    inference_engine = InferenceEngine()
+
+    handler = command_handler.CommandHandler(
+        handlers={
+            commands.GetBatchPrediction: lambda c: handlers.get_batch_prediction(
+                cmd=c, predictor=inference_engine
+            ),
+            commands.PublishModelForInference: lambda c: (
+                handlers.publish_model_for_inference(
+                    cmd=c, model_registry=model_registry
+                )
+            ),
+            commands.AddModelForInference: lambda c: handlers.add_model_for_inference(
+                cmd=c, model_registry=inference_engine
+            ),
+            commands.PublishInferenceFeatures: lambda c: (
+                handlers.publish_features_for_inference(
+                    cmd=c, feature_store=feature_store
+                )
+            ),
+            commands.AddFeaturesForInference: lambda c: (
+                handlers.add_features_for_inference(
+                    cmd=c, feature_repository=inference_engine
+                )
+            ),
+        }
+    )
+    bus = message_bus.MessageBus(
+        translator=translator.MessageTranslator(), handler=handler
+    )
+
+    batch = bus.dispatch(
+        command=commands.GetBatchPrediction(
+            use_case=stub_use_case, user_ids=["user_1", "user_2", "user_3"]
+        )
+    )
+
+    assert isinstance(batch, BatchPrediction)
+    assert batch.as_dict() == {"user_1": 0.1, "user_2": 0.2}
+    assert batch.missing_user_ids == ["user_3"]
+
+
+def make_inference_bus(
+    feature_store: InMemoryFeatureStore,
+    model_registry: InMemoryModelRegistry,
+    inference_engine: InferenceEngine,
+) -> message_bus.MessageBus:
+    handler = command_handler.CommandHandler(
+        handlers={
+            commands.GetPrediction: lambda c: handlers.get_prediction(
+                cmd=c, predictor=inference_engine
+            ),
+            commands.PublishModelForInference: lambda c: (
+                handlers.publish_model_for_inference(
+                    cmd=c, model_registry=model_registry
+                )
+            ),
+            commands.AddModelForInference: lambda c: handlers.add_model_for_inference(
+                cmd=c, model_registry=inference_engine
+            ),
+            commands.PublishInferenceFeatures: lambda c: (
+                handlers.publish_features_for_inference(
+                    cmd=c, feature_store=feature_store
+                )
+            ),
+            commands.AddFeaturesForInference: lambda c: (
+                handlers.add_features_for_inference(
+                    cmd=c, feature_repository=inference_engine
+                )
+            ),
+            commands.PublishInferenceFeatureDelta: lambda c: (
+                handlers.publish_feature_delta_for_inference(
+                    cmd=c, feature_store=feature_store
+                )
+            ),
+            commands.ApplyFeatureDeltaForInference: lambda c: (
+                handlers.apply_feature_delta_for_inference(
+                    cmd=c, feature_repository=inference_engine
+                )
+            ),
+        }
+    )
+    return message_bus.MessageBus(
+        translator=translator.MessageTranslator(), handler=handler
+    )
+
+
+class EchoFeatureModel(models.RulesBasedModel):
+    def predict(self, features: shared_types.FeatureVector) -> float:
+        return features["stub_feature_name"]
+
+
+def test_feature_delta_refreshes_inference_in_place() -> None:
+    stub_use_case = "stub_use_case"
+    feature_store = InMemoryFeatureStore(
+        current_features={
+            stub_use_case: {f"user_{i}": {"stub_feature_name": i} for i in range(10)}
+        }
+    )
+    inference_engine = InferenceEngine()
+    bus = make_inference_bus(
+        feature_store=feature_store,
+        model_registry=InMemoryModelRegistry(
+            registry={stub_use_case: EchoFeatureModel()}
+        ),
+        inference_engine=inference_engine,
+    )
+    bus.dispatch(
+        command=commands.GetPrediction(use_case=stub_use_case, user_id="user_1")
+    )
+
+    feature_store.upsert_current_features(
+        use_case=stub_use_case, feature_set={"user_1": {"stub_feature_name": 100}}
+    )
+    feature_store.delete_current_features(use_case=stub_use_case, user_ids=["user_2"])
+    bus.dispatch(
+        command=commands.PublishInferenceFeatureDelta(
+            use_case=stub_use_case,
+            since_version=inference_engine.get_feature_version(use_case=stub_use_case),
+        )
+    )
+
+    assert inference_engine.get_feature_version(use_case=stub_use_case) == 2
+    assert (
+        inference_engine.get_prediction(user_id="user_1", use_case=stub_use_case) == 100
+    )
+    assert inference_engine.get_predictions(
+        user_ids=["user_2"], use_case=stub_use_case
+    ).missing_user_ids == ["user_2"]
+
+
+def test_feature_delta_falls_back_to_full_publish_when_inference_is_cold() -> None:
+    stub_use_case = "stub_use_case"
+    feature_store = InMemoryFeatureStore(
+        current_features={stub_use_case: {"user_1": {"stub_feature_name": 1}}}
+    )
+    feature_store.upsert_current_features(
+        use_case=stub_use_case, feature_set={"user_1": {"stub_feature_name": 5}}
+    )
+    inference_engine = InferenceEngine()
+    bus = make_inference_bus(
+        feature_store=feature_store,
+        model_registry=InMemoryModelRegistry(
+            registry={stub_use_case: EchoFeatureModel()}
+        ),
+        inference_engine=inference_engine,
+    )
+
+    bus.dispatch(
+        command=commands.PublishInferenceFeatureDelta(
+            use_case=stub_use_case, since_version=0
+        )
+    )
+
+    assert inference_engine.get_feature_version(use_case=stub_use_case) == 1
+    assert (
+        bus.dispatch(
+            command=commands.GetPrediction(use_case=stub_use_case, user_id="user_1")
+        )
+        == 5
+    )
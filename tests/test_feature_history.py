@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+
+from src.common.feature_history import FeatureHistory
+from src.common.features import FeatureMatrix, FeatureSchema
+from src.services.features.feature_store import InMemoryFeatureStore
+
+
+class TestFeatureHistory:
+    def test_as_of_returns_latest_features_at_or_before_each_time(self) -> None:
+        history = FeatureHistory()
+        history.append(user_id="a", timestamp=10.0, features={"x": 1.0})
+        history.append(user_id="a", timestamp=20.0, features={"x": 2.0})
+        history.append(user_id="b", timestamp=15.0, features={"x": 3.0})
+
+        matrix = history.as_of(
+            user_ids=["a", "a", "a", "b", "b"],
+            timestamps=[5.0, 10.0, 19.9, 14.0, 100.0],
+        )
+
+        np.testing.assert_array_equal(
+            matrix.array[:, 0], [np.nan, 1.0, 1.0, np.nan, 3.0]
+        )
+
+    def test_out_of_order_appends_are_sorted_by_time(self) -> None:
+        history = FeatureHistory()
+        history.append(user_id="a", timestamp=20.0, features={"x": 2.0})
+        history.as_of(user_ids=["a"], timestamps=[0.0])
+        history.append(user_id="a", timestamp=10.0, features={"x": 1.0})
+
+        matrix = history.as_of(user_ids=["a", "a"], timestamps=[15.0, 25.0])
+
+        np.testing.assert_array_equal(matrix.array[:, 0], [1.0, 2.0])
+
+    def test_later_append_at_the_same_time_wins(self) -> None:
+        history = FeatureHistory()
+        history.append(user_id="a", timestamp=10.0, features={"x": 1.0})
+        history.append(user_id="a", timestamp=10.0, features={"x": 2.0})
+
+        assert history.get_features(user_id="a", timestamp=10.0) == {"x": 2.0}
+
+    def test_new_features_are_missing_from_earlier_observations(self) -> None:
+        history = FeatureHistory()
+        history.append(user_id="a", timestamp=10.0, features={"x": 1.0})
+        history.append(user_id="a", timestamp=20.0, features={"x": 2.0, "y": 5.0})
+
+        assert history.get_features(user_id="a", timestamp=10.0) == {"x": 1.0}
+        assert history.get_features(user_id="a", timestamp=20.0) == {
+            "x": 2.0,
+            "y": 5.0,
+        }
+
+    def test_unknown_users_and_early_times_have_no_features(self) -> None:
+        history = FeatureHistory()
+        history.append(user_id="a", timestamp=10.0, features={"x": 1.0})
+
+        with pytest.raises(KeyError):
+            history.get_features(user_id="a", timestamp=9.0)
+        with pytest.raises(KeyError):
+            history.get_features(user_id="unknown", timestamp=10.0)
+
+    def test_matches_a_linear_scan_on_random_histories(self) -> None:
+        rng = np.random.default_rng(0)
+        n_observations = 2_000
+        user_ids = [f"user_{code}" for code in rng.integers(50, size=n_observations)]
+        timestamps = rng.integers(100, size=n_observations).astype(float)
+        values = rng.normal(size=(n_observations, 2))
+        history = FeatureHistory()
+        history.extend(
+            user_ids=user_ids,
+            timestamps=timestamps,
+            features=FeatureMatrix(schema=FeatureSchema(["x", "y"]), array=values),
+        )
+        lookup_user_ids = [f"user_{code}" for code in rng.integers(55, size=500)]
+        lookup_timestamps = rng.uniform(-5, 105, size=500)
+
+        matrix = history.as_of(user_ids=lookup_user_ids, timestamps=lookup_timestamps)
+
+        for row, (user_id, timestamp) in enumerate(
+            zip(lookup_user_ids, lookup_timestamps)
+        ):
+            candidates = [
+                position
+                for position in range(n_observations)
+                if user_ids[position] == user_id and timestamps[position] <= timestamp
+            ]
+            expected = (
+                values[max(candidates, key=lambda p: (timestamps[p], p))]
+                if candidates
+                else [np.nan, np.nan]
+            )
+            np.testing.assert_array_equal(matrix.array[row], expected)
+
+    def test_latest_returns_each_users_most_recent_features(self) -> None:
+        history = FeatureHistory()
+        history.append(user_id="a", timestamp=20.0, features={"x": 2.0})
+        history.append(user_id="a", timestamp=10.0, features={"x": 1.0})
+        history.append(user_id="b", timestamp=5.0, features={"x": 3.0})
+
+        latest = history.latest()
+
+        assert latest.to_feature_set() == {"a": {"x": 2.0}, "b": {"x": 3.0}}
+
+    def test_appends_after_a_read_merge_into_the_stored_observations(
+        self,
+    ) -> None:
+        history = FeatureHistory()
+        history.append(user_id="a", timestamp=10.0, features={"x": 1.0})
+        history.append(user_id="b", timestamp=30.0, features={"x": 5.0})
+        history.as_of(user_ids=["a"], timestamps=[0.0])
+        history.append(user_id="a", timestamp=10.0, features={"x": 2.0})
+        history.append(user_id="a", timestamp=20.0, features={"x": 3.0})
+        history.append(user_id="b", timestamp=5.0, features={"x": 4.0})
+
+        matrix = history.as_of(
+            user_ids=["a", "a", "b", "b"], timestamps=[10.0, 25.0, 10.0, 30.0]
+        )
+
+        np.testing.assert_array_equal(matrix.array[:, 0], [2.0, 3.0, 4.0, 5.0])
+
+
+class TestFeatureStoreHistory:
+    def test_timestamped_upserts_are_joined_as_of_label_times(self) -> None:
+        stub_use_case = "stub_use_case"
+        feature_store = InMemoryFeatureStore()
+        feature_store.upsert_current_features(
+            use_case=stub_use_case, feature_set={"a": {"x": 1.0}}, timestamp=10.0
+        )
+        feature_store.upsert_current_features(
+            use_case=stub_use_case, feature_set={"a": {"x": 2.0}}, timestamp=20.0
+        )
+
+        matrix = feature_store.get_features_as_of(
+            use_case=stub_use_case, user_ids=["a", "a"], timestamps=[15.0, 20.0]
+        )
+
+        np.testing.assert_array_equal(matrix.array[:, 0], [1.0, 2.0])
+        assert feature_store.get_current_features(
+            user_id="a", use_case=stub_use_case
+        ) == {"x": 2.0}
+
+    def test_timestamped_updates_record_whole_vectors(self) -> None:
+        stub_use_case = "stub_use_case"
+        feature_store = InMemoryFeatureStore()
+        feature_store.upsert_current_features(
+            use_case=stub_use_case, feature_set={"a": {"x": 1.0, "y": 1.0}}
+        )
+        feature_store.update_current_features(
+            use_case=stub_use_case, feature_set={"a": {"y": 2.0}}, timestamp=10.0
+        )
+
+        matrix = feature_store.get_features_as_of(
+            use_case=stub_use_case, user_ids=["a"], timestamps=[10.0]
+        )
+
+        assert matrix[0].to_dict() == {"x": 1.0, "y": 2.0}
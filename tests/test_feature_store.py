@@ -1,5 +1,6 @@
 import pytest
-from src.common import shared_types
+import numpy as np
+from src.common import exceptions, shared_types
 from src.services.features.feature_store import InMemoryFeatureStore
 
 
@@ -110,3 +111,98 @@ class TestFeatureStore:
             feature_store.get_historical_features(
                 user_id="stub_user", use_case="missing_use_case"
             )
+
+    def test_get_target_returns_target_for_user(self) -> None:
+        """Test that get_target returns the stored target for a user."""
+        stub_use_case = "stub_use_case"
+        stub_user_id = "stub_user"
+
+        feature_store = InMemoryFeatureStore(targets={stub_use_case: {stub_user_id: 5}})
+
+        actual_target = feature_store.get_target(
+            user_id=stub_user_id, use_case=stub_use_case
+        )
+
+        assert actual_target == 5
+
+    def test_current_table_exposes_zero_copy_views(self) -> None:
+        """Test that matrix and column views share memory with the stored table."""
+        stub_use_case = "stub_use_case"
+
+        feature_store = InMemoryFeatureStore(
+            current_features={
+                stub_use_case: {
+                    "user1": {"watch_count": 10, "rating_avg": 4.5},
+                    "user2": {"watch_count": 3},
+                }
+            }
+        )
+
+        table = feature_store.get_current_table(use_case=stub_use_case)
+        table.column("watch_count")[1] = 7
+
+        assert table.matrix.shape == (2, 2)
+        assert np.shares_memory(table.matrix, table.column("rating_avg"))
+        assert feature_store.get_current_features(
+            user_id="user2", use_case=stub_use_case
+        ) == {"watch_count": 7}
+
+
+class TestFeatureStoreDeltas:
+    def test_delta_contains_only_changes_since_version(self) -> None:
+        """Test that a delta carries the users upserted and deleted after a version."""
+        stub_use_case = "stub_use_case"
+        feature_store = InMemoryFeatureStore(
+            current_features={
+                stub_use_case: {f"user_{i}": {"feature1": i} for i in range(5)}
+            }
+        )
+
+        first_version = feature_store.upsert_current_features(
+            use_case=stub_use_case, feature_set={"user_1": {"feature1": 10}}
+        )
+        feature_store.upsert_current_features(
+            use_case=stub_use_case, feature_set={"user_5": {"feature1": 5}}
+        )
+        latest_version = feature_store.delete_current_features(
+            use_case=stub_use_case, user_ids=["user_2"]
+        )
+
+        delta = feature_store.get_current_feature_delta(
+            use_case=stub_use_case, since_version=first_version
+        )
+
+        assert (delta.from_version, delta.to_version) == (1, latest_version)
+        assert delta.upserts.to_feature_set() == {"user_5": {"feature1": 5.0}}
+        assert delta.deletes == ("user_2",)
+
+    def test_published_feature_set_is_a_snapshot(self) -> None:
+        """Test that later upserts do not leak into an already published set."""
+        stub_use_case = "stub_use_case"
+        feature_store = InMemoryFeatureStore(
+            current_features={stub_use_case: {"user_1": {"feature1": 1}}}
+        )
+
+        published = feature_store.get_current_feature_set(use_case=stub_use_case)
+        feature_store.upsert_current_features(
+            use_case=stub_use_case, feature_set={"user_1": {"feature1": 2}}
+        )
+
+        assert published["user_1"] == {"feature1": 1}
+
+    def test_delta_before_forgotten_changes_is_unavailable(self) -> None:
+        """Test that deltas older than the retained horizon are refused."""
+        stub_use_case = "stub_use_case"
+        feature_store = InMemoryFeatureStore(
+            current_features={stub_use_case: {"user_1": {"feature1": 1}}}
+        )
+        version = feature_store.delete_current_features(
+            use_case=stub_use_case, user_ids=["user_1"]
+        )
+
+        feature_store.forget_changes_before(use_case=stub_use_case, version=version)
+
+        with pytest.raises(expected_exception=exceptions.FeatureDeltaUnavailable):
+            feature_store.get_current_feature_delta(
+                use_case=stub_use_case, since_version=0
+            )
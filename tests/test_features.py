@@ -0,0 +1,172 @@
+import numpy as np
+import pytest
+
+from src.common.features import (
+    FeatureDelta,
+    FeatureMatrix,
+    FeatureRow,
+    FeatureSchema,
+    FeatureTable,
+    LayeredFeatureSet,
+    to_array,
+)
+
+
+class TestFeatureTable:
+    def test_round_trips_feature_set_with_missing_features(self) -> None:
+        stub_feature_set = {
+            "user_1": {"feature_1": 1.0, "feature_2": 2.0},
+            "user_2": {"feature_2": 3.0},
+        }
+
+        table = FeatureTable.from_feature_set(stub_feature_set)
+
+        assert table.to_feature_set() == stub_feature_set
+        assert list(table.feature_names) == ["feature_1", "feature_2"]
+        assert np.isnan(table.matrix[1, 0])
+
+    def test_columns_are_contiguous(self) -> None:
+        table = FeatureTable.from_feature_set(
+            {f"user_{i}": {"feature_1": i, "feature_2": -i} for i in range(10)}
+        )
+
+        column = table.column("feature_2")
+
+        assert column.flags.c_contiguous
+        assert column.tolist() == [-i for i in range(10)]
+
+    def test_upsert_replaces_vector_and_adds_new_features(self) -> None:
+        table = FeatureTable.from_feature_set({"user_1": {"feature_1": 1.0}})
+
+        table.upsert(user_id="user_1", features={"feature_2": 2.0})
+        table.upsert(user_id="user_2", features={"feature_1": 3.0})
+
+        assert table["user_1"] == {"feature_2": 2.0}
+        assert table["user_2"] == {"feature_1": 3.0}
+
+    def test_delete_keeps_remaining_rows_addressable(self) -> None:
+        table = FeatureTable.from_feature_set(
+            {f"user_{i}": {"feature_1": i} for i in range(3)}
+        )
+
+        table.delete("user_0")
+
+        assert "user_0" not in table
+        assert set(table) == {"user_1", "user_2"}
+        assert table["user_2"] == {"feature_1": 2.0}
+        with pytest.raises(KeyError):
+            table["user_0"]
+
+
+class TestFeatureSchema:
+    def test_extend_appends_only_unseen_names(self) -> None:
+        schema = FeatureSchema(["feature_1", "feature_2"])
+
+        extended = schema.extend(["feature_2", "feature_3"])
+
+        assert extended.names == ("feature_1", "feature_2", "feature_3")
+        assert schema.extend(["feature_1"]) is schema
+
+
+class TestFeatureRow:
+    def test_supports_name_based_access_and_dict_round_trip(self) -> None:
+        schema = FeatureSchema(["feature_1", "feature_2", "feature_3"])
+
+        row = FeatureRow.from_dict({"feature_3": 3.0, "feature_1": 1.0}, schema=schema)
+
+        assert row["feature_1"] == 1.0
+        assert "feature_2" not in row
+        assert row == {"feature_1": 1.0, "feature_3": 3.0}
+        assert row.to_dict() == {"feature_1": 1.0, "feature_3": 3.0}
+
+    def test_to_array_is_zero_copy_for_matching_schema(self) -> None:
+        schema = FeatureSchema(["feature_1", "feature_2"])
+        row = FeatureRow(schema=schema, array=np.array([1.0, 2.0]))
+
+        assert to_array(row, schema) is row.array
+        reordered = to_array(row, FeatureSchema(["feature_2", "feature_0"]))
+        assert reordered[0] == 2.0
+        assert np.isnan(reordered[1])
+        assert to_array({"feature_2": 2.0}, schema)[1] == 2.0
+
+
+class TestFeatureMatrix:
+    def test_stacks_rows_and_dicts_into_requested_schema(self) -> None:
+        schema = FeatureSchema(["feature_1", "feature_2"])
+        vectors = [
+            FeatureRow(schema=schema, array=np.array([1.0, 2.0])),
+            {"feature_2": 4.0},
+        ]
+
+        matrix = FeatureMatrix.from_vectors(vectors, schema=schema)
+
+        assert matrix.array[0].tolist() == [1.0, 2.0]
+        assert np.isnan(matrix.array[1, 0])
+        assert matrix[1] == {"feature_2": 4.0}
+
+    def test_table_take_gathers_rows_in_request_order(self) -> None:
+        table = FeatureTable.from_feature_set(
+            {f"user_{i}": {"feature_1": i} for i in range(4)}
+        )
+
+        matrix = table.take(["user_3", "user_1"])
+
+        assert matrix.array[:, 0].tolist() == [3.0, 1.0]
+        assert table.get_rows(["user_2", "missing"])[1] is None
+
+
+class TestLayeredFeatureSet:
+    def test_apply_returns_new_set_and_leaves_original_untouched(self) -> None:
+        base = FeatureTable.from_feature_set(
+            {f"user_{i}": {"feature_1": i} for i in range(8)}
+        )
+        feature_set = LayeredFeatureSet(base=base, version=3)
+        delta = FeatureDelta(
+            use_case="stub_use_case",
+            from_version=3,
+            to_version=4,
+            upserts=FeatureTable.from_feature_set({"user_9": {"feature_1": 9}}),
+            deletes=("user_0",),
+        )
+
+        updated = feature_set.apply(delta)
+
+        assert updated.version == 4
+        assert "user_0" not in updated and "user_9" in updated
+        assert len(updated) == 8
+        assert updated.get_rows(["user_9", "user_1", "user_0"])[:2] == [
+            {"feature_1": 9.0},
+            {"feature_1": 1.0},
+        ]
+        assert "user_0" in feature_set and "user_9" not in feature_set
+
+    def test_large_overlays_are_compacted_into_the_base(self) -> None:
+        feature_set = LayeredFeatureSet(
+            base=FeatureTable.from_feature_set({"user_1": {"feature_1": 1}})
+        )
+        delta = FeatureDelta(
+            use_case="stub_use_case",
+            from_version=0,
+            to_version=1,
+            upserts=FeatureTable.from_feature_set({"user_2": {"feature_1": 2}}),
+        )
+
+        updated = feature_set.apply(delta)
+
+        assert not updated.overlay
+        assert updated.base.to_feature_set() == {
+            "user_1": {"feature_1": 1.0},
+            "user_2": {"feature_1": 2.0},
+        }
+
+    def test_rejects_delta_starting_after_current_version(self) -> None:
+        feature_set = LayeredFeatureSet(base=FeatureTable(), version=1)
+        delta = FeatureDelta(
+            use_case="stub_use_case",
+            from_version=2,
+            to_version=3,
+            upserts=FeatureTable(),
+        )
+
+        with pytest.raises(expected_exception=ValueError):
+            feature_set.apply(delta)
@@ -0,0 +1,125 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+from src.common import models, shared_types
+from src.orchestration import commands, handlers
+from src.services.model_registry.file_model_registry import FileModelRegistry
+
+
+class StubConstantModel(models.ConstantModel):
+    def predict(self) -> float:
+        return 0.5
+
+
+@dataclass
+class StubModel(models.MachineLearningModel):
+    bias: float = 0.0
+
+    def update_weights(
+        self, features: shared_types.FeatureVector, target: shared_types.Target
+    ) -> None:
+        raise NotImplementedError()
+
+    def predict(self, features: shared_types.FeatureVector) -> float:
+        return float(np.dot(self.weights, list(features.values()))) + self.bias
+
+
+class TestFileModelRegistry:
+    def test_models_survive_a_restart_with_memory_mapped_weights(
+        self, tmp_path
+    ) -> None:
+        stub_use_case = "stub_use_case"
+        FileModelRegistry(root=tmp_path).add_model(
+            use_case=stub_use_case, model=StubModel(weights=[1.0, 2.0], bias=0.5)
+        )
+
+        model = FileModelRegistry(root=tmp_path).get_model(use_case=stub_use_case)
+
+        assert isinstance(model, StubModel)
+        assert isinstance(model.weights, np.memmap)
+        assert not model.weights.flags.writeable
+        assert model.predict(features={"f1": 1.0, "f2": 1.0}) == 3.5
+
+    def test_callers_get_their_own_copy_sharing_the_weights(self, tmp_path) -> None:
+        stub_use_case = "stub_use_case"
+        registry = FileModelRegistry(root=tmp_path)
+        registry.add_model(
+            use_case=stub_use_case, model=StubModel(weights=[1.0, 2.0], bias=0.5)
+        )
+
+        model = registry.get_model(use_case=stub_use_case)
+        other_model = registry.get_model(use_case=stub_use_case)
+        assert isinstance(model, StubModel) and isinstance(other_model, StubModel)
+        model.bias = 10.0
+        model.weights = np.zeros(2)
+
+        assert other_model.bias == 0.5
+        assert registry.get_model(use_case=stub_use_case).bias == 0.5
+        assert np.shares_memory(
+            other_model.weights, registry.get_model(use_case=stub_use_case).weights
+        )
+
+    def test_stores_models_without_weights(self, tmp_path) -> None:
+        registry = FileModelRegistry(root=tmp_path)
+        registry.add_model(use_case="stub_use_case", model=StubConstantModel())
+
+        model = FileModelRegistry(root=tmp_path).get_model(use_case="stub_use_case")
+
+        assert model.predict() == 0.5
+
+    def test_lists_versions_and_serves_the_promoted_one(self, tmp_path) -> None:
+        stub_use_case = "stub_use_case"
+        registry = FileModelRegistry(root=tmp_path)
+        registry.register(
+            use_case=stub_use_case, model=StubModel(bias=1), metadata={"auc": 0.7}
+        )
+        registry.register(
+            use_case=stub_use_case, model=StubModel(bias=2), promote=False
+        )
+
+        versions = registry.list_versions(use_case=stub_use_case)
+
+        assert [version.version for version in versions] == [1, 2]
+        assert versions[0].metadata == {"auc": 0.7}
+        assert versions[0].model_class.endswith("StubModel")
+        assert registry.get_current_version(use_case=stub_use_case) == 1
+        registry.promote(use_case=stub_use_case, version=2)
+        assert registry.get_model(use_case=stub_use_case).bias == 2
+
+    def test_pinned_version_is_served_over_later_promotions(self, tmp_path) -> None:
+        stub_use_case = "stub_use_case"
+        registry = FileModelRegistry(root=tmp_path)
+        registry.register(use_case=stub_use_case, model=StubModel(bias=1))
+        registry.pin(use_case=stub_use_case, version=1)
+        registry.register(use_case=stub_use_case, model=StubModel(bias=2))
+
+        assert registry.get_model(use_case=stub_use_case).bias == 1
+        registry.unpin(use_case=stub_use_case)
+        assert registry.get_model(use_case=stub_use_case).bias == 2
+
+    def test_raises_error_for_unknown_use_case_or_version(self, tmp_path) -> None:
+        registry = FileModelRegistry(root=tmp_path)
+        registry.add_model(use_case="stub_use_case", model=StubConstantModel())
+
+        with pytest.raises(ValueError, match="No model found.*"):
+            registry.get_model(use_case="unknown")
+        with pytest.raises(ValueError, match="No model found.*"):
+            registry.get_model(use_case="stub_use_case", version=2)
+        with pytest.raises(ValueError, match="no model version"):
+            registry.promote(use_case="stub_use_case", version=2)
+
+    def test_add_model_to_registry_handler_registers_a_new_version(
+        self, tmp_path
+    ) -> None:
+        registry = FileModelRegistry(root=tmp_path)
+
+        handlers.add_model_to_registry(
+            cmd=commands.AddModelToRegistry(
+                use_case="stub_use_case", model=StubModel(weights=[1.0])
+            ),
+            model_registry=registry,
+        )
+
+        assert registry.get_current_version(use_case="stub_use_case") == 1
@@ -1,5 +1,11 @@
+from collections.abc import Sequence
+
+import numpy as np
+
 from src.common import models
+from src.common.features import FeatureDelta, FeatureTable
 from src.services.inference.inference_engine import InferenceEngine
+from src.services.inference.prediction_cache import PredictionCache
 from src.services.inference.repositories import (
     InMemoryFeatureRepository,
     InMemoryModelRepository,
@@ -115,3 +121,185 @@ class TestGetPrediction:
 
         assert prediction_1 == expected_prediction_user_1
         assert prediction_2 == expected_prediction_user_2
+
+
+class TestGetPredictions:
+    def test_constant_model_predicts_for_every_user(self) -> None:
+        stub_use_case = "stub_use_case"
+
+        class StubModel(ConstantModel):
+            def predict(self) -> float:
+                return 0.85
+
+        inference_engine = InferenceEngine(
+            model_repository=InMemoryModelRepository(
+                registry={stub_use_case: StubModel()}
+            ),
+            feature_repository=InMemoryFeatureRepository(),
+        )
+
+        batch = inference_engine.get_predictions(
+            user_ids=["user_1", "user_2"], use_case=stub_use_case
+        )
+
+        assert batch.predictions.tolist() == [0.85, 0.85]
+        assert batch.missing_user_ids == []
+
+    def test_falls_back_to_per_row_predict_and_reports_missing_users(self) -> None:
+        stub_use_case = "stub_use_case"
+        stub_feature = "stub_feature"
+
+        class StubModel(models.RulesBasedModel):
+            def predict(self, features: FeatureVector) -> float:
+                return features[stub_feature] * 2
+
+        inference_engine = InferenceEngine(
+            model_repository=InMemoryModelRepository(
+                registry={stub_use_case: StubModel()}
+            ),
+            feature_repository=InMemoryFeatureRepository(
+                features={
+                    stub_use_case: {
+                        "user_1": {stub_feature: 1},
+                        "user_3": {stub_feature: 3},
+                    }
+                }
+            ),
+        )
+
+        batch = inference_engine.get_predictions(
+            user_ids=["user_1", "user_2", "user_3"], use_case=stub_use_case
+        )
+
+        assert batch.predictions[[0, 2]].tolist() == [2, 6]
+        assert np.isnan(batch.predictions[1])
+        assert batch.missing_user_ids == ["user_2"]
+        assert batch.as_dict() == {"user_1": 2, "user_3": 6}
+
+    def test_calls_predict_batch_once_for_vectorized_models(self) -> None:
+        stub_use_case = "stub_use_case"
+        batch_calls: list[Sequence[FeatureVector]] = []
+
+        class StubModel(models.RulesBasedModel):
+            def predict(self, features: FeatureVector) -> float:
+                raise NotImplementedError
+
+            def predict_batch(self, features: Sequence[FeatureVector]) -> np.ndarray:
+                batch_calls.append(features)
+                return np.zeros(len(features))
+
+        inference_engine = InferenceEngine(
+            model_repository=InMemoryModelRepository(
+                registry={stub_use_case: StubModel()}
+            ),
+            feature_repository=InMemoryFeatureRepository(
+                features={stub_use_case: {f"user_{i}": {"f": i} for i in range(5)}}
+            ),
+        )
+
+        batch = inference_engine.get_predictions(
+            user_ids=[f"user_{i}" for i in range(5)], use_case=stub_use_case
+        )
+
+        assert len(batch_calls) == 1
+        assert batch.predictions.tolist() == [0.0] * 5
+
+
+class TestPredictionCaching:
+    def test_serves_repeated_predictions_from_cache(self) -> None:
+        stub_use_case = "stub_use_case"
+        predict_calls: list[FeatureVector] = []
+
+        class StubModel(models.RulesBasedModel):
+            def predict(self, features: FeatureVector) -> float:
+                predict_calls.append(features)
+                return features["f"]
+
+        inference_engine = InferenceEngine(
+            model_repository=InMemoryModelRepository(
+                registry={stub_use_case: StubModel()}
+            ),
+            feature_repository=InMemoryFeatureRepository(
+                features={stub_use_case: {"user_1": {"f": 1}, "user_2": {"f": 2}}}
+            ),
+            prediction_cache=PredictionCache(),
+        )
+
+        for _ in range(3):
+            inference_engine.get_prediction(user_id="user_1", use_case=stub_use_case)
+        inference_engine.get_prediction(user_id="user_2", use_case=stub_use_case)
+
+        assert len(predict_calls) == 2
+        assert inference_engine.prediction_cache is not None
+        assert inference_engine.prediction_cache.stats.hits == 2
+
+    def test_constant_models_are_cached_once_per_use_case(self) -> None:
+        stub_use_case = "stub_use_case"
+        predict_calls: list[None] = []
+
+        class StubModel(ConstantModel):
+            def predict(self) -> float:
+                predict_calls.append(None)
+                return 0.5
+
+        inference_engine = InferenceEngine(
+            model_repository=InMemoryModelRepository(
+                registry={stub_use_case: StubModel()}
+            ),
+            prediction_cache=PredictionCache(),
+        )
+
+        for user_id in ("user_1", "user_2", "user_3"):
+            inference_engine.get_prediction(user_id=user_id, use_case=stub_use_case)
+
+        assert len(predict_calls) == 1
+
+    def test_new_model_and_feature_delta_invalidate_affected_entries(self) -> None:
+        stub_use_case = "stub_use_case"
+
+        class StubModel(models.RulesBasedModel):
+            def __init__(self, offset: float) -> None:
+                self.offset = offset
+
+            def predict(self, features: FeatureVector) -> float:
+                return features["f"] + self.offset
+
+        inference_engine = InferenceEngine(
+            model_repository=InMemoryModelRepository(
+                registry={stub_use_case: StubModel(offset=0)}
+            ),
+            feature_repository=InMemoryFeatureRepository(
+                features={stub_use_case: {"user_1": {"f": 1}, "user_2": {"f": 2}}}
+            ),
+            prediction_cache=PredictionCache(),
+        )
+        inference_engine.get_prediction(user_id="user_1", use_case=stub_use_case)
+        inference_engine.get_prediction(user_id="user_2", use_case=stub_use_case)
+
+        inference_engine.add_model(use_case=stub_use_case, model=StubModel(offset=10))
+        assert (
+            inference_engine.get_prediction(user_id="user_1", use_case=stub_use_case)
+            == 11
+        )
+        inference_engine.get_prediction(user_id="user_2", use_case=stub_use_case)
+
+        inference_engine.apply_feature_delta(
+            use_case=stub_use_case,
+            delta=FeatureDelta(
+                use_case=stub_use_case,
+                from_version=0,
+                to_version=1,
+                upserts=FeatureTable.from_feature_set({"user_1": {"f": 5}}),
+            ),
+        )
+
+        assert (
+            inference_engine.get_prediction(user_id="user_1", use_case=stub_use_case)
+            == 15
+        )
+        assert (
+            inference_engine.get_prediction(user_id="user_2", use_case=stub_use_case)
+            == 12
+        )
+        assert inference_engine.prediction_cache is not None
+        assert inference_engine.prediction_cache.stats.hits == 1
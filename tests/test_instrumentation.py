@@ -0,0 +1,150 @@
+import io
+import threading
+from dataclasses import dataclass
+
+from src.orchestration import commands, messages
+from src.orchestration.command_handler import CommandHandler
+from src.orchestration.instrumentation import (
+    DISPATCH,
+    HANDLE,
+    RETRIES,
+    WARM_UPS,
+    HistogramSnapshot,
+    Instrumentation,
+    PeriodicReporter,
+    TextSink,
+)
+from src.orchestration.message_bus import MessageBus
+from src.orchestration.translator import MessageTranslator
+
+
+@dataclass
+class StubGetPrediction(commands.Command):
+    use_case: str
+
+
+@dataclass
+class StubWarmUp(commands.Command):
+    use_case: str
+
+
+@dataclass
+class StubMissing(messages.Error):
+    use_case: str
+
+
+class StubTranslator(MessageTranslator):
+    def get_next_command(
+        self, message: messages.Event | messages.Error
+    ) -> commands.Command:
+        assert isinstance(message, StubMissing)
+        return StubWarmUp(use_case=message.use_case)
+
+
+def make_bus(instrumentation: Instrumentation) -> MessageBus:
+    loaded: set[str] = set()
+
+    def stub_get_prediction(cmd: StubGetPrediction):
+        if cmd.use_case not in loaded:
+            return StubMissing(use_case=cmd.use_case)
+        return messages.NewPrediction(prediction=1.0)
+
+    def stub_warm_up(cmd: StubWarmUp):
+        loaded.add(cmd.use_case)
+
+    return MessageBus(
+        translator=StubTranslator(),
+        handler=CommandHandler(
+            handlers={
+                StubGetPrediction: stub_get_prediction,
+                StubWarmUp: stub_warm_up,
+            },
+            instrumentation=instrumentation,
+        ),
+        instrumentation=instrumentation,
+    )
+
+
+class TestInstrumentation:
+    def test_records_handlers_dispatches_warm_ups_and_retries(self) -> None:
+        instrumentation = Instrumentation(sample_every=1)
+        bus = make_bus(instrumentation)
+
+        for use_case in ("stub_1", "stub_1", "stub_2"):
+            bus.dispatch(StubGetPrediction(use_case=use_case))
+        snapshot = instrumentation.snapshot()
+
+        assert snapshot.histograms[(HANDLE, "StubGetPrediction", "stub_1")].count == 3
+        assert snapshot.histograms[(HANDLE, "StubWarmUp", "stub_2")].count == 1
+        assert snapshot.histograms[(DISPATCH, "StubGetPrediction", "stub_1")].count == 2
+        assert snapshot.by_command(DISPATCH)["StubWarmUp"].count == 2
+        assert snapshot.by_command()["StubGetPrediction"].count == 5
+        assert snapshot.counters == {WARM_UPS: 2, RETRIES: 2}
+
+    def test_merges_records_from_every_thread(self) -> None:
+        instrumentation = Instrumentation()
+        command = StubGetPrediction(use_case="stub")
+
+        def record() -> None:
+            for _ in range(1_000):
+                instrumentation.record(HANDLE, command, 0.001)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        histogram = instrumentation.snapshot().histograms[
+            (HANDLE, "StubGetPrediction", "stub")
+        ]
+        assert histogram.count == 4_000
+        assert histogram.max_seconds == 0.001
+
+    def test_percentiles_are_bucket_upper_bounds(self) -> None:
+        instrumentation = Instrumentation()
+        command = StubGetPrediction(use_case="stub")
+        for _ in range(99):
+            instrumentation.record(HANDLE, command, 0.000_010)
+        instrumentation.record(HANDLE, command, 0.5)
+
+        histogram: HistogramSnapshot = instrumentation.snapshot().by_command()[
+            "StubGetPrediction"
+        ]
+
+        assert 0.000_010 <= histogram.percentile(50) <= 0.000_020
+        assert histogram.percentile(99) <= 0.000_020
+        assert histogram.percentile(100) == 0.5
+
+    def test_periodic_reporter_writes_text_snapshots(self) -> None:
+        instrumentation = Instrumentation(sample_every=1)
+        make_bus(instrumentation).dispatch(StubGetPrediction(use_case="stub"))
+        stream = io.StringIO()
+        reporter = PeriodicReporter(
+            instrumentation=instrumentation,
+            sinks=[TextSink(stream=stream)],
+            interval_seconds=0.01,
+        )
+
+        reporter.start()
+        reporter.stop()
+
+        assert "dispatch StubGetPrediction use_case=stub count=1" in stream.getvalue()
+        assert "counter warm_ups=1" in stream.getvalue()
+
+    def test_sampling_times_one_call_in_n_per_command_type(self) -> None:
+        instrumentation = Instrumentation(sample_every=4)
+        bus = make_bus(instrumentation)
+
+        # 8 dispatches and 9 handles of StubGetPrediction, counting the retry,
+        # and one of each for the warm-up.
+        for _ in range(8):
+            bus.dispatch(StubGetPrediction(use_case="stub"))
+        snapshot = instrumentation.snapshot()
+
+        assert snapshot.sample_every == 4
+        assert snapshot.by_command(DISPATCH)["StubGetPrediction"].count == 2
+        assert snapshot.by_command(DISPATCH)["StubWarmUp"].count == 1
+        assert snapshot.by_command()["StubGetPrediction"].count == 3
+        assert snapshot.by_command()["StubWarmUp"].count == 1
+        assert snapshot.counters == {WARM_UPS: 1, RETRIES: 1}
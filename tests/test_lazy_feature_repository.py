@@ -0,0 +1,163 @@
+import pytest
+
+from src.common import models
+from src.common.features import FeatureDelta, FeatureTable
+from src.common.shared_types import FeatureVector
+from src.services.features.feature_store import InMemoryFeatureStore
+from src.services.inference.inference_engine import InferenceEngine
+from src.services.inference.repositories import (
+    ROW_OVERHEAD_BYTES,
+    LazyFeatureRepository,
+)
+
+
+class StubCountingSource(InMemoryFeatureStore):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.fetched: list[list[str]] = []
+
+    def get_current_features_batch(self, user_ids, use_case):
+        self.fetched.append(list(user_ids))
+        return super().get_current_features_batch(user_ids=user_ids, use_case=use_case)
+
+
+class StubFeatureModel(models.RulesBasedModel):
+    def predict(self, features: FeatureVector) -> float:
+        return features["x"]
+
+
+def make_source(n_users: int = 10) -> StubCountingSource:
+    return StubCountingSource(
+        current_features={
+            "stub_use_case": {f"user_{i}": {"x": float(i)} for i in range(n_users)}
+        }
+    )
+
+
+class TestLazyFeatureRepository:
+    def test_fetches_on_miss_and_serves_hits_from_memory(self) -> None:
+        source = make_source()
+        repository = LazyFeatureRepository(source=source)
+
+        first = repository.get_features(user_id="user_1", use_case="stub_use_case")
+        second = repository.get_features(user_id="user_1", use_case="stub_use_case")
+
+        assert first == second == {"x": 1.0}
+        assert source.fetched == [["user_1"]]
+        assert repository.stats.hits == 1
+        assert repository.stats.misses == 1
+
+    def test_batches_fetch_only_missing_users_in_one_call(self) -> None:
+        source = make_source()
+        repository = LazyFeatureRepository(source=source)
+        repository.get_features(user_id="user_1", use_case="stub_use_case")
+
+        batch = repository.get_features_batch(
+            user_ids=["user_1", "user_2", "unknown"], use_case="stub_use_case"
+        )
+
+        assert batch == [{"x": 1.0}, {"x": 2.0}, None]
+        assert source.fetched == [["user_1"], ["user_2", "unknown"]]
+        with pytest.raises(ValueError):
+            repository.get_features(user_id="unknown", use_case="stub_use_case")
+        assert len(source.fetched) == 2
+
+    def test_evicts_least_recently_used_rows_past_the_budget(self) -> None:
+        source = make_source()
+        row_bytes = ROW_OVERHEAD_BYTES + 8
+        repository = LazyFeatureRepository(source=source, max_bytes=2 * row_bytes)
+
+        for user_id in ("user_1", "user_2", "user_1", "user_3"):
+            repository.get_features(user_id=user_id, use_case="stub_use_case")
+        repository.get_features(user_id="user_1", use_case="stub_use_case")
+        repository.get_features(user_id="user_2", use_case="stub_use_case")
+
+        assert repository.nbytes == 2 * row_bytes
+        assert repository.stats.evictions == 2
+        assert source.fetched[-1] == ["user_2"]
+
+    def test_deltas_update_cached_rows_and_advance_the_version(self) -> None:
+        source = make_source()
+        repository = LazyFeatureRepository(source=source)
+        repository.get_features_batch(
+            user_ids=["user_1", "user_2"], use_case="stub_use_case"
+        )
+
+        repository.apply_delta(
+            use_case="stub_use_case",
+            delta=FeatureDelta(
+                use_case="stub_use_case",
+                from_version=0,
+                to_version=1,
+                upserts=FeatureTable.from_feature_set({"user_1": {"x": 100.0}}),
+                deletes=("user_2",),
+            ),
+        )
+
+        assert repository.get_version("stub_use_case") == 1
+        assert repository.get_features_batch(
+            user_ids=["user_1", "user_2"], use_case="stub_use_case"
+        ) == [{"x": 100.0}, None]
+
+    def test_serves_an_inference_engine_without_warm_up(self) -> None:
+        inference_engine = InferenceEngine(
+            feature_repository=LazyFeatureRepository(source=make_source())
+        )
+        inference_engine.add_model(use_case="stub_use_case", model=StubFeatureModel())
+
+        assert (
+            inference_engine.get_prediction(user_id="user_3", use_case="stub_use_case")
+            == 3.0
+        )
+
+    def test_users_cached_as_absent_are_refetched_at_a_new_version(self) -> None:
+        source = make_source()
+        repository = LazyFeatureRepository(source=source)
+        assert repository.get_features_batch(
+            user_ids=["new_user"], use_case="stub_use_case"
+        ) == [None]
+        source.update_current_features(
+            use_case="stub_use_case", feature_set={"new_user": {"x": -1.0}}
+        )
+
+        repository.apply_delta(
+            use_case="stub_use_case",
+            delta=FeatureDelta(
+                use_case="stub_use_case",
+                from_version=0,
+                to_version=1,
+                upserts=FeatureTable.from_feature_set({"user_1": {"x": 100.0}}),
+            ),
+        )
+
+        assert repository.get_features(
+            user_id="new_user", use_case="stub_use_case"
+        ) == {"x": -1.0}
+        assert source.fetched == [["new_user"], ["new_user"]]
+
+    def test_missed_deltas_drop_cached_rows_instead_of_failing(self) -> None:
+        source = make_source()
+        repository = LazyFeatureRepository(source=source)
+        repository.get_features_batch(
+            user_ids=["user_1", "user_2"], use_case="stub_use_case"
+        )
+        source.update_current_features(
+            use_case="stub_use_case", feature_set={"user_1": {"x": 100.0}}
+        )
+
+        repository.apply_delta(
+            use_case="stub_use_case",
+            delta=FeatureDelta(
+                use_case="stub_use_case",
+                from_version=3,
+                to_version=4,
+                upserts=FeatureTable.from_feature_set({"user_3": {"x": 30.0}}),
+            ),
+        )
+
+        assert repository.get_version("stub_use_case") == 4
+        assert repository.nbytes == 0
+        assert repository.get_features(user_id="user_1", use_case="stub_use_case") == {
+            "x": 100.0
+        }
+        assert source.fetched[-1] == ["user_1"]
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from src.common.features import FeatureRow, FeatureSchema
+from src.common.linear_models import ADAM, LinearRegression, LogisticRegression
+from src.services.inference.inference_engine import InferenceEngine
+from src.services.model_registry.file_model_registry import FileModelRegistry
+from src.services.training.repositories import (
+    InMemoryFeatureRepository,
+    InMemoryModelRepository,
+)
+from src.services.training.trainer import Trainer
+
+STUB_USE_CASE = "stub_use_case"
+STUB_SCHEMA = FeatureSchema(["feature1", "feature2"])
+
+
+def make_feature_repository(
+    targets_of, n_users: int = 400
+) -> InMemoryFeatureRepository:
+    rng = np.random.default_rng(0)
+    inputs = rng.normal(size=(n_users, 2))
+    return InMemoryFeatureRepository(
+        features={
+            STUB_USE_CASE: {
+                f"user_{i}": {"feature1": inputs[i, 0], "feature2": inputs[i, 1]}
+                for i in range(n_users)
+            }
+        },
+        targets={
+            STUB_USE_CASE: {
+                f"user_{i}": float(targets_of(inputs[i])) for i in range(n_users)
+            }
+        },
+    )
+
+
+def train(model, feature_repository, **trainer_options) -> None:
+    Trainer(
+        feature_repository=feature_repository,
+        model_repository=InMemoryModelRepository(registry={STUB_USE_CASE: model}),
+        **trainer_options,
+    ).train(use_case=STUB_USE_CASE)
+
+
+class TestLinearRegression:
+    def test_mini_batch_training_recovers_the_coefficients(self) -> None:
+        model = LinearRegression(schema=STUB_SCHEMA, learning_rate=0.1)
+
+        train(
+            model,
+            make_feature_repository(lambda x: 2 * x[0] - x[1] + 0.5),
+            batch_size=32,
+            epochs=20,
+        )
+
+        np.testing.assert_allclose(model.coefficients, [2.0, -1.0], atol=1e-3)
+        assert model.intercept == pytest.approx(0.5, abs=1e-3)
+
+    def test_per_user_training_with_adam(self) -> None:
+        model = LinearRegression(schema=STUB_SCHEMA, learning_rate=0.05, optimizer=ADAM)
+
+        train(model, make_feature_repository(lambda x: x[0] + 3 * x[1]), epochs=5)
+
+        np.testing.assert_allclose(model.coefficients, [1.0, 3.0], atol=0.05)
+
+    def test_lays_features_out_by_schema(self) -> None:
+        model = LinearRegression(
+            schema=STUB_SCHEMA, weights=[1.0, 10.0, 100.0], fit_intercept=True
+        )
+        reordered = FeatureRow.from_dict(
+            {"feature2": 2.0, "other": 5.0, "feature1": 1.0},
+            schema=FeatureSchema(["feature2", "other", "feature1"]),
+        )
+
+        assert model.predict({"feature2": 2.0, "feature1": 1.0}) == 121.0
+        assert model.predict(reordered) == 121.0
+        assert model.predict({"feature1": 1.0}) == 101.0
+        np.testing.assert_array_equal(
+            model.predict_batch([reordered, {"feature2": 1.0}]), [121.0, 110.0]
+        )
+
+    def test_rejects_weights_that_do_not_match_the_schema(self) -> None:
+        with pytest.raises(ValueError):
+            LinearRegression(schema=STUB_SCHEMA, weights=[1.0, 2.0])
+
+    def test_trains_on_weights_loaded_read_only(self, tmp_path) -> None:
+        registry = FileModelRegistry(root=tmp_path)
+        registry.add_model(
+            use_case=STUB_USE_CASE,
+            model=LinearRegression(schema=STUB_SCHEMA, weights=[1.0, 1.0, 0.0]),
+        )
+        model = registry.get_model(use_case=STUB_USE_CASE)
+        assert isinstance(model, LinearRegression)
+
+        model.update_weights(features={"feature1": 1.0, "feature2": 1.0}, target=0.0)
+
+        assert model.predict({"feature1": 1.0, "feature2": 1.0}) < 2.0
+        assert model.supports_gradients
+
+
+class TestLogisticRegression:
+    def test_learns_a_separable_boundary(self) -> None:
+        model = LogisticRegression(schema=STUB_SCHEMA, learning_rate=0.5)
+        feature_repository = make_feature_repository(lambda x: x[0] + x[1] > 0)
+
+        train(model, feature_repository, batch_size=64, epochs=30)
+
+        user_ids = list(feature_repository.get_user_ids(STUB_USE_CASE))
+        probabilities = model.predict_batch(
+            feature_repository.get_features_batch(user_ids, STUB_USE_CASE)
+        )
+        targets = feature_repository.get_targets(user_ids, STUB_USE_CASE)
+        assert np.mean((probabilities > 0.5) == targets) > 0.97
+        assert np.all((probabilities > 0.0) & (probabilities < 1.0))
+
+    def test_serves_probabilities_from_an_inference_engine(self) -> None:
+        inference_engine = InferenceEngine()
+        inference_engine.add_model(
+            use_case=STUB_USE_CASE,
+            model=LogisticRegression(schema=STUB_SCHEMA, weights=[1e4, 0.0, 0.0]),
+        )
+        inference_engine.add_feature_set(
+            use_case=STUB_USE_CASE,
+            feature_set={"high": {"feature1": 1.0}, "low": {"feature1": -1.0}},
+        )
+
+        assert inference_engine.get_predictions(
+            user_ids=["high", "low"], use_case=STUB_USE_CASE
+        ).as_dict() == {"high": 1.0, "low": 0.0}
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from src.common.feature_files import COLUMN_MAJOR, FeatureFile, write_feature_file
+from src.common.features import FeatureTable
+from src.services.features.memory_mapped_store import MemoryMappedFeatureStore
+
+
+class TestMemoryMappedFeatureStore:
+    def test_round_trips_historical_features_and_targets(self, tmp_path) -> None:
+        """Test that written features and targets are served back from disk."""
+        stub_use_case = "stub_use_case"
+        feature_store = MemoryMappedFeatureStore(root=tmp_path)
+        feature_store.write_historical_features(
+            use_case=stub_use_case,
+            feature_set={
+                "user_b": {"watch_count": 2, "rating_avg": 3.0},
+                "user_a": {"watch_count": 10},
+            },
+            targets={"user_b": 1, "user_a": 0},
+        )
+
+        assert feature_store.get_historical_features(
+            user_id="user_a", use_case=stub_use_case
+        ) == {"watch_count": 10}
+        assert feature_store.get_target(user_id="user_b", use_case=stub_use_case) == 1
+        assert list(feature_store.get_user_ids(use_case=stub_use_case)) == [
+            "user_b",
+            "user_a",
+        ]
+
+    def test_reads_contiguous_row_ranges(self, tmp_path) -> None:
+        """Test that row ranges come back in storage order with their targets."""
+        stub_use_case = "stub_use_case"
+        feature_store = MemoryMappedFeatureStore(root=tmp_path)
+        feature_store.write_historical_features(
+            use_case=stub_use_case,
+            feature_set={f"user_{i}": {"feature1": i} for i in range(10)},
+            targets={f"user_{i}": i * 10 for i in range(10)},
+        )
+
+        user_ids, features, targets = feature_store.read_rows(
+            use_case=stub_use_case, start=3, stop=6
+        )
+
+        assert user_ids == ["user_3", "user_4", "user_5"]
+        assert features.array[:, 0].tolist() == [3.0, 4.0, 5.0]
+        assert targets.tolist() == [30.0, 40.0, 50.0]
+        assert isinstance(feature_store._file(stub_use_case).features, np.memmap)
+
+    def test_raises_key_error_for_missing_user(self, tmp_path) -> None:
+        """Test that unknown users and use cases raise KeyError."""
+        feature_store = MemoryMappedFeatureStore(root=tmp_path)
+        feature_store.write_historical_features(
+            use_case="stub_use_case", feature_set={"user_1": {"feature1": 1}}
+        )
+
+        with pytest.raises(expected_exception=KeyError):
+            feature_store.get_historical_features(
+                user_id="user_10", use_case="stub_use_case"
+            )
+        with pytest.raises(expected_exception=KeyError):
+            feature_store.get_historical_features(
+                user_id="user_1", use_case="missing_use_case"
+            )
+
+    def test_rewrites_swap_in_without_disturbing_open_files(self, tmp_path) -> None:
+        """Test that a rewrite replaces the files while open views stay readable."""
+        stub_use_case = "stub_use_case"
+        feature_store = MemoryMappedFeatureStore(root=tmp_path)
+        feature_store.write_historical_features(
+            use_case=stub_use_case, feature_set={"user_1": {"feature1": 1}}
+        )
+        opened = FeatureFile(tmp_path / stub_use_case)
+
+        feature_store.write_historical_features(
+            use_case=stub_use_case, feature_set={"user_1": {"feature1": 2}}
+        )
+
+        assert opened.get_row("user_1") == {"feature1": 1.0}
+        assert feature_store.get_historical_features(
+            user_id="user_1", use_case=stub_use_case
+        ) == {"feature1": 2.0}
+        assert (tmp_path / stub_use_case).is_symlink()
+        assert len(list(tmp_path.iterdir())) == 2
+
+    def test_writes_row_major_unless_asked_for_columns(self, tmp_path) -> None:
+        """Test that features are laid out per user unless COLUMN_MAJOR is given."""
+        table = FeatureTable.from_feature_set(
+            {f"user_{i}": {"feature1": i, "feature2": -i} for i in range(4)}
+        )
+        write_feature_file(tmp_path / "rows", table)
+        write_feature_file(tmp_path / "columns", table, layout=COLUMN_MAJOR)
+
+        rows = FeatureFile(tmp_path / "rows").features
+        columns = FeatureFile(tmp_path / "columns").features
+
+        assert rows.flags.c_contiguous
+        assert columns.flags.f_contiguous
+        np.testing.assert_array_equal(rows, columns)
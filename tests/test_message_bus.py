@@ -1,3 +1,5 @@
+import threading
+import time
 from dataclasses import dataclass
 from src.orchestration import commands
 from src.orchestration import messages
@@ -52,7 +54,7 @@ class TestMessageBus:
 
         bus.dispatch(command=FirstCommand())
 
-        assert bus.log == [
+        assert list(bus.log) == [
             FirstCommand(),
             FirstError(),
             ErrorResolvingCommand(),
@@ -60,3 +62,69 @@ class TestMessageBus:
             FirstEvent(),
             FirstCommandComplete(),
         ]
+
+    def test_concurrent_dispatches_share_one_warm_up(self):
+        @dataclass
+        class StubGetPrediction(commands.Command):
+            use_case: str
+
+        @dataclass
+        class StubWarmUp(commands.Command):
+            use_case: str
+
+        @dataclass
+        class StubMissing(messages.Error):
+            use_case: str
+
+        loaded: set[str] = set()
+        warm_ups: list[str] = []
+        release = threading.Event()
+
+        def stub_get_prediction(cmd: StubGetPrediction):
+            if cmd.use_case not in loaded:
+                return StubMissing(use_case=cmd.use_case)
+            return messages.NewPrediction(prediction=1.0)
+
+        def stub_warm_up(cmd: StubWarmUp):
+            warm_ups.append(cmd.use_case)
+            release.wait()
+            loaded.add(cmd.use_case)
+
+        class StubTranslator(MessageTranslator):
+            def get_next_command(
+                self, message: messages.Event | messages.Error
+            ) -> commands.Command:
+                assert isinstance(message, StubMissing)
+                return StubWarmUp(use_case=message.use_case)
+
+        bus = MessageBus(
+            translator=StubTranslator(),
+            handler=CommandHandler(
+                handlers={
+                    StubGetPrediction: stub_get_prediction,
+                    StubWarmUp: stub_warm_up,
+                }
+            ),
+        )
+
+        predictions: list[float] = []
+        threads = [
+            threading.Thread(
+                target=lambda: predictions.append(
+                    bus.dispatch(StubGetPrediction(use_case="stub"))
+                )
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while bus.single_flight.stats.coalesced < 7 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert warm_ups == ["stub"]
+        assert predictions == [1.0] * 8
+        assert bus.single_flight.stats.coalesced == 7
@@ -0,0 +1,117 @@
+import gc
+import weakref
+from dataclasses import dataclass
+
+import pytest
+
+from src.orchestration import commands, messages
+from src.orchestration.message_log import (
+    JournalLog,
+    MessageRecord,
+    NullLog,
+    RingBufferLog,
+    SampledLog,
+)
+
+
+@dataclass
+class StubCommand(commands.Command):
+    use_case: str
+    user_id: int
+
+
+class StubModel: ...
+
+
+class TestRingBufferLog:
+    def test_keeps_only_the_last_capacity_messages(self):
+        log = RingBufferLog(capacity=3)
+
+        for user_id in range(5):
+            log.append(StubCommand(use_case="a", user_id=user_id))
+
+        assert len(log) == 3
+        assert list(log) == [
+            StubCommand(use_case="a", user_id=2),
+            StubCommand(use_case="a", user_id=3),
+            StubCommand(use_case="a", user_id=4),
+        ]
+
+    def test_does_not_keep_payloads_alive(self):
+        log = RingBufferLog()
+        stub_model = StubModel()
+        stub_model_reference = weakref.ref(stub_model)
+
+        log.append(messages.NewModelForInference(use_case="a", model=stub_model))
+        del stub_model
+        gc.collect()
+
+        assert stub_model_reference() is None
+        [record] = list(log)
+        assert isinstance(record, MessageRecord)
+        assert record.message_type == "NewModelForInference"
+        assert dict(record.fields) == {"use_case": "a", "model": "<StubModel>"}
+
+    def test_keeps_payloads_when_asked(self):
+        log = RingBufferLog(keep_payloads=True)
+        stub_event = messages.NewModelForInference(use_case="a", model=StubModel())
+
+        log.append(stub_event)
+
+        assert list(log) == [stub_event]
+
+    def test_rejects_non_positive_capacity(self):
+        with pytest.raises(ValueError):
+            RingBufferLog(capacity=0)
+
+
+class TestSampledLog:
+    def test_keeps_one_message_in_every(self):
+        log = SampledLog(RingBufferLog(), every=4)
+
+        for user_id in range(10):
+            log.append(StubCommand(use_case="a", user_id=user_id))
+
+        assert [message.user_id for message in log] == [0, 4, 8]
+
+
+class TestNullLog:
+    def test_keeps_nothing(self):
+        log = NullLog()
+
+        log.append(StubCommand(use_case="a", user_id=1))
+
+        assert len(log) == 0
+        assert list(log) == []
+
+
+class TestJournalLog:
+    def test_reads_back_compact_records(self, tmp_path):
+        log = JournalLog(tmp_path / "bus.log")
+
+        log.append(StubCommand(use_case="a", user_id=1))
+        log.append(messages.NewModelForInference(use_case="a", model=StubModel()))
+
+        records = list(log)
+        assert len(log) == 2
+        assert [record.message_type for record in records] == [
+            "StubCommand",
+            "NewModelForInference",
+        ]
+        assert dict(records[0].fields) == {"use_case": "a", "user_id": 1}
+        assert dict(records[1].fields) == {"use_case": "a", "model": "<StubModel>"}
+        log.close()
+
+    def test_appends_to_an_existing_journal(self, tmp_path):
+        log = JournalLog(tmp_path / "bus.log")
+        log.append(StubCommand(use_case="a", user_id=1))
+        log.close()
+
+        reopened = JournalLog(tmp_path / "bus.log")
+        reopened.append(StubCommand(use_case="a", user_id=2))
+
+        assert len(reopened) == 2
+        assert [dict(record.fields)["user_id"] for record in reopened] == [1, 2]
+        reopened.clear()
+        assert list(reopened) == []
+        reopened.close()
@@ -0,0 +1,54 @@
+from src.services.inference.prediction_cache import PredictionCache
+
+
+class StubClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestPredictionCache:
+    def test_evicts_least_recently_used_entry(self) -> None:
+        cache = PredictionCache(capacity=2)
+        cache.put(use_case="stub", user_id="user_1", prediction=1.0, epoch=0)
+        cache.put(use_case="stub", user_id="user_2", prediction=2.0, epoch=0)
+        cache.get(use_case="stub", user_id="user_1")
+
+        cache.put(use_case="stub", user_id="user_3", prediction=3.0, epoch=0)
+
+        assert cache.get(use_case="stub", user_id="user_2") is None
+        assert cache.get(use_case="stub", user_id="user_1") == 1.0
+        assert cache.stats.evictions == 1
+
+    def test_expires_entries_after_ttl(self) -> None:
+        clock = StubClock()
+        cache = PredictionCache(ttl_seconds=10, clock=clock)
+        cache.put(use_case="stub", user_id="user_1", prediction=1.0, epoch=0)
+
+        clock.now = 5
+        assert cache.get(use_case="stub", user_id="user_1") == 1.0
+        clock.now = 11
+        assert cache.get(use_case="stub", user_id="user_1") is None
+        assert cache.stats.expirations == 1
+
+    def test_invalidating_a_use_case_leaves_other_use_cases_cached(self) -> None:
+        cache = PredictionCache()
+        cache.put(use_case="stub_1", user_id="user_1", prediction=1.0, epoch=0)
+        cache.put(use_case="stub_2", user_id="user_1", prediction=2.0, epoch=0)
+
+        cache.invalidate_use_case("stub_1")
+
+        assert cache.get(use_case="stub_1", user_id="user_1") is None
+        assert cache.get(use_case="stub_2", user_id="user_1") == 2.0
+
+    def test_drops_predictions_computed_before_an_invalidation(self) -> None:
+        cache = PredictionCache()
+        epoch = cache.epoch("stub")
+
+        cache.invalidate_users(use_case="stub", user_ids=["user_1"])
+        cache.put(use_case="stub", user_id="user_1", prediction=1.0, epoch=epoch)
+
+        assert cache.get(use_case="stub", user_id="user_1") is None
+        assert cache.stats.hit_rate == 0.0
@@ -0,0 +1,190 @@
+import time
+
+import numpy as np
+
+from src.common import models
+from src.common.features import FeatureDelta, FeatureTable
+from src.common.shared_types import FeatureVector
+from src.services.inference.inference_engine import (
+    InferenceEngine,
+    PredictionRescorer,
+)
+from src.services.inference.prediction_table import PredictionTable
+
+STUB_USE_CASE = "stub_use_case"
+
+
+class StubClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StubCountingModel(models.RulesBasedModel):
+    def __init__(self, scale: float = 1.0) -> None:
+        self.scale = scale
+        self.scored = 0
+
+    def predict(self, features: FeatureVector) -> float:
+        self.scored += 1
+        return self.scale * features["x"]
+
+    def predict_batch(self, features) -> np.ndarray:
+        self.scored += len(features)
+        return self.scale * np.array([row["x"] for row in features])
+
+
+def make_engine(
+    model: StubCountingModel, clock: StubClock | None = None
+) -> InferenceEngine:
+    inference_engine = InferenceEngine(
+        prediction_table=PredictionTable(clock=clock or StubClock())
+    )
+    inference_engine.add_model(use_case=STUB_USE_CASE, model=model)
+    inference_engine.add_feature_set(
+        use_case=STUB_USE_CASE,
+        feature_set={f"user_{i}": {"x": float(i)} for i in range(4)},
+    )
+    inference_engine.materialize(
+        use_case=STUB_USE_CASE, user_ids=[f"user_{i}" for i in range(4)]
+    )
+    return inference_engine
+
+
+class TestPredictionTable:
+    def test_serves_materialized_predictions_without_scoring(self) -> None:
+        model = StubCountingModel()
+        inference_engine = make_engine(model)
+        scored_at_materialize = model.scored
+
+        assert (
+            inference_engine.get_prediction(user_id="user_2", use_case=STUB_USE_CASE)
+            == 2.0
+        )
+        assert inference_engine.get_predictions(
+            user_ids=["user_3", "user_1"], use_case=STUB_USE_CASE
+        ).as_dict() == {"user_3": 3.0, "user_1": 1.0}
+        assert model.scored == scored_at_materialize
+
+    def test_model_change_is_served_live_until_rescored(self) -> None:
+        inference_engine = make_engine(StubCountingModel())
+        assert inference_engine.prediction_table is not None
+
+        inference_engine.add_model(
+            use_case=STUB_USE_CASE, model=StubCountingModel(scale=10.0)
+        )
+
+        assert (
+            inference_engine.get_prediction(user_id="user_2", use_case=STUB_USE_CASE)
+            == 20.0
+        )
+        assert inference_engine.prediction_table.report(STUB_USE_CASE).n_stale == 4
+        assert inference_engine.rescore(use_case=STUB_USE_CASE, max_rows=3) == 3
+        assert inference_engine.rescore(use_case=STUB_USE_CASE) == 1
+        assert (
+            inference_engine.prediction_table.get(
+                use_case=STUB_USE_CASE, user_id="user_3"
+            )
+            == 30.0
+        )
+
+    def test_delta_rescores_only_touched_and_new_users(self) -> None:
+        model = StubCountingModel()
+        inference_engine = make_engine(model)
+        assert inference_engine.prediction_table is not None
+        inference_engine.apply_feature_delta(
+            use_case=STUB_USE_CASE,
+            delta=FeatureDelta(
+                use_case=STUB_USE_CASE,
+                from_version=0,
+                to_version=1,
+                upserts=FeatureTable.from_feature_set(
+                    {"user_1": {"x": 100.0}, "user_9": {"x": 9.0}}
+                ),
+                deletes=("user_2", "never_materialized"),
+            ),
+        )
+        scored_before = model.scored
+
+        assert inference_engine.prediction_table.report(STUB_USE_CASE).n_users == 5
+        assert inference_engine.rescore(use_case=STUB_USE_CASE) == 2
+        assert model.scored - scored_before == 2
+        batch = inference_engine.get_predictions(
+            user_ids=["user_1", "user_2", "user_9", "user_0"], use_case=STUB_USE_CASE
+        )
+        assert batch.as_dict() == {"user_1": 100.0, "user_9": 9.0, "user_0": 0.0}
+        assert batch.missing_user_ids == ["user_2"]
+
+    def test_rows_invalidated_while_rescoring_stay_stale(self) -> None:
+        table = PredictionTable()
+        table.materialize(
+            use_case=STUB_USE_CASE, user_ids=["a", "b"], predictions=np.zeros(2)
+        )
+        table.invalidate_use_case(STUB_USE_CASE)
+        stale_rows = table.take_stale(STUB_USE_CASE)
+
+        table.invalidate_users(use_case=STUB_USE_CASE, user_ids=["a"])
+
+        assert table.update(stale_rows=stale_rows, predictions=np.ones(2)) == 1
+        assert table.get(use_case=STUB_USE_CASE, user_id="a") is None
+        assert table.get(use_case=STUB_USE_CASE, user_id="b") == 1.0
+
+    def test_deleting_users_drops_rescoring_in_flight(self) -> None:
+        table = PredictionTable()
+        table.materialize(
+            use_case=STUB_USE_CASE, user_ids=["a", "b"], predictions=np.zeros(2)
+        )
+        table.invalidate_use_case(STUB_USE_CASE)
+        stale_rows = table.take_stale(STUB_USE_CASE)
+
+        table.delete_users(use_case=STUB_USE_CASE, user_ids=["a", "unknown"])
+
+        assert table.update(stale_rows=stale_rows, predictions=np.ones(2)) == 1
+        assert table.get(use_case=STUB_USE_CASE, user_id="a") is None
+        assert table.get(use_case=STUB_USE_CASE, user_id="b") == 1.0
+        assert table.report(STUB_USE_CASE).n_users == 2
+        assert table.report(STUB_USE_CASE).n_stale == 0
+
+    def test_reports_staleness_and_rescoring_progress(self) -> None:
+        clock = StubClock()
+        inference_engine = make_engine(StubCountingModel(), clock=clock)
+        assert inference_engine.prediction_table is not None
+
+        inference_engine.add_model(use_case=STUB_USE_CASE, model=StubCountingModel())
+        clock.now = 5.0
+        inference_engine.rescore(use_case=STUB_USE_CASE, max_rows=1)
+        report = inference_engine.prediction_table.report(STUB_USE_CASE)
+
+        assert report.n_users == 4
+        assert report.n_stale == 3
+        assert report.stale_fraction == 0.75
+        assert report.rescored_rows == 1
+        assert report.max_staleness_seconds == 5.0
+
+    def test_rescorer_catches_up_in_the_background(self) -> None:
+        inference_engine = make_engine(StubCountingModel())
+        assert inference_engine.prediction_table is not None
+        rescorer = PredictionRescorer(
+            inference_engine=inference_engine, interval_seconds=0.01
+        )
+        rescorer.start()
+        try:
+            inference_engine.add_model(
+                use_case=STUB_USE_CASE, model=StubCountingModel(scale=2.0)
+            )
+            for _ in range(500):
+                if not inference_engine.prediction_table.report(STUB_USE_CASE).n_stale:
+                    break
+                time.sleep(0.01)
+        finally:
+            rescorer.stop()
+
+        assert inference_engine.prediction_table.report(STUB_USE_CASE).n_stale == 0
+        assert (
+            inference_engine.prediction_table.get(
+                use_case=STUB_USE_CASE, user_id="user_3"
+            )
+            == 6.0
+        )
@@ -0,0 +1,105 @@
+import warnings
+from dataclasses import dataclass
+
+import pytest
+
+from src.orchestration import commands, messages
+from src.orchestration.command_handler import CommandHandler
+from src.orchestration.routing import RoutingTable
+from src.orchestration.translator import MessageTranslator
+
+
+class StubBase: ...
+
+
+class StubChild(StubBase): ...
+
+
+class StubGrandchild(StubChild): ...
+
+
+class TestRoutingTable:
+    def test_routes_exact_types(self):
+        table = RoutingTable({StubBase: "base", StubChild: "child"})
+
+        assert table.lookup(StubBase) == "base"
+        assert table.lookup(StubChild) == "child"
+
+    def test_subclasses_take_the_nearest_base_route(self):
+        table = RoutingTable({StubBase: "base", StubChild: "child"})
+
+        assert table.lookup(StubGrandchild) == "child"
+
+    def test_unrouted_types_have_no_route(self):
+        table = RoutingTable({StubChild: "child"})
+
+        assert table.lookup(StubBase) is None
+        assert table.lookup(StubBase) is None
+
+
+class TestRouting:
+    def test_handler_routes_command_subclasses(self):
+        @dataclass
+        class StubGetPrediction(commands.GetPrediction): ...
+
+        handler = CommandHandler(
+            handlers={
+                commands.GetPrediction: lambda c: messages.NewPrediction(prediction=1.0)
+            }
+        )
+
+        response = handler.handle(StubGetPrediction(use_case="a", user_id="b"))
+
+        assert response == messages.NewPrediction(prediction=1.0)
+
+    def test_handler_raises_for_unrouted_commands(self):
+        handler = CommandHandler(handlers={})
+
+        with pytest.raises(NotImplementedError):
+            handler.handle(commands.TrainModel(use_case="a"))
+
+    def test_handler_rejects_async_handlers_without_calling_them(self):
+        calls: list[commands.Command] = []
+
+        async def stub_async_handler(cmd: commands.TrainModel):
+            calls.append(cmd)
+
+        handler = CommandHandler(handlers={commands.TrainModel: stub_async_handler})
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            with pytest.raises(TypeError, match="use ahandle"):
+                handler.handle(commands.TrainModel(use_case="a"))
+        assert calls == []
+
+    def test_handler_rejects_handlers_returning_awaitables(self):
+        calls: list[commands.Command] = []
+
+        async def stub_async_fetch(cmd: commands.TrainModel):
+            calls.append(cmd)
+
+        handler = CommandHandler(
+            handlers={commands.TrainModel: lambda c: stub_async_fetch(c)}
+        )
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            with pytest.raises(TypeError, match="use ahandle"):
+                handler.handle(commands.TrainModel(use_case="a"))
+        assert calls == []
+
+    def test_translator_routes_message_subclasses(self):
+        @dataclass
+        class StubModelNotFound(messages.ModelNotFound): ...
+
+        next_command = MessageTranslator().get_next_command(
+            StubModelNotFound(use_case="a")
+        )
+
+        assert next_command == commands.PublishModelForInference(use_case="a")
+
+    def test_messages_and_commands_are_slotted(self):
+        assert not hasattr(messages.NewPrediction(prediction=1.0), "__dict__")
+        assert not hasattr(
+            commands.GetPrediction(use_case="a", user_id="b"), "__dict__"
+        )
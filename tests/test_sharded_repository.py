@@ -0,0 +1,157 @@
+from collections.abc import Iterator
+from contextlib import closing
+from dataclasses import dataclass, field
+
+import pytest
+
+from src.common import exceptions, models, shared_types
+from src.common.features import FeatureDelta, FeatureTable
+from src.services.features.sharded_repository import (
+    ShardedFeatureRepository,
+    ShardedTrainingRepository,
+    shard_of,
+)
+from src.services.inference.inference_engine import InferenceEngine
+from src.services.training.repositories import InMemoryModelRepository
+from src.services.training.trainer import Trainer
+
+STUB_USE_CASE = "stub_use_case"
+N_USERS = 20
+
+
+@dataclass
+class StubModel(models.MachineLearningModel):
+    update_calls: list[tuple[dict[str, float], shared_types.Target]] = field(
+        default_factory=list
+    )
+
+    def update_weights(
+        self, features: shared_types.FeatureVector, target: shared_types.Target
+    ) -> None:
+        self.update_calls.append((dict(features), target))
+
+    def predict(self, features: shared_types.FeatureVector) -> float:
+        return features["x"]
+
+
+@pytest.fixture
+def repository() -> Iterator[ShardedFeatureRepository]:
+    with closing(ShardedFeatureRepository(n_shards=3)) as repository:
+        repository.add_features(
+            use_case=STUB_USE_CASE,
+            feature_set={f"user_{i}": {"x": float(i)} for i in range(N_USERS)},
+        )
+        repository.add_targets(
+            use_case=STUB_USE_CASE,
+            targets={f"user_{i}": float(i % 2) for i in range(N_USERS)},
+        )
+        yield repository
+
+
+class TestShardedFeatureRepository:
+    def test_shard_routing_is_stable_and_spreads_users(self) -> None:
+        shards = {shard_of(f"user_{i}", 3) for i in range(N_USERS)}
+
+        assert shards == {0, 1, 2}
+        assert shard_of("user_1", 3) == shard_of("user_1", 3)
+
+    def test_batch_lookups_come_back_in_request_order(self, repository) -> None:
+        user_ids = ["user_7", "unknown", "user_0", "user_13", "user_2"]
+
+        batch = repository.get_features_batch(user_ids=user_ids, use_case=STUB_USE_CASE)
+
+        assert batch == [{"x": 7.0}, None, {"x": 0.0}, {"x": 13.0}, {"x": 2.0}]
+        assert repository.get_features(user_id="user_4", use_case=STUB_USE_CASE) == {
+            "x": 4.0
+        }
+        with pytest.raises(ValueError):
+            repository.get_features(user_id="unknown", use_case=STUB_USE_CASE)
+        with pytest.raises(exceptions.FeatureSetNotFound):
+            repository.get_features_batch(user_ids=["user_1"], use_case="unknown")
+
+    def test_deltas_are_applied_on_the_owning_shards(self, repository) -> None:
+        repository.apply_delta(
+            use_case=STUB_USE_CASE,
+            delta=FeatureDelta(
+                use_case=STUB_USE_CASE,
+                from_version=0,
+                to_version=1,
+                upserts=FeatureTable.from_feature_set(
+                    {"user_1": {"x": 100.0, "y": 1.0}, "new_user": {"x": -1.0}}
+                ),
+                deletes=("user_2",),
+            ),
+        )
+
+        assert repository.get_version(STUB_USE_CASE) == 1
+        batch = repository.get_features_batch(
+            user_ids=["user_1", "user_2", "new_user", "user_3"],
+            use_case=STUB_USE_CASE,
+        )
+        assert [row if row is None else row.to_dict() for row in batch] == [
+            {"x": 100.0, "y": 1.0},
+            None,
+            {"x": -1.0},
+            {"x": 3.0},
+        ]
+        assert len(repository.get_user_ids(STUB_USE_CASE)) == N_USERS
+        with pytest.raises(exceptions.FeatureSetOutOfDate):
+            repository.apply_delta(
+                use_case=STUB_USE_CASE,
+                delta=FeatureDelta(
+                    use_case=STUB_USE_CASE,
+                    from_version=5,
+                    to_version=6,
+                    upserts=FeatureTable(),
+                ),
+            )
+
+    def test_serves_an_inference_engine(self, repository) -> None:
+        inference_engine = InferenceEngine(feature_repository=repository)
+        inference_engine.add_model(use_case=STUB_USE_CASE, model=StubModel())
+
+        assert (
+            inference_engine.get_prediction(user_id="user_5", use_case=STUB_USE_CASE)
+            == 5.0
+        )
+        batch = inference_engine.get_predictions(
+            user_ids=["user_5", "unknown"], use_case=STUB_USE_CASE
+        )
+        assert batch.as_dict() == {"user_5": 5.0}
+        assert batch.missing_user_ids == ["unknown"]
+
+    def test_trains_on_every_shard(self, repository) -> None:
+        stub_model = StubModel()
+        trainer = Trainer(
+            model_repository=InMemoryModelRepository(
+                registry={STUB_USE_CASE: stub_model}
+            ),
+            feature_repository=ShardedTrainingRepository(shards=repository),
+        )
+
+        trainer.train(use_case=STUB_USE_CASE)
+
+        assert sorted(stub_model.update_calls, key=lambda call: call[0]["x"]) == [
+            ({"x": float(i)}, float(i % 2)) for i in range(N_USERS)
+        ]
+
+    def test_training_batches_raise_for_unknown_users(self, repository) -> None:
+        training_repository = ShardedTrainingRepository(shards=repository)
+
+        assert training_repository.get_features_batch(
+            user_ids=["user_13", "user_2"], use_case=STUB_USE_CASE
+        ) == [{"x": 13.0}, {"x": 2.0}]
+        with pytest.raises(KeyError):
+            training_repository.get_features_batch(
+                user_ids=["user_13", "unknown"], use_case=STUB_USE_CASE
+            )
+
+    def test_shard_errors_are_raised_to_the_caller(self, repository) -> None:
+        repository.add_targets(use_case=STUB_USE_CASE, targets={"user_1": object()})
+
+        with pytest.raises(TypeError):
+            repository.get_target(user_id="user_1", use_case=STUB_USE_CASE)
+
+        assert repository.get_features(user_id="user_4", use_case=STUB_USE_CASE) == {
+            "x": 4.0
+        }
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.orchestration.single_flight import SingleFlight
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline: float = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError
+        time.sleep(0.001)
+
+
+class TestSingleFlight:
+    def test_concurrent_threads_share_one_call(self) -> None:
+        single_flight = SingleFlight()
+        release = threading.Event()
+        calls: list[None] = []
+
+        def stub_work() -> str:
+            calls.append(None)
+            release.wait()
+            return "done"
+
+        results: list[str] = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(single_flight.do("key", stub_work))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        wait_for(lambda: single_flight.stats.coalesced == 4)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [None]
+        assert results == ["done"] * 5
+        assert single_flight.stats.leaders == 1
+
+    def test_followers_receive_the_leaders_exception(self) -> None:
+        single_flight = SingleFlight()
+        release = threading.Event()
+
+        def stub_work() -> None:
+            release.wait()
+            raise KeyError("stub")
+
+        errors: list[BaseException] = []
+
+        def call() -> None:
+            try:
+                single_flight.do("key", stub_work)
+            except KeyError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        wait_for(lambda: single_flight.stats.coalesced == 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3
+
+    def test_key_is_released_once_the_call_finishes(self) -> None:
+        single_flight = SingleFlight()
+
+        single_flight.do("key", lambda: 1)
+        single_flight.do("key", lambda: 2)
+
+        assert single_flight.stats.leaders == 2
+        assert single_flight.stats.coalesced == 0
+
+    def test_waiting_on_own_call_raises(self) -> None:
+        single_flight = SingleFlight()
+
+        with pytest.raises(RuntimeError):
+            single_flight.do("key", lambda: single_flight.do("key", lambda: None))
+
+    def test_concurrent_tasks_share_one_call(self) -> None:
+        single_flight = SingleFlight()
+        calls: list[None] = []
+
+        async def stub_work() -> str:
+            calls.append(None)
+            await asyncio.sleep(0.01)
+            return "done"
+
+        async def run() -> list[str]:
+            return await asyncio.gather(
+                *(single_flight.ado("key", stub_work) for _ in range(5))
+            )
+
+        assert asyncio.run(run()) == ["done"] * 5
+        assert calls == [None]
+        assert single_flight.stats.coalesced == 4
+
+    def test_task_waiting_on_own_call_raises(self) -> None:
+        single_flight = SingleFlight()
+
+        async def stub_warm_up() -> None:
+            # Awaited through a task the leader starts, as a gather would.
+            await asyncio.create_task(single_flight.ado("key", stub_warm_up))
+
+        async def run() -> None:
+            await asyncio.wait_for(single_flight.ado("key", stub_warm_up), timeout=1)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(run())
+        assert single_flight.do("key", lambda: "released") == "released"
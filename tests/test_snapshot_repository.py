@@ -0,0 +1,145 @@
+import threading
+
+import pytest
+
+from src.common import exceptions, models
+from src.common.features import FeatureDelta, FeatureTable
+from src.common.shared_types import FeatureVector
+from src.services.inference.inference_engine import InferenceEngine
+from src.services.inference.repositories import SnapshotRepository
+
+
+class StubVersionedModel(models.RulesBasedModel):
+    """Predicts 0 only when given features from its own version."""
+
+    def __init__(self, version: int) -> None:
+        self.version = version
+
+    def predict(self, features: FeatureVector) -> float:
+        return features["version"] - self.version
+
+
+def make_feature_set(version: int, n_users: int = 50) -> FeatureTable:
+    return FeatureTable.from_feature_set(
+        {f"user_{i}": {"version": float(version)} for i in range(n_users)}
+    )
+
+
+class TestSnapshotRepository:
+    def test_model_and_feature_writes_keep_the_other_half(self) -> None:
+        stub_use_case = "stub_use_case"
+        repository = SnapshotRepository()
+
+        repository.add_features(
+            use_case=stub_use_case, feature_set={"user_1": {"version": 1.0}}
+        )
+        repository.add_model(use_case=stub_use_case, model=StubVersionedModel(1))
+        snapshot = repository.get_snapshot(stub_use_case)
+
+        assert snapshot.model is not None
+        assert snapshot.feature_set is not None
+        assert repository.get_features(user_id="user_1", use_case=stub_use_case) == {
+            "version": 1.0
+        }
+
+    def test_missing_halves_raise_repository_errors(self) -> None:
+        repository = SnapshotRepository()
+
+        with pytest.raises(exceptions.ModelNotFound):
+            repository.get_model(use_case="stub_use_case")
+        with pytest.raises(exceptions.FeatureSetNotFound):
+            repository.get_features(user_id="user_1", use_case="stub_use_case")
+
+    def test_delta_gap_raises_out_of_date(self) -> None:
+        repository = SnapshotRepository()
+        repository.add_features(
+            use_case="stub_use_case", feature_set=make_feature_set(0)
+        )
+
+        with pytest.raises(exceptions.FeatureSetOutOfDate):
+            repository.apply_delta(
+                use_case="stub_use_case",
+                delta=FeatureDelta(
+                    use_case="stub_use_case",
+                    from_version=2,
+                    to_version=3,
+                    upserts=make_feature_set(3),
+                ),
+            )
+
+
+class TestHotSwapUnderLoad:
+    def test_predictions_never_mix_model_and_feature_versions(self) -> None:
+        stub_use_case = "stub_use_case"
+        repository = SnapshotRepository()
+        repository.publish(
+            use_case=stub_use_case,
+            model=StubVersionedModel(0),
+            feature_set=make_feature_set(0),
+        )
+        inference_engine = InferenceEngine(
+            model_repository=repository, feature_repository=repository
+        )
+        stop = threading.Event()
+        mismatches: list[float] = []
+        predictions_made: list[int] = []
+
+        def serve() -> None:
+            count = 0
+            while not stop.is_set():
+                prediction = inference_engine.get_prediction(
+                    user_id=f"user_{count % 50}", use_case=stub_use_case
+                )
+                batch = inference_engine.get_predictions(
+                    user_ids=["user_1", "user_2"], use_case=stub_use_case
+                )
+                mismatches.extend(
+                    value for value in [prediction, *batch.predictions] if value != 0
+                )
+                count += 1
+            predictions_made.append(count)
+
+        readers = [threading.Thread(target=serve) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for version in range(1, 300):
+            repository.publish(
+                use_case=stub_use_case,
+                model=StubVersionedModel(version),
+                feature_set=make_feature_set(version),
+            )
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+        assert mismatches == []
+        assert all(count > 0 for count in predictions_made)
+
+    def test_reads_proceed_while_a_writer_holds_the_lock(self) -> None:
+        stub_use_case = "stub_use_case"
+        repository = SnapshotRepository()
+        repository.publish(
+            use_case=stub_use_case,
+            model=StubVersionedModel(0),
+            feature_set=make_feature_set(0),
+        )
+        inference_engine = InferenceEngine(
+            model_repository=repository, feature_repository=repository
+        )
+        predictions: list[float] = []
+
+        def serve() -> None:
+            for _ in range(1_000):
+                predictions.append(
+                    inference_engine.get_prediction(
+                        user_id="user_1", use_case=stub_use_case
+                    )
+                )
+
+        with repository._write_lock:
+            reader = threading.Thread(target=serve)
+            reader.start()
+            reader.join(timeout=5)
+            assert not reader.is_alive()
+
+        assert predictions == [0.0] * 1_000
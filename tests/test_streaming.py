@@ -0,0 +1,135 @@
+import pytest
+
+from src.services.features.feature_store import InMemoryFeatureStore
+from src.services.features.streaming import (
+    COUNT,
+    SUM,
+    FeatureEvent,
+    StreamingAggregator,
+    StreamingIngestion,
+    WindowedAggregate,
+    micro_batches,
+)
+
+
+def stub_event(user_id: str, timestamp: float, value: float) -> FeatureEvent:
+    return FeatureEvent(
+        use_case="stub_use_case",
+        user_id=user_id,
+        timestamp=timestamp,
+        values={"watch_seconds": value},
+    )
+
+
+class TestStreamingAggregator:
+    def test_aggregates_only_events_inside_the_window(self) -> None:
+        aggregator = StreamingAggregator(
+            aggregates=[WindowedAggregate(source="watch_seconds", window_seconds=10)]
+        )
+
+        for timestamp, value in ((0, 1.0), (5, 2.0), (12, 4.0)):
+            aggregator.add(stub_event("a", timestamp, value))
+
+        assert aggregator.features(use_case="stub_use_case", user_id="a") == {
+            "watch_seconds_count_10s": 2,
+            "watch_seconds_sum_10s": 6.0,
+            "watch_seconds_mean_10s": 3.0,
+        }
+
+    def test_late_events_outside_the_window_are_dropped(self) -> None:
+        aggregator = StreamingAggregator(
+            aggregates=[
+                WindowedAggregate(
+                    source="watch_seconds", window_seconds=10, aggregations=(COUNT,)
+                )
+            ]
+        )
+        aggregator.add(stub_event("a", 20, 1.0))
+
+        assert not aggregator.add(stub_event("a", 5, 1.0))
+        assert aggregator.features(use_case="stub_use_case", user_id="a") == {
+            "watch_seconds_count_10s": 1
+        }
+
+    def test_expire_ages_out_idle_users(self) -> None:
+        aggregator = StreamingAggregator(
+            aggregates=[WindowedAggregate(source="watch_seconds", window_seconds=10)]
+        )
+        aggregator.add(stub_event("a", 0, 3.0))
+        aggregator.add(stub_event("b", 8, 3.0))
+
+        changed = aggregator.expire(now=15)
+
+        assert changed == {("stub_use_case", "a")}
+        assert aggregator.features(use_case="stub_use_case", user_id="a") == {
+            "watch_seconds_count_10s": 0,
+            "watch_seconds_sum_10s": 0.0,
+        }
+
+    def test_expire_forgets_users_with_only_empty_windows(self) -> None:
+        aggregator = StreamingAggregator(
+            aggregates=[WindowedAggregate(source="watch_seconds", window_seconds=10)]
+        )
+        aggregator.add(stub_event("a", 0, 3.0))
+        aggregator.add(stub_event("b", 8, 3.0))
+
+        aggregator.expire(now=15)
+        assert aggregator.expire(now=100) == {("stub_use_case", "b")}
+
+        assert not aggregator._windows
+        assert aggregator.add(stub_event("a", 200, 1.0))
+        assert aggregator.features(use_case="stub_use_case", user_id="a") == {
+            "watch_seconds_count_10s": 1,
+            "watch_seconds_sum_10s": 1.0,
+            "watch_seconds_mean_10s": 1.0,
+        }
+
+    def test_rejects_unknown_aggregations(self) -> None:
+        with pytest.raises(ValueError):
+            WindowedAggregate(source="x", window_seconds=1, aggregations=("median",))
+
+
+class TestStreamingIngestion:
+    def test_updates_current_features_in_place_once_per_micro_batch(self) -> None:
+        feature_store = InMemoryFeatureStore(
+            current_features={"stub_use_case": {"a": {"age": 30}}}
+        )
+        ingestion = StreamingIngestion(
+            aggregator=StreamingAggregator(
+                aggregates=[
+                    WindowedAggregate(
+                        source="watch_seconds", window_seconds=60, aggregations=(SUM,)
+                    )
+                ]
+            ),
+            feature_store=feature_store,
+            batch_size=2,
+        )
+
+        ingested = ingestion.ingest(
+            stub_event(user_id, timestamp, 1.0)
+            for user_id, timestamp in (("a", 0), ("b", 1), ("a", 2))
+        )
+
+        assert ingested == 3
+        assert feature_store.get_current_feature_version("stub_use_case") == 2
+        assert feature_store.get_current_features(
+            user_id="a", use_case="stub_use_case"
+        ) == {"age": 30, "watch_seconds_sum_60s": 2.0}
+        assert feature_store.get_current_features(
+            user_id="b", use_case="stub_use_case"
+        ) == {"watch_seconds_sum_60s": 1.0}
+
+    def test_micro_batches_are_read_lazily(self) -> None:
+        consumed: list[int] = []
+
+        def stub_events():
+            for timestamp in range(5):
+                consumed.append(timestamp)
+                yield stub_event("a", timestamp, 1.0)
+
+        batches = micro_batches(stub_events(), size=2)
+
+        assert len(next(batches)) == 2
+        assert consumed == [0, 1]
+        assert [len(batch) for batch in batches] == [2, 1]
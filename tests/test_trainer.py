@@ -1,11 +1,15 @@
 from typing import Sequence
+import numpy as np
 import pytest
 
 from dataclasses import dataclass, field
 from src.common.models import MachineLearningModel
+from src.common.feature_files import write_feature_file
+from src.common.features import FeatureTable
 from src.services.training.repositories import (
     InMemoryFeatureRepository,
     InMemoryModelRepository,
+    MemoryMappedFeatureRepository,
     ModelRepository,
 )
 from src.services.training.trainer import Trainer
@@ -100,3 +104,251 @@ class TestTrainer:
 
         with pytest.raises(expected_exception=ValueError, match="No model found.*"):
             stub_trainer.train(use_case="unknown_usecase")
+
+
+@dataclass
+class StubBatchModel(MachineLearningModel):
+    batch_calls: list[tuple[list[str], list[float]]] = field(default_factory=list)
+
+    def update_weights(
+        self, features: shared_types.FeatureVector, target: shared_types.Target
+    ) -> None:
+        raise NotImplementedError()
+
+    def update_weights_batch(
+        self, features: Sequence[shared_types.FeatureVector], targets: np.ndarray
+    ) -> None:
+        self.batch_calls.append(
+            ([f"user_{int(row['feature1'])}" for row in features], targets.tolist())
+        )
+
+    def predict(self, features: shared_types.FeatureVector) -> float:
+        raise NotImplementedError()
+
+
+def make_feature_repository(use_case: str, n_users: int) -> InMemoryFeatureRepository:
+    return InMemoryFeatureRepository(
+        features={
+            use_case: {f"user_{i}": {"feature1": float(i)} for i in range(n_users)}
+        },
+        targets={use_case: {f"user_{i}": float(i % 2) for i in range(n_users)}},
+    )
+
+
+class TestMiniBatchTrainer:
+    def test_hands_model_batches_of_configured_size(self) -> None:
+        stub_use_case = "stub_use_case"
+        stub_model = StubBatchModel()
+
+        trainer = Trainer(
+            model_repository=InMemoryModelRepository(
+                registry={stub_use_case: stub_model}
+            ),
+            feature_repository=make_feature_repository(stub_use_case, n_users=5),
+            batch_size=2,
+        )
+        trainer.train(use_case=stub_use_case)
+
+        assert stub_model.batch_calls == [
+            (["user_0", "user_1"], [0.0, 1.0]),
+            (["user_2", "user_3"], [0.0, 1.0]),
+            (["user_4"], [0.0]),
+        ]
+
+    def test_seeded_shuffle_is_reproducible_and_covers_every_epoch(self) -> None:
+        stub_use_case = "stub_use_case"
+
+        def train_once() -> list[tuple[list[str], list[float]]]:
+            stub_model = StubBatchModel()
+            Trainer(
+                model_repository=InMemoryModelRepository(
+                    registry={stub_use_case: stub_model}
+                ),
+                feature_repository=make_feature_repository(stub_use_case, n_users=6),
+                batch_size=4,
+                epochs=3,
+                shuffle=True,
+                seed=7,
+            ).train(use_case=stub_use_case)
+            return stub_model.batch_calls
+
+        batch_calls = train_once()
+        assert batch_calls == train_once()
+        assert len(batch_calls) == 6
+        for first_batch, second_batch in zip(batch_calls[::2], batch_calls[1::2]):
+            assert sorted(first_batch[0] + second_batch[0]) == [
+                f"user_{i}" for i in range(6)
+            ]
+
+    def test_falls_back_to_per_row_updates_for_legacy_models(self) -> None:
+        stub_use_case = "stub_use_case"
+        stub_model = StubModel()
+
+        trainer = Trainer(
+            model_repository=InMemoryModelRepository(
+                registry={stub_use_case: stub_model}
+            ),
+            feature_repository=make_feature_repository(stub_use_case, n_users=3),
+            batch_size=2,
+        )
+        trainer.train(use_case=stub_use_case)
+
+        assert stub_model.update_calls == [
+            ({"feature1": 0.0}, 0.0),
+            ({"feature1": 1.0}, 1.0),
+            ({"feature1": 2.0}, 0.0),
+        ]
+
+    def test_rejects_non_positive_batch_size(self) -> None:
+        with pytest.raises(expected_exception=ValueError, match="batch_size"):
+            Trainer(batch_size=0)
+
+    def test_streams_batches_from_memory_mapped_history(self, tmp_path) -> None:
+        stub_use_case = "stub_use_case"
+        stub_model = StubBatchModel()
+        write_feature_file(
+            tmp_path / stub_use_case,
+            table=FeatureTable.from_feature_set(
+                {f"user_{i}": {"feature1": float(i)} for i in range(5)}
+            ),
+            targets={f"user_{i}": float(i % 2) for i in range(5)},
+        )
+
+        trainer = Trainer(
+            model_repository=InMemoryModelRepository(
+                registry={stub_use_case: stub_model}
+            ),
+            feature_repository=MemoryMappedFeatureRepository(root=tmp_path),
+            batch_size=2,
+        )
+        trainer.train(use_case=stub_use_case)
+
+        assert stub_model.batch_calls == [
+            (["user_0", "user_1"], [0.0, 1.0]),
+            (["user_2", "user_3"], [0.0, 1.0]),
+            (["user_4"], [0.0]),
+        ]
+
+
+class TestTrainMany:
+    def test_trains_each_use_case_in_a_worker_and_returns_models(self) -> None:
+        stub_use_cases = ["stub_use_case_1", "stub_use_case_2"]
+        feature_repository = InMemoryFeatureRepository()
+        for use_case in stub_use_cases:
+            use_case_repository = make_feature_repository(use_case, n_users=3)
+            feature_repository.features.update(use_case_repository.features)
+            feature_repository.targets.update(use_case_repository.targets)
+        model_repository = InMemoryModelRepository(
+            registry={use_case: StubBatchModel() for use_case in stub_use_cases}
+        )
+
+        reports = Trainer(
+            model_repository=model_repository,
+            feature_repository=feature_repository,
+            batch_size=2,
+        ).train_many(use_cases=stub_use_cases, max_workers=2)
+
+        assert all(report.succeeded for report in reports.values())
+        for use_case in stub_use_cases:
+            trained_model = model_repository.get_model(use_case=use_case)
+            assert isinstance(trained_model, StubBatchModel)
+            assert trained_model.batch_calls == [
+                (["user_0", "user_1"], [0.0, 1.0]),
+                (["user_2"], [0.0]),
+            ]
+
+    def test_failing_use_cases_do_not_stop_the_others(self) -> None:
+        stub_model = StubModel(expected_weights=[1.0])
+        model_repository = InMemoryModelRepository(
+            registry={
+                "stub_use_case": stub_model,
+                "stub_broken_use_case": StubBatchModel(),
+            }
+        )
+        feature_repository = make_feature_repository("stub_use_case", n_users=2)
+        feature_repository.features["stub_broken_use_case"] = (
+            feature_repository.features["stub_use_case"]
+        )
+        feature_repository.targets["stub_broken_use_case"] = feature_repository.targets[
+            "stub_use_case"
+        ]
+
+        reports = Trainer(
+            model_repository=model_repository,
+            feature_repository=feature_repository,
+        ).train_many(
+            use_cases=["stub_broken_use_case", "stub_missing_use_case", "stub_use_case"]
+        )
+
+        assert reports["stub_use_case"].succeeded
+        assert reports["stub_use_case"].seconds > 0
+        assert "NotImplementedError" in str(reports["stub_broken_use_case"].error)
+        assert not reports["stub_missing_use_case"].succeeded
+        assert model_repository.get_model("stub_use_case").weights == [1.0]
+        assert model_repository.get_model("stub_use_case") is not stub_model
+
+
+class TestIncrementalTrainer:
+    def test_trains_only_on_users_changed_since_the_watermark(self) -> None:
+        stub_use_case = "stub_use_case"
+        stub_model = StubBatchModel()
+        feature_repository = make_feature_repository(stub_use_case, n_users=10)
+        trainer = Trainer(
+            model_repository=InMemoryModelRepository(
+                registry={stub_use_case: stub_model}
+            ),
+            feature_repository=feature_repository,
+            batch_size=4,
+        )
+        feature_repository.upsert_features(
+            use_case=stub_use_case, feature_set={"user_7": {"feature1": 7.0}}
+        )
+        watermark = trainer.train_incremental(use_case=stub_use_case, since=0)
+        feature_repository.upsert_targets(
+            use_case=stub_use_case, targets={"user_2": 1.0}
+        )
+        feature_repository.upsert_features(
+            use_case=stub_use_case, feature_set={"user_3": {"feature1": 3.0}}
+        )
+
+        next_watermark = trainer.train_incremental(
+            use_case=stub_use_case, since=watermark
+        )
+
+        assert (watermark, next_watermark) == (1, 3)
+        assert stub_model.batch_calls == [
+            (["user_7"], [1.0]),
+            (["user_2", "user_3"], [1.0, 1.0]),
+        ]
+        assert (
+            trainer.train_incremental(use_case=stub_use_case, since=next_watermark) == 3
+        )
+        assert len(stub_model.batch_calls) == 2
+
+    def test_skips_users_without_targets_and_adds_a_replay_sample(self) -> None:
+        stub_use_case = "stub_use_case"
+        stub_model = StubModel()
+        feature_repository = make_feature_repository(stub_use_case, n_users=10)
+        feature_repository.upsert_features(
+            use_case=stub_use_case,
+            feature_set={"user_1": {"feature1": 1.0}, "new_user": {"feature1": 0.0}},
+        )
+
+        Trainer(
+            model_repository=InMemoryModelRepository(
+                registry={stub_use_case: stub_model}
+            ),
+            feature_repository=feature_repository,
+            seed=0,
+        ).train_incremental(use_case=stub_use_case, since=0, replay_size=3)
+
+        trained = [features["feature1"] for features, _ in stub_model.update_calls]
+        assert trained[0] == 1.0
+        assert len(set(trained)) == len(trained) >= 2
+        assert len(trained) <= 4
+
+    def test_requires_change_tracking(self, tmp_path) -> None:
+        with pytest.raises(TypeError, match="get_changed_user_ids"):
+            Trainer(
+                feature_repository=MemoryMappedFeatureRepository(root=tmp_path)
+            ).train_incremental(use_case="stub_use_case", since=0)